@@ -2,8 +2,14 @@ import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
 import databaseConnection as db
-import customerRegistration, forgotPassword, dashboard, customerDashboard
-import driverDashboard
+
+# The portals (customerDashboard, dashboard, driverDashboard, registration,
+# forgot password) are imported when first opened, not here, so the
+# welcome window does not wait for modules the user may never open.
+# Logins check the password hash on a uiWorker thread (see credentials),
+# so the login window stays responsive while scrypt runs, and hand the
+# portal a session.Session.
+# benchmarks/startup.py and benchmarks/importTime.py keep it that way.
 
 # global constants
 PRIMARY_YELLOW = "#FFC300"
@@ -39,6 +45,27 @@ def center_on_parent(child, parent, w, h):
         child.geometry(f"{w}x{h}+{x}+{y}")
 
 
+def submit_login(win, kind, username, password, on_done, button):
+    """
+    Check username/password for an account of kind on a worker thread;
+    on_done(session or None) runs on the Tk thread. Clicks while a check
+    is running are ignored.
+    """
+    import session
+    import uiWorker
+
+    if not hasattr(win, "login_worker"):
+        win.login_worker = uiWorker.Worker(win)
+
+    def failed(exc):
+        messagebox.showerror("Error", f"Login failed: {exc}", parent=win)
+
+    win.login_worker.submit(
+        session.login, kind, username, password,
+        on_done=on_done, on_error=failed, key="login", replace=False, busy=button,
+    )
+
+
 def new_portal_window(parent, title, w, h):
     win = tk.Toplevel(parent)
     win.title(title)
@@ -104,8 +131,9 @@ class CustomerLogin:
         self.pw = ttk.Entry(inner, show="*", width=35, font=("Segoe UI", 11))
         self.pw.pack(pady=(4, 16), ipady=4)
 
-        ttk.Button(inner, text="Login", style="Primary.TButton",
-                   command=self.login).pack(fill="x", pady=(6, 10))
+        self.login_btn = ttk.Button(inner, text="Login", style="Primary.TButton",
+                                    command=self.login)
+        self.login_btn.pack(fill="x", pady=(6, 10))
 
         ttk.Button(
             inner, text="Register New Account",
@@ -120,21 +148,25 @@ class CustomerLogin:
         ).pack(fill="x", pady=4)
 
     def login(self):
-        q = "SELECT * FROM customer WHERE email=? AND password=?"
-        res = db.run_query(q, (self.email.get().strip(), self.pw.get()), fetch=True)
+        submit_login(self.win, "customer", self.email.get().strip(), self.pw.get(),
+                     self.logged_in, self.login_btn)
 
-        if res:
+    def logged_in(self, session):
+        if session:
+            import customerDashboard
             self.win.destroy()
-            customerDashboard.CustomerDashboard(res[0])
+            customerDashboard.CustomerDashboard(session)
         else:
             messagebox.showerror("Error", "Invalid email or password", parent=self.win)
 
     def open_register(self):
         #  do NOT destroy login window
+        import customerRegistration
         customerRegistration.open_registration(self.win)
 
     def open_forgot(self):
         #  do NOT destroy login window
+        import forgotPassword
         forgotPassword.open_forgot(self.win)
 
 
@@ -193,16 +225,19 @@ class AdminLogin:
         self.pw = ttk.Entry(inner, show="*", width=35, font=("Segoe UI", 11))
         self.pw.pack(pady=(4, 18), ipady=4)
 
-        ttk.Button(inner, text="Login", style="Primary.TButton",
-                   command=self.login).pack(fill="x", pady=(10, 4))
+        self.login_btn = ttk.Button(inner, text="Login", style="Primary.TButton",
+                                    command=self.login)
+        self.login_btn.pack(fill="x", pady=(10, 4))
 
     def login(self):
-        q = "SELECT * FROM admin WHERE username=? AND password=?"
-        res = db.run_query(q, (self.user.get().strip(), self.pw.get()), fetch=True)
+        submit_login(self.win, "admin", self.user.get().strip(), self.pw.get(),
+                     self.logged_in, self.login_btn)
 
-        if res:
+    def logged_in(self, session):
+        if session:
+            import dashboard
             self.win.destroy()
-            dashboard.AdminDashboard()
+            dashboard.AdminDashboard(session)
         else:
             messagebox.showerror("Error", "Invalid admin credentials", parent=self.win)
 
@@ -262,16 +297,19 @@ class DriverLogin:
         self.pw = ttk.Entry(inner, show="*", width=35, font=("Segoe UI", 11))
         self.pw.pack(pady=(4, 18), ipady=4)
 
-        ttk.Button(inner, text="Login", style="Primary.TButton",
-                   command=self.login).pack(fill="x", pady=(10, 4))
+        self.login_btn = ttk.Button(inner, text="Login", style="Primary.TButton",
+                                    command=self.login)
+        self.login_btn.pack(fill="x", pady=(10, 4))
 
     def login(self):
-        q = "SELECT * FROM driver WHERE email=? AND password=?"
-        res = db.run_query(q, (self.email.get().strip(), self.pw.get()), fetch=True)
+        submit_login(self.win, "driver", self.email.get().strip(), self.pw.get(),
+                     self.logged_in, self.login_btn)
 
-        if res:
+    def logged_in(self, session):
+        if session:
+            import driverDashboard
             self.win.destroy()
-            driverDashboard.DriverDashboard(res[0])
+            driverDashboard.DriverDashboard(session)
         else:
             messagebox.showerror("Error", "Invalid driver credentials", parent=self.win)
 
@@ -293,9 +331,11 @@ def open_driver_login():
 
 
 # main window
-if __name__ == "__main__":
-    db.create_tables()
+root = None
+
 
+def build_main_window():
+    global root
     root = tk.Tk()
     root.title("Taxi Booking System")
     root.geometry("960x560")
@@ -474,4 +514,13 @@ if __name__ == "__main__":
         bg=CARD_BG,
     ).pack(side="bottom", pady=(18, 0))
 
-    root.mainloop()
+    return root
+
+
+def main():
+    db.create_tables()
+    build_main_window().mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import argparse
+import csv
+import datetime
+import os
+
+import databaseConnection as db
+import queries
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional; only needed for --format parquet
+    pa = pq = None
+
+# Trip and payment dumps for accounting.
+# Rows are streamed from one SELECT with fetchmany in CHUNK-sized batches
+# and written as they arrive, so memory use does not grow with the number
+# of rows. The date range is part of the query (indexed created_at /
+# paid_at), never filtered in Python.
+
+CHUNK = 5000
+
+# export name -> (query, column types); types are used for Parquet
+EXPORTS = {
+    "trips": ("export_trips", {
+        "id": "int", "created_at": "text",
+        "pickup_date": "text", "pickup_time": "text",
+        "dropoff_date": "text", "dropoff_time": "text",
+        "pickup": "text", "dropoff": "text", "status": "text", "fare": "float",
+        "customer_id": "int", "customer": "text", "driver_id": "int", "driver": "text",
+    }),
+    "payments": ("export_payments", {
+        "id": "int", "paid_at": "text", "trip_id": "int", "amount": "float",
+        "method": "text", "status": "text", "customer": "text", "driver": "text",
+    }),
+}
+
+FORMATS = ("csv", "parquet")
+
+# open-ended bounds for the [start, end) range
+MIN_DATE = ""
+MAX_DATE = "9999-12-31"
+
+
+def month_range(month):
+    """'2026-09' -> ('2026-09-01', '2026-10-01')."""
+    first = datetime.datetime.strptime(month, "%Y-%m").date()
+    following = (first.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    return first.isoformat(), following.isoformat()
+
+
+def iter_chunks(name, start=None, end=None, chunk=CHUNK):
+    """
+    Yield lists of up to `chunk` rows (tuples) of export `name` with
+    start <= date < end. The pooled connection is held until the
+    generator is exhausted or closed.
+    """
+    sql = queries.get(EXPORTS[name][0]).sql
+    with db.get_pool().connection() as conn:
+        if not conn:
+            raise db.Error("DB connection failed.")
+        cur = conn.cursor()
+        cur.row_factory = None  # plain tuples; no per-row Row objects
+        try:
+            cur.execute(sql, (start or MIN_DATE, end or MAX_DATE))
+            while True:
+                rows = cur.fetchmany(chunk)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cur.close()
+
+
+def write_csv(chunks, path, columns):
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        out = csv.writer(f)
+        out.writerow(columns)
+        for rows in chunks:
+            out.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def write_parquet(chunks, path, columns):
+    if pa is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    types = {"int": pa.int64(), "float": pa.float64(), "text": pa.string()}
+    schema = pa.schema([(c, types[t]) for c, t in columns.items()])
+    names = list(columns)
+
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in chunks:
+            # one row group per chunk
+            arrays = [pa.array(col, schema.field(n).type) for n, col in zip(names, zip(*rows))]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            count += len(rows)
+    return count
+
+
+def export(name, path, start=None, end=None, fmt="csv", chunk=CHUNK):
+    """Write export `name` to path. Returns the number of rows written."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    columns = EXPORTS[name][1]
+    chunks = iter_chunks(name, start, end, chunk)
+    try:
+        if fmt == "parquet":
+            return write_parquet(chunks, path, columns)
+        return write_csv(chunks, path, columns)
+    finally:
+        chunks.close()
+
+
+def export_month(month, folder, fmt="csv"):
+    """
+    Export trips and payments for month ('YYYY-MM') into folder.
+    Returns {file path: rows written}.
+    """
+    start, end = month_range(month)
+    written = {}
+    for name in EXPORTS:
+        path = os.path.join(folder, f"{name}_{month}.{fmt}")
+        written[path] = export(name, path, start, end, fmt)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export trips or payments for accounting.")
+    parser.add_argument("export", choices=sorted(EXPORTS) + ["all"])
+    parser.add_argument("-o", "--output", default=".", help="file, or folder for 'all'")
+    parser.add_argument("--month", help="YYYY-MM (sets --from/--to)")
+    parser.add_argument("--from", dest="start", help="first day, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", help="day after the last one, YYYY-MM-DD")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--chunk", type=int, default=CHUNK)
+    args = parser.parse_args()
+
+    start, end = month_range(args.month) if args.month else (args.start, args.end)
+    names = list(EXPORTS) if args.export == "all" else [args.export]
+    for name in names:
+        path = args.output
+        if args.export == "all" or os.path.isdir(path):
+            path = os.path.join(path, f"{name}_{args.month or 'export'}.{args.format}")
+        n = export(name, path, start, end, args.format, args.chunk)
+        print(f"{name}: {n} rows -> {path}")
+
+
+if __name__ == "__main__":
+    main()
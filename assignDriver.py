@@ -1,6 +1,10 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
+from collections import namedtuple
 import databaseConnection as db
+from treeBinding import TreeBinding
+import uiWorker
+import changeFeed
 
 # Color theme
 PRIMARY_YELLOW = "#FFC300"
@@ -9,6 +13,50 @@ CARD_BG = "#0b1220"
 TEXT_LIGHT = "#e5e7eb"
 TEXT_MUTED = "#9ca3af"
 
+# Assignment outcomes
+ASSIGNED = "assigned"
+TRIP_UNAVAILABLE = "trip_unavailable"
+DRIVER_UNAVAILABLE = "driver_unavailable"
+
+AssignResult = namedtuple("AssignResult", "ok status driver_name")
+
+
+def assign_driver(trip_id, driver_id):
+    """
+    Assign a driver to a requested trip.
+    Both rows are changed with conditional UPDATEs inside one
+    BEGIN IMMEDIATE transaction, so two dispatchers can never
+    double-assign a trip or a driver. Returns an AssignResult.
+    """
+    return assign_batch([(trip_id, driver_id)])[0]
+
+
+def assign_batch(pairs):
+    """
+    Assign many (trip_id, driver_id) pairs in one transaction.
+    Each pair is compare-and-set under its own savepoint; a pair that
+    conflicts is undone and skipped. Returns AssignResults in order.
+    """
+    results = []
+    with db.transaction() as tx:
+        for trip_id, driver_id in pairs:
+            tx.execute("SAVEPOINT assign_pair")
+            claimed = None
+            if tx.run("trip_assign_if_pending", (driver_id, trip_id)) != 1:
+                status = TRIP_UNAVAILABLE
+            else:
+                claimed = tx.run("driver_claim", (driver_id,), fetch=True)
+                status = ASSIGNED if claimed else DRIVER_UNAVAILABLE
+
+            if status != ASSIGNED:
+                tx.execute("ROLLBACK TO assign_pair")
+            tx.execute("RELEASE assign_pair")
+
+            results.append(
+                AssignResult(status == ASSIGNED, status, claimed[0]["name"] if claimed else None)
+            )
+    return results
+
 
 class AssignDriverWindow:
     def __init__(self, root=None):
@@ -148,6 +196,10 @@ class AssignDriverWindow:
         hsb_d.pack(side="bottom", fill="x")
         self.drv_tree.pack(side="left", fill="both", expand=True)
 
+        self.worker = uiWorker.Worker(self.win)
+        self.trips = TreeBinding(self.trips_tree, "pending_trips", self.render_trip)
+        self.drivers = TreeBinding(self.drv_tree, "available_drivers", self.render_driver)
+
         #  FOOTER BUTTONS 
         footer = tk.Frame(self.win, bg=PRIMARY_DARK)
         footer.pack(fill="x", padx=24, pady=10)
@@ -159,6 +211,7 @@ class AssignDriverWindow:
                    command=self.assign_selected).pack(side="right")
 
         self.refresh()
+        changeFeed.subscribe(lambda events: self.refresh(), self.win)
 
         if root is None:
             self.win.mainloop()
@@ -182,42 +235,22 @@ class AssignDriverWindow:
         self.load_drivers()
 
     def load_trips(self):
-        self.trips_tree.delete(*self.trips_tree.get_children())
-        rows = db.run_query(
-            """
-            SELECT t.id, c.name, t.pickup, t.dropoff,
-                   t.pickup_date, t.pickup_time
-            FROM trip t
-            LEFT JOIN customer c ON t.customer_id = c.id
-            WHERE t.status='requested' AND t.driver_id IS NULL
-            ORDER BY t.created_at ASC
-            """,
-            fetch=True,
-        ) or []
-
-        for r in rows:
-            self.trips_tree.insert("", "end", values=(
-                r["id"], r["name"] or "Unknown",
-                r["pickup"], r["dropoff"],
-                r["pickup_date"], r["pickup_time"]
-            ))
+        self.trips.refresh(worker=self.worker)
 
     def load_drivers(self):
-        self.drv_tree.delete(*self.drv_tree.get_children())
-        rows = db.run_query(
-            """
-            SELECT id, name, email, phone
-            FROM driver
-            WHERE available=1
-            ORDER BY name ASC
-            """,
-            fetch=True,
-        ) or []
-
-        for r in rows:
-            self.drv_tree.insert("", "end", values=(
-                r["id"], r["name"], r["email"], r["phone"]
-            ))
+        self.drivers.refresh(worker=self.worker)
+
+    @staticmethod
+    def render_trip(r):
+        return (
+            r["id"], r["name"] or "Unknown",
+            r["pickup"], r["dropoff"],
+            r["pickup_date"], r["pickup_time"]
+        ), ()
+
+    @staticmethod
+    def render_driver(r):
+        return (r["id"], r["name"], r["email"], r["phone"]), ()
 
     #  ASSIGN 
     def assign_selected(self):
@@ -234,28 +267,25 @@ class AssignDriverWindow:
         trip_id = int(self.trips_tree.item(sel_trip[0])["values"][0])
         driver_id = int(self.drv_tree.item(sel_drv[0])["values"][0])
 
-        t = db.run_query("SELECT status, driver_id FROM trip WHERE id=?",
-                         (trip_id,), fetch=True)
-        if not t or t[0]["driver_id"] or t[0]["status"] != "requested":
-            messagebox.showerror("Error", "Trip unavailable.", parent=self.win)
-            self.refresh()
-            return
+        self.worker.submit(
+            assign_driver, trip_id, driver_id,
+            on_done=self.assigned,
+            on_error=lambda e: messagebox.showerror("Error", f"Assignment failed: {e}", parent=self.win),
+            key="assign",
+            replace=False,
+            busy=self.win,
+        )
 
-        d = db.run_query("SELECT available, name FROM driver WHERE id=?",
-                         (driver_id,), fetch=True)
-        if not d or d[0]["available"] != 1:
-            messagebox.showerror("Error", "Driver unavailable.", parent=self.win)
+    def assigned(self, result):
+        if not result.ok:
+            error = "Trip unavailable." if result.status == TRIP_UNAVAILABLE else "Driver unavailable."
+            messagebox.showerror("Error", error, parent=self.win)
             self.refresh()
             return
 
-        db.run_query("UPDATE trip SET driver_id=?, status='assigned' WHERE id=?",
-                     (driver_id, trip_id))
-        db.run_query("UPDATE driver SET available=0 WHERE id=?",
-                     (driver_id,))
-
         messagebox.showinfo(
             "Assigned",
-            f"Driver '{d[0]['name']}' assigned successfully.",
+            f"Driver '{result.driver_name}' assigned successfully.",
             parent=self.win
         )
         self.refresh()
@@ -0,0 +1,139 @@
+"""
+Multi-process driver assignment contention benchmark.
+
+Several processes assign random (trip, driver) pairs against one
+database file at the same time, then the result is checked for
+double assignments.
+
+    python benchmarks/assignContention.py --processes 8
+    python benchmarks/assignContention.py --legacy   # old check-then-act path
+"""
+import argparse
+import multiprocessing as mp
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import databaseConnection as db  # noqa: E402
+
+
+def seed_database(path, trips, drivers):
+    db.SQLITE_DB_FILE = path
+    db.create_tables()
+    with db.transaction() as tx:
+        tx.execute(
+            "INSERT INTO customer (name, email) VALUES (?, ?)",
+            ("Bench Customer", "bench@example.com"),
+        )
+        tx.execute(
+            "INSERT INTO driver (name, email, available) VALUES (?, ?, 1)",
+            [(f"Driver {i}", f"driver{i}@example.com") for i in range(drivers)],
+            many=True,
+        )
+        tx.execute(
+            "INSERT INTO trip (customer_id, pickup, dropoff, fare, status) "
+            "VALUES (1, 'A', 'B', 100, 'requested')",
+            [()] * trips,
+            many=True,
+        )
+    db.close_pool()
+
+
+def legacy_assign(trip_id, driver_id):
+    """The original four round-trip check-then-act assignment."""
+    t = db.run_query("SELECT status, driver_id FROM trip WHERE id=?", (trip_id,), fetch=True)
+    if not t or t[0]["driver_id"] or t[0]["status"] != "requested":
+        return False
+    d = db.run_query("SELECT available FROM driver WHERE id=?", (driver_id,), fetch=True)
+    if not d or d[0]["available"] != 1:
+        return False
+    db.run_query("UPDATE trip SET driver_id=?, status='assigned' WHERE id=?", (driver_id, trip_id))
+    db.run_query("UPDATE driver SET available=0 WHERE id=?", (driver_id,))
+    return True
+
+
+def worker(path, seed, attempts, trips, drivers, legacy, queue):
+    import assignDriver
+
+    db.SQLITE_DB_FILE = path
+    rnd = random.Random(seed)
+    ok = conflicts = errors = 0
+
+    start = time.perf_counter()
+    for _ in range(attempts):
+        trip_id = rnd.randint(1, trips)
+        driver_id = rnd.randint(1, drivers)
+        try:
+            if legacy:
+                success = legacy_assign(trip_id, driver_id)
+            else:
+                success = assignDriver.assign_driver(trip_id, driver_id).ok
+        except db.Error:
+            errors += 1
+            continue
+        if success:
+            ok += 1
+        else:
+            conflicts += 1
+    queue.put((ok, conflicts, errors, time.perf_counter() - start))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--trips", type=int, default=2000)
+    parser.add_argument("--drivers", type=int, default=300)
+    parser.add_argument("--attempts", type=int, default=1000, help="per process")
+    parser.add_argument("--legacy", action="store_true")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "assign_bench.db")
+    seed_database(path, args.trips, args.drivers)
+
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    procs = [
+        ctx.Process(
+            target=worker,
+            args=(path, seed, args.attempts, args.trips, args.drivers, args.legacy, queue),
+        )
+        for seed in range(args.processes)
+    ]
+
+    start = time.perf_counter()
+    for p in procs:
+        p.start()
+    results = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+    wall = time.perf_counter() - start
+
+    ok = sum(r[0] for r in results)
+    conflicts = sum(r[1] for r in results)
+    errors = sum(r[2] for r in results)
+    total = args.processes * args.attempts
+
+    db.SQLITE_DB_FILE = path
+    doubled = db.run_query(
+        "SELECT driver_id FROM trip WHERE status='assigned' "
+        "GROUP BY driver_id HAVING COUNT(*) > 1",
+        fetch=True,
+    ) or []
+    busy = db.run_query("SELECT COUNT(*) FROM driver WHERE available=0", fetch=True)[0][0]
+
+    print(f"mode:              {'legacy' if args.legacy else 'compare-and-set'}")
+    print(f"processes:         {args.processes}")
+    print(f"attempts:          {total} in {wall:.2f}s ({total / wall:,.0f}/s)")
+    print(f"assigned:          {ok}")
+    print(f"conflicts:         {conflicts}")
+    print(f"lock errors:       {errors}")
+    print(f"busy drivers:      {busy}")
+    print(f"double-assigned:   {len(doubled)} drivers")
+
+
+if __name__ == "__main__":
+    main()
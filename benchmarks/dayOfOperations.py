@@ -0,0 +1,184 @@
+"""
+End-to-end benchmark: a simulated day of operations, without Tk.
+
+Seeds a fresh database with --trips synthetic trips (seedData), or
+copies one given with --db, then drives the functions the windows run on
+their worker threads:
+
+  book       customerDashboard.book_trip      (Pay & Book)
+  assign     assignDriver.assign_driver       (Assign Driver)
+  complete   driverDashboard.mark_completed   (Mark Completed)
+  cancel     customerDashboard.cancel_booking (Cancel Trip)
+
+--ops times each, as book -> assign -> complete cycles where every fifth
+trip is cancelled instead, followed by --reads runs of each window's
+load (admin lists and pages, KPI panel, assign lists, a customer's and a
+driver's trips). Reports p50/p95/p99 latency and throughput per
+operation; --json writes the same numbers for comparing releases.
+
+    python benchmarks/dayOfOperations.py --trips 100000
+    python benchmarks/dayOfOperations.py --db big.db --ops 2000 --json day.json
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import assignDriver  # noqa: E402
+import customerDashboard  # noqa: E402
+import dailyStats  # noqa: E402
+import dashboard  # noqa: E402
+import databaseConnection as db  # noqa: E402
+import driverDashboard  # noqa: E402
+import geocoding  # noqa: E402
+import seedData  # noqa: E402
+from treeBinding import TreeBinding  # noqa: E402
+
+METHODS = ("eSewa", "Khalti", "Fonepay")
+
+
+def place_names():
+    return sorted({p.name for p in geocoding.get_gazetteer().places.values()})
+
+
+class Timings:
+    def __init__(self):
+        self.samples = {}  # operation -> [seconds]
+
+    def run(self, name, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.samples.setdefault(name, []).append(time.perf_counter() - start)
+        return result
+
+    def report(self):
+        rows = []
+        for name, times in self.samples.items():
+            times = sorted(times)
+            rows.append({
+                "operation": name,
+                "count": len(times),
+                "p50_ms": percentile(times, 50) * 1000,
+                "p95_ms": percentile(times, 95) * 1000,
+                "p99_ms": percentile(times, 99) * 1000,
+                "ops_per_s": len(times) / sum(times),
+            })
+        return rows
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(0, min(len(ordered) - 1, -(-len(ordered) * p // 100) - 1))]
+
+
+def run_day(timings, ops, customers, seed):
+    """book -> assign -> complete cycles; every fifth trip is cancelled instead."""
+    rnd = random.Random(seed + 1)
+    places = place_names()
+    drivers = [r["id"] for r in db.run_named("dispatch_available_drivers", ())]
+    if not drivers:
+        raise SystemExit("no available driver to assign")
+    today = datetime.date.today().isoformat()
+
+    for i in range(ops):
+        pick, drop = rnd.sample(places, 2)
+        fare = round(rnd.uniform(150, 1500), 2)
+        fields = (rnd.randint(1, customers), None, pick, drop, today, "09:30:00", None, None, fare, "requested")
+        trip_id = timings.run("book", customerDashboard.book_trip, fields, fare, rnd.choice(METHODS))
+
+        driver_id = drivers[i % len(drivers)]
+        result = timings.run("assign", assignDriver.assign_driver, trip_id, driver_id)
+        if not result.ok:
+            raise SystemExit(f"assignment of trip {trip_id} failed: {result.status}")
+
+        if i % 5 == 4:
+            timings.run("cancel", customerDashboard.cancel_booking, trip_id)
+        else:
+            timings.run("complete", driverDashboard.mark_completed, trip_id, driver_id)
+
+
+def run_reads(timings, reads, customers, drivers, seed):
+    """What each window runs when it opens or reloads."""
+    rnd = random.Random(seed + 2)
+    trips, payments = dashboard.TRIP_PAGES, dashboard.PAYMENT_PAGES
+    loads = (
+        ("drivers load", lambda: full_load("all_drivers", ())),
+        ("trips page", lambda: trips.fetch("id", desc=True)),
+        ("trips by status", lambda: trips.fetch("id", desc=True, filters={"status": "requested"})),
+        ("trips by fare", lambda: trips.fetch("fare", desc=True)),
+        ("trips search", lambda: trips.fetch("id", desc=True, filters={"search": '"chowk"'})),
+        ("payments page", lambda: payments.fetch("id", desc=True)),
+        ("kpi summary", dailyStats.summary),
+        ("assign: pending", lambda: full_load("pending_trips", ())),
+        ("assign: drivers", lambda: full_load("available_drivers", ())),
+        ("customer trips", lambda: full_load("customer_trips", (rnd.randint(1, customers),))),
+        ("driver trips", lambda: full_load("driver_trips", (rnd.randint(1, drivers),))),
+    )
+    for _ in range(reads):
+        for name, load in loads:
+            if timings.run(name, load) is None:
+                raise SystemExit(f"{name} failed")
+
+
+def full_load(view, params):
+    """TreeBinding's first (full) fetch of a view, as a window opening runs it."""
+    return TreeBinding(None, view, None).fetch(params, None, None, frozenset())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trips", type=int, default=10000, help="trips to seed")
+    parser.add_argument("--db", help="run against a copy of this database instead of seeding one")
+    parser.add_argument("--ops", type=int, default=500, help="book/assign/complete cycles")
+    parser.add_argument("--reads", type=int, default=20, help="runs of each window load")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "day.db")
+    try:
+        start = time.perf_counter()
+        if args.db:
+            shutil.copy(args.db, path)
+            db.SQLITE_DB_FILE = path
+            db.create_tables()
+            counts = db.run_query("SELECT (SELECT MAX(id) FROM customer), (SELECT MAX(id) FROM driver), "
+                                  "(SELECT COUNT(*) FROM trip)", fetch=True)[0]
+            customers, drivers, trips = counts[0] or 1, counts[1] or 1, counts[2]
+        else:
+            counts = seedData.generate(path, args.trips, seed=args.seed, log=lambda message: None)
+            customers, drivers, trips = counts["customer"], counts["driver"], counts["trip"]
+        print(f"{trips:,} trips, {customers:,} customers, {drivers:,} drivers "
+              f"(ready in {time.perf_counter() - start:.1f} s)")
+
+        timings = Timings()
+        start = time.perf_counter()
+        run_day(timings, args.ops, customers, args.seed)
+        run_reads(timings, args.reads, customers, drivers, args.seed)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close_pool()
+        shutil.rmtree(folder, ignore_errors=True)
+
+    results = timings.report()
+    print(f"{'operation':<18} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'ops/s':>9}")
+    for r in results:
+        print(f"{r['operation']:<18} {r['count']:>6} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['p99_ms']:>8.2f} {r['ops_per_s']:>9.1f}")
+    print(f"total {elapsed:.1f} s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"trips": trips, "ops": args.ops, "reads": args.reads, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Distance matrix benchmark: geo.distance_matrix vs. a pair-by-pair loop.
+
+Random trip pickups and driver positions around Kathmandu; the
+matrix is checked against haversine_km for every pair.
+
+The numpy rows only appear with numpy installed (optional, see README):
+run once with and once without it to compare numpy and pure Python.
+"numpy + tolist" is the cost of converting the array back to lists.
+
+    pip install numpy
+    python benchmarks/distanceMatrix.py --trips 2000 --drivers 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import geo  # noqa: E402
+from geo import distance_matrix, haversine_km  # noqa: E402
+
+# Kathmandu valley bounding box
+LAT_RANGE = (27.62, 27.78)
+LON_RANGE = (85.25, 85.45)
+
+
+def random_point(rnd):
+    return (rnd.uniform(*LAT_RANGE), rnd.uniform(*LON_RANGE))
+
+
+def pair_loop(rows, cols):
+    return [[haversine_km(a, b) for b in cols] for a in rows]
+
+
+def max_error(result, expected):
+    if geo.np is not None:
+        return float(geo.np.abs(geo.np.asarray(result, dtype=float) - geo.np.asarray(expected)).max())
+    return max(abs(x - y) for row, exp in zip(result, expected) for x, y in zip(row, exp))
+
+
+def timed(func, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trips", type=int, default=2000)
+    parser.add_argument("--drivers", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    trips = [random_point(rnd) for _ in range(args.trips)]
+    drivers = [random_point(rnd) for _ in range(args.drivers)]
+    pairs = args.trips * args.drivers
+
+    expected, loop_s = timed(pair_loop, trips, drivers, repeat=1)
+    runs = [("pair loop", loop_s, expected)]
+
+    if geo.np is not None:
+        result, s = timed(geo._matrix_numpy, trips, drivers, 1.0, None)
+        runs.append(("numpy", s, result))
+        result, s = timed(lambda: geo._matrix_numpy(trips, drivers, 1.0, None).tolist())
+        runs.append(("numpy + tolist", s, result))
+    result, s = timed(geo._matrix_python, trips, drivers, 1.0, None, repeat=1)
+    runs.append(("python", s, result))
+    result, s = timed(distance_matrix, trips, drivers)
+    runs.append(("distance_matrix", s, result))
+
+    print(f"{args.trips} x {args.drivers} = {pairs:,} pairs (numpy {'on' if geo.np else 'off'})")
+    print(f"{'method':<16} {'seconds':>8} {'pairs/s':>13} {'speedup':>8} {'max err m':>10}")
+    for label, s, result in runs:
+        err = max_error(result, expected)
+        print(f"{label:<16} {s:>8.3f} {pairs / s:>13,.0f} {loop_s / s:>7.1f}x {err * 1000:>10.6f}")
+
+
+if __name__ == "__main__":
+    main()
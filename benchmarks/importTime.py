@@ -0,0 +1,71 @@
+"""
+Import-time check for Welcomepage, based on python -X importtime.
+
+Fails (exit status 1) if importing Welcomepage pulls in a module that
+should only load when its portal is opened, or if the cumulative import
+time stays over budget (best of --runs).
+
+    python benchmarks/importTime.py --budget-ms 60
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# only imported once the user opens the matching window
+LAZY = (
+    "customerRegistration", "forgotPassword", "dashboard", "customerDashboard",
+    "driverDashboard", "assignDriver", "uiWorker", "changeFeed",
+    "fareEngine", "geocoding", "geo", "numpy", "credentials", "session",
+)
+
+
+def import_times(module):
+    """{module name: (self us, cumulative us)} for one fresh interpreter."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, total, name = line[len("import time:"):].split("|")
+        if own.strip().isdigit():
+            times[name.strip()] = (int(own), int(total))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="Welcomepage")
+    parser.add_argument("--budget-ms", type=float, default=60.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    best = min(runs, key=lambda t: t[args.module][1])
+    total_ms = best[args.module][1] / 1000
+
+    print(f"{args.module}: {total_ms:.1f} ms cumulative (best of {args.runs}), budget {args.budget_ms:.0f} ms")
+    for name, (own, total) in sorted(best.items(), key=lambda kv: -kv[1][0])[:args.top]:
+        print(f"  {own / 1000:7.1f} ms self {total / 1000:8.1f} ms cumulative  {name}")
+
+    eager = sorted(set(LAZY) & set(best))
+    failed = False
+    if eager:
+        print("FAIL: imported at startup, should be lazy:", ", ".join(eager))
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: over budget by {total_ms - args.budget_ms:.1f} ms")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Login throughput benchmark for credentials.login.
+
+Seeds a fresh database with --users customers whose passwords are still
+stored in plain text, then logs every one of them in from --threads
+threads three times: the first round verifies the legacy password and
+rehashes it, the second verifies the new hash, the third uses a wrong
+password. Reports logins/s and latency per round and checks that no
+plain-text password is left.
+
+    python benchmarks/loginThroughput.py --users 200 --threads 4
+    python benchmarks/loginThroughput.py --log2-n 12   # cheaper scrypt
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import credentials  # noqa: E402
+import databaseConnection as db  # noqa: E402
+
+
+def seed_database(path, users):
+    db.SQLITE_DB_FILE = path
+    db.create_tables()
+    with db.transaction() as tx:
+        tx.execute(
+            "INSERT INTO customer (name, email, telephone, password) VALUES (?, ?, ?, ?)",
+            [(f"Customer {i}", f"user{i}@example.com", "9800000000", f"secret{i}")
+             for i in range(users)],
+            many=True,
+        )
+
+
+def timed_login(email, password):
+    start = time.perf_counter()
+    row = credentials.login("customer", email, password)
+    return row is not None, time.perf_counter() - start
+
+
+def run_round(users, threads, wrong=False):
+    accounts = [(f"user{i}@example.com", f"secret{i}" + ("x" if wrong else "")) for i in range(users)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda a: timed_login(*a), accounts))
+    elapsed = time.perf_counter() - start
+    ok = sum(r[0] for r in results)
+    latencies = sorted(r[1] for r in results)
+    return ok, elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=credentials.HASH_THREADS)
+    parser.add_argument("--log2-n", type=int, default=credentials.SCRYPT_LOG2_N,
+                        help="scrypt cost (n = 2**log2_n)")
+    args = parser.parse_args()
+
+    credentials.SCRYPT_LOG2_N = args.log2_n
+    folder = tempfile.mkdtemp()
+    try:
+        seed_database(os.path.join(folder, "login_bench.db"), args.users)
+
+        scheme = f"scrypt n=2**{args.log2_n}" if credentials.HAS_SCRYPT else \
+            f"pbkdf2 {credentials.PBKDF2_ITERATIONS} iterations"
+        print(f"{args.users} customers, {args.threads} threads, {scheme}")
+        print(f"{'round':<22} {'ok':>5} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+        for label, wrong in (("legacy + rehash", False), ("hashed", False), ("wrong password", True)):
+            ok, elapsed, lat = run_round(args.users, args.threads, wrong)
+            p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+            print(f"{label:<22} {ok:>5} {args.users / elapsed:>9.1f} "
+                  f"{statistics.median(lat) * 1000:>8.1f} {p95 * 1000:>8.1f}")
+
+        stored = [r["password"] for r in db.run_query("SELECT password FROM customer", fetch=True)]
+        left = sum(credentials.needs_rehash(p) for p in stored)
+        print("OK: every password is hashed" if not left else f"FAIL: {left} passwords not rehashed")
+    finally:
+        db.close_pool()
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
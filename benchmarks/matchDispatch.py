@@ -0,0 +1,116 @@
+"""
+Matching engine benchmark: pending trips vs. available drivers.
+
+Each strategy runs on a fresh copy of the same synthetic database,
+with random positions around Kathmandu, until nothing more can be
+assigned.
+
+    python benchmarks/matchDispatch.py --trips 10000 --drivers 2000
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import databaseConnection as db  # noqa: E402
+import driverLocation  # noqa: E402
+import matchingEngine  # noqa: E402
+from geo import haversine_km  # noqa: E402
+
+# Kathmandu valley bounding box
+LAT_RANGE = (27.62, 27.78)
+LON_RANGE = (85.25, 85.45)
+
+
+def random_point(rnd):
+    return (rnd.uniform(*LAT_RANGE), rnd.uniform(*LON_RANGE))
+
+
+def seed_database(path, trips, drivers, driver_pos):
+    db.SQLITE_DB_FILE = path
+    db.create_tables()
+    with db.transaction() as tx:
+        tx.execute("INSERT INTO customer (name, email) VALUES ('Bench', 'bench@example.com')")
+        tx.execute(
+            "INSERT INTO driver (name, email, available) VALUES (?, ?, 1)",
+            [(f"Driver {i}", f"driver{i}@example.com") for i in range(drivers)],
+            many=True,
+        )
+        tx.execute(
+            "INSERT INTO trip (customer_id, pickup, dropoff, fare, status, created_at) "
+            "VALUES (1, 'A', 'B', 100, 'requested', datetime('now', ?))",
+            [(f"-{trips - i} seconds",) for i in range(trips)],
+            many=True,
+        )
+    driverLocation.ingest_pings((i, lat, lon) for i, (lat, lon) in driver_pos.items())
+    db.close_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trips", type=int, default=10000)
+    parser.add_argument("--drivers", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--hungarian-batch", type=int, default=50)
+    parser.add_argument("--strategies", default=",".join(matchingEngine.STRATEGIES))
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    trip_pos = {i: random_point(rnd) for i in range(1, args.trips + 1)}
+    driver_pos = {i: random_point(rnd) for i in range(1, args.drivers + 1)}
+
+    workdir = tempfile.mkdtemp()
+    template = os.path.join(workdir, "template.db")
+    seed_database(template, args.trips, args.drivers, driver_pos)
+
+    print(f"{args.trips} pending trips, {args.drivers} available drivers")
+    print(f"{'strategy':<15} {'assigned':>9} {'batches':>8} {'seconds':>8} {'trips/s':>9} {'mean km':>8}")
+
+    runs = []
+    for strategy in args.strategies.split(","):
+        runs.append((strategy, False))
+        if strategy != "fifo":
+            runs.append((strategy, True))
+
+    for strategy, use_grid in runs:
+        label = strategy + ("+grid" if use_grid else "")
+        path = os.path.join(workdir, f"{label}.db")
+        shutil.copy(template, path)
+        db.SQLITE_DB_FILE = path
+
+        options = {}
+        if use_grid:
+            options["index"] = driverLocation.load_index()
+        else:
+            options["driver_location"] = lambda d: driver_pos[d["id"]]
+
+        engine = matchingEngine.MatchingEngine(
+            strategy=strategy,
+            batch_size=args.hungarian_batch if strategy == "hungarian" else args.batch_size,
+            trip_location=lambda t: trip_pos[t["id"]],
+            **options,
+        )
+
+        start = time.perf_counter()
+        engine.run_until_idle()
+        elapsed = time.perf_counter() - start
+
+        rows = db.run_query("SELECT id, driver_id FROM trip WHERE status='assigned'", fetch=True)
+        dist = [haversine_km(trip_pos[r["id"]], driver_pos[r["driver_id"]]) for r in rows]
+        mean = sum(dist) / len(dist) if dist else 0.0
+
+        print(
+            f"{label:<15} {engine.assigned:>9} {engine.batches:>8} "
+            f"{elapsed:>8.2f} {engine.assigned / elapsed:>9,.0f} {mean:>8.2f}"
+        )
+        db.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+k-nearest available driver lookups on driverLocation.GridIndex.
+
+Builds an in-memory index of random drivers around Kathmandu, checks a
+sample of answers against a brute-force scan and reports time per query.
+
+    python benchmarks/nearestDriver.py --drivers 50000 --k 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import driverLocation  # noqa: E402
+
+LAT_RANGE = (27.62, 27.78)
+LON_RANGE = (85.25, 85.45)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--drivers", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=10000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--available", type=float, default=0.6, help="share of free drivers")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    index = driverLocation.GridIndex()
+    for i in range(args.drivers):
+        index.update(
+            i,
+            rnd.uniform(*LAT_RANGE),
+            rnd.uniform(*LON_RANGE),
+            available=rnd.random() < args.available,
+        )
+    points = [(rnd.uniform(*LAT_RANGE), rnd.uniform(*LON_RANGE)) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    for lat, lon in points:
+        index.nearest(lat, lon, k=args.k)
+    grid = (time.perf_counter() - start) / len(points)
+
+    free = [i for i in range(args.drivers) if i in index]
+    sample = points[:50]
+    start = time.perf_counter()
+    for lat, lon in sample:
+        brute = sorted(
+            free,
+            key=lambda i: driverLocation._approx_km(lat, lon, *index.position(i)),
+        )[: args.k]
+        got = [d for d, _ in index.nearest(lat, lon, k=args.k)]
+        assert got == brute, (got, brute)
+    scan = (time.perf_counter() - start) / len(sample)
+
+    print(f"{len(index)} available of {args.drivers} drivers, k={args.k}")
+    print(f"grid index:  {grid * 1e6:10.1f} us/query")
+    print(f"full scan:   {scan * 1e6:10.1f} us/query (results match)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Startup benchmark: time from process start to the Welcomepage window mapped.
+
+Each run starts a fresh interpreter that imports Welcomepage, brings the
+schema up to date on a copy of the database, builds the main window and
+exits once it is mapped. --eager also imports every portal module up
+front, the way Welcomepage used to. Needs a display.
+
+    python benchmarks/startup.py --runs 10
+    python benchmarks/startup.py --runs 10 --eager
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+PORTALS = ("customerRegistration", "forgotPassword", "dashboard", "customerDashboard", "driverDashboard")
+
+CHILD = """
+import time
+t0 = time.perf_counter()
+import json, sys
+sys.path.insert(0, {root!r})
+import Welcomepage
+for name in {eager!r}:
+    __import__(name)
+t1 = time.perf_counter()
+import databaseConnection as db
+db.SQLITE_DB_FILE = {db_file!r}
+db.create_tables()
+t2 = time.perf_counter()
+root = Welcomepage.build_main_window()
+t3 = time.perf_counter()
+
+def mapped(event):
+    if event.widget is root:
+        t4 = time.perf_counter()
+        print("STARTUP " + json.dumps({{"import": t1 - t0, "schema": t2 - t1, "build": t3 - t2, "map": t4 - t3}}))
+        root.after(0, root.destroy)
+
+root.bind("<Map>", mapped)
+root.mainloop()
+"""
+
+
+def run_once(db_file, eager):
+    code = CHILD.format(root=os.path.abspath(ROOT), eager=PORTALS if eager else (), db_file=db_file)
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=60)
+    total = time.perf_counter() - start
+    for line in out.stdout.splitlines():
+        if line.startswith("STARTUP "):
+            phases = json.loads(line[len("STARTUP "):])
+            phases["total"] = total
+            return phases
+    raise RuntimeError(out.stderr.strip() or "window was never mapped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--eager", action="store_true", help="import all portals up front")
+    parser.add_argument("--db", default=os.path.join(ROOT, "taxibooking.db"))
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    db_file = os.path.join(folder, "startup.db")
+    shutil.copy(args.db, db_file)
+    try:
+        run_once(db_file, args.eager)  # migrate the copy and warm the OS cache
+        runs = [run_once(db_file, args.eager) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    print(f"{args.runs} runs, portals {'eager' if args.eager else 'lazy'} (median ms)")
+    for phase in ("import", "schema", "build", "map", "total"):
+        print(f"  {phase:<8} {statistics.median(r[phase] for r in runs) * 1000:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
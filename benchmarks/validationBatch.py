@@ -0,0 +1,93 @@
+"""
+Validation benchmark: per-record form checks vs. validation.check_columns.
+
+Random driver records (about a fifth with one broken field) are checked
+the old way (re.match with pattern strings, one record at a time), with
+validation.driver_errors per record, and column by column; the three must
+agree on which records are invalid.
+
+    python benchmarks/validationBatch.py --rows 100000
+"""
+import argparse
+import os
+import random
+import re
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import validation  # noqa: E402
+
+FIELDS = ("name", "email", "phone", "license", "password")
+
+
+def random_record(rnd):
+    first = "".join(rnd.choice(string.ascii_letters) for _ in range(rnd.randint(3, 9)))
+    record = [
+        f"{first} {rnd.choice(['Shrestha', 'Gurung', 'Thapa', 'Rai'])}",
+        f"{first.lower()}{rnd.randint(1, 99999)}@mail.np",
+        "98" + "".join(rnd.choice(string.digits) for _ in range(8)),
+        f"LIC-{rnd.randint(1000, 999999)}",
+        first + str(rnd.randint(10, 9999)),
+    ]
+    if rnd.random() < 0.2:
+        broken = rnd.randrange(len(record))
+        record[broken] = rnd.choice(["", "x", "no-at-sign.np", "12345", "abc!!", "onlyletters"])
+    return record
+
+
+def old_rules(name, email, phone, lic, pw):
+    """The checks as the forms wrote them before the validation module."""
+    return (
+        len(name) >= 3 and re.match(r"^[A-Za-z\s'.-]+$", name)
+        and re.match(r"^[^@]+@[^@]+\.[^@]+$", email)
+        and phone.isdigit() and len(phone) == 10
+        and len(lic) >= 3 and re.match(r"^[A-Za-z0-9\- ]+$", lic)
+        and len(pw) >= 6 and re.search(r"[A-Za-z]", pw) and re.search(r"\d", pw)
+    )
+
+
+def per_record_old(records):
+    return {i for i, r in enumerate(records) if not old_rules(*r)}
+
+
+def per_record_new(records):
+    return {i for i, r in enumerate(records) if validation.driver_errors(*r)}
+
+
+def columns(records):
+    cols = dict(zip(FIELDS, zip(*records)))
+    return {i for bad in validation.check_columns(cols).values() for i in bad}
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    records = [random_record(rnd) for _ in range(args.rows)]
+
+    expected, base = timed(per_record_old, records)
+    print(f"{args.rows:,} records, {len(expected):,} invalid")
+    print(f"{'method':<22} {'seconds':>8} {'records/s':>12} {'speedup':>8}  agrees")
+    for label, func in (
+        ("re.match per record", per_record_old),
+        ("driver_errors", per_record_new),
+        ("check_columns", columns),
+    ):
+        result, s = timed(func, records)
+        print(f"{label:<22} {s:>8.3f} {args.rows / s:>12,.0f} {base / s:>7.1f}x  {result == expected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import tkinter as tk
+from collections import namedtuple
+from sqlite3 import Error
+
+import databaseConnection as db
+import queries
+import uiWorker
+
+# Live trip updates for open dashboards.
+# Triggers on trip append to the trip_event log (migration 7). The feed
+# keeps its own read-only connection and polls PRAGMA data_version, which
+# only changes when another connection commits, so an idle feed costs
+# one in-memory PRAGMA per tick. When it changes, only the events after
+# the last one seen are read and handed to matching subscribers on the
+# Tk thread. Polling stops while nobody is subscribed.
+# The timer runs on the Tk root of a subscriber. Dashboards each create
+# their own tk.Tk, so when that root is destroyed the next subscribe()
+# moves the timer to the new subscriber's root.
+
+POLL_MS = 250
+BATCH = 500          # events read per query
+KEEP_EVENTS = 100000  # older events are pruned when the feed starts
+
+Event = namedtuple("Event", "id trip_id kind status customer_id driver_id old_driver_id")
+
+
+class Subscription:
+    __slots__ = ("callback", "widget", "customer_id", "driver_id")
+
+    def __init__(self, callback, widget, customer_id, driver_id):
+        self.callback = callback
+        self.widget = widget
+        self.customer_id = customer_id
+        self.driver_id = driver_id
+
+    def matches(self, e):
+        if self.customer_id is not None and e.customer_id != self.customer_id:
+            return False
+        if self.driver_id is not None and self.driver_id not in (e.driver_id, e.old_driver_id):
+            return False
+        return True
+
+
+class ChangeFeed:
+    def __init__(self, widget, poll_ms=POLL_MS):
+        self.root = widget.nametowidget(".")
+        self.poll_ms = poll_ms
+        self.subscriptions = []
+        self.conn = None
+        self.version = None
+        self.last_id = 0
+        self._timer = None
+
+    def subscribe(self, callback, widget, customer_id=None, driver_id=None):
+        """
+        Call callback(events) on the Tk thread with each batch of new trip
+        events for this customer and/or driver (all events if neither is
+        given). Dropped automatically once widget is destroyed.
+        """
+        sub = Subscription(callback, widget, customer_id, driver_id)
+        self.subscriptions.append(sub)
+        root = widget.nametowidget(".")
+        if root is not self.root and not _alive(self.root):
+            # the timer's root is gone, and a pending after() went with it
+            self.root = root
+            self._timer = None
+        if self._timer is None:
+            self._start()
+        return sub
+
+    def unsubscribe(self, sub):
+        if sub in self.subscriptions:
+            self.subscriptions.remove(sub)
+
+    def _start(self):
+        if self.conn is None:
+            self.conn = db.create_connection()
+            if self.conn is None:
+                return
+            uiWorker.get_executor().submit(prune)
+        try:
+            # start from now; dashboards load current state themselves
+            self.version = self._data_version()
+            self.last_id = self.conn.execute(queries.get("trip_event_latest").sql).fetchone()[0]
+        except Error as e:
+            print("Change feed error:", e)
+            return
+        self._schedule()
+
+    def _schedule(self):
+        try:
+            self._timer = self.root.after(self.poll_ms, self._poll)
+        except tk.TclError:  # application closed
+            self._timer = None
+
+    def _data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _poll(self):
+        self._timer = None
+        self.subscriptions = [s for s in self.subscriptions if _alive(s.widget)]
+        if not self.subscriptions:
+            return
+
+        try:
+            version = self._data_version()
+            if version != self.version:
+                self.version = version
+                self._dispatch(self._read())
+        except Error as e:
+            print("Change feed error:", e)
+        finally:
+            if self.subscriptions:
+                self._schedule()
+
+    def _read(self):
+        events = []
+        sql = queries.get("trip_events_since").sql
+        while True:
+            rows = self.conn.execute(sql, (self.last_id, BATCH)).fetchall()
+            events += [Event(*r) for r in rows]
+            if rows:
+                self.last_id = rows[-1][0]
+            if len(rows) < BATCH:
+                return events
+
+    def _dispatch(self, events):
+        if not events:
+            return
+        for sub in list(self.subscriptions):
+            mine = [e for e in events if sub.matches(e)]
+            if mine:
+                try:
+                    sub.callback(mine)
+                except Exception as e:
+                    print("Change feed callback error:", e)
+
+
+def _alive(widget):
+    try:
+        return bool(widget.winfo_exists())
+    except tk.TclError:
+        return False
+
+
+def prune(keep=KEEP_EVENTS):
+    return db.run_named("trip_event_prune", (keep,))
+
+
+_feed = None
+
+
+def get_feed(widget):
+    """The process-wide feed (created on first use)."""
+    global _feed
+    if _feed is None:
+        _feed = ChangeFeed(widget)
+    return _feed
+
+
+def subscribe(callback, widget, customer_id=None, driver_id=None):
+    return get_feed(widget).subscribe(callback, widget, customer_id, driver_id)
@@ -0,0 +1,141 @@
+import base64
+import hashlib
+import hmac
+import os
+
+import databaseConnection as db
+
+# Password hashing.
+# Passwords are stored as "scrypt$<log2 n>$<r>$<p>$<salt>$<hash>", or
+# "pbkdf2_sha256$<iterations>$<salt>$<hash>" where hashlib has no scrypt,
+# with a random salt per password. Any other value in a password column
+# is a legacy plain-text password: it still verifies, and login() swaps
+# it for a hash (as it does for hashes made with a lower cost).
+# Hashing is slow on purpose, so call these from a worker thread
+# (uiWorker), never on the Tk thread. hashlib releases the GIL while it
+# hashes, so hash_many spreads a batch over HASH_THREADS threads.
+
+SCRYPT_LOG2_N = 14   # memory and time cost: 128 * r * 2**14 bytes = 16 MB
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 600000
+SALT_BYTES = 16
+KEY_BYTES = 32
+HASH_THREADS = os.cpu_count() or 2
+
+HAS_SCRYPT = hasattr(hashlib, "scrypt")
+
+# account kind -> (lookup query, rehash query)
+ACCOUNTS = {
+    "customer": ("customer_by_email", "customer_set_password"),
+    "driver": ("driver_by_email", "driver_set_password"),
+    "admin": ("admin_by_username", "admin_set_password"),
+}
+
+
+def _b64(raw):
+    return base64.b64encode(raw).decode("ascii")
+
+
+def _scrypt(password, salt, log2_n, r, p):
+    return hashlib.scrypt(
+        password.encode("utf-8"), salt=salt, n=1 << log2_n, r=r, p=p,
+        maxmem=256 * r * (1 << log2_n), dklen=KEY_BYTES,
+    )
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations, KEY_BYTES)
+
+
+def hash_password(password, log2_n=None, salt=None):
+    """
+    Salted hash of password in the storage format above. salt defaults
+    to SALT_BYTES random bytes; pass one only for reproducible test data.
+    """
+    salt = salt or os.urandom(SALT_BYTES)
+    if HAS_SCRYPT:
+        log2_n = log2_n or SCRYPT_LOG2_N
+        key = _scrypt(password, salt, log2_n, SCRYPT_R, SCRYPT_P)
+        return f"scrypt${log2_n}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(key)}"
+    key = _pbkdf2(password, salt, PBKDF2_ITERATIONS)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${_b64(salt)}${_b64(key)}"
+
+
+def _parse(stored):
+    """(scheme, params, salt, key) or None for a legacy plain-text value."""
+    parts = (stored or "").split("$")
+    try:
+        if parts[0] == "scrypt" and len(parts) == 6:
+            params = tuple(int(x) for x in parts[1:4])
+        elif parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            params = (int(parts[1]),)
+        else:
+            return None
+        return parts[0], params, base64.b64decode(parts[-2]), base64.b64decode(parts[-1])
+    except ValueError:
+        return None
+
+
+def verify(password, stored):
+    """True if password matches the stored hash (or legacy plain text)."""
+    if stored is None:
+        return False
+    parsed = _parse(stored)
+    if parsed is None:
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    scheme, params, salt, key = parsed
+    if scheme == "scrypt":
+        if not HAS_SCRYPT:
+            return False
+        candidate = _scrypt(password, salt, *params)
+    else:
+        candidate = _pbkdf2(password, salt, *params)
+    return hmac.compare_digest(candidate, key)
+
+
+def needs_rehash(stored):
+    """True for plain text and for hashes weaker than the current settings."""
+    parsed = _parse(stored)
+    if parsed is None:
+        return True
+    scheme, params, _, _ = parsed
+    if HAS_SCRYPT:
+        return scheme != "scrypt" or params < (SCRYPT_LOG2_N, SCRYPT_R, SCRYPT_P)
+    return scheme != "pbkdf2_sha256" or params[0] < PBKDF2_ITERATIONS
+
+
+def hash_many(passwords, threads=HASH_THREADS):
+    """hash_password for each password, hashed in parallel; keeps order."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="hash") as pool:
+        return list(pool.map(hash_password, passwords))
+
+
+_dummy_hash = None
+
+
+def login(kind, username, password):
+    """
+    The account row of `kind` ("customer", "driver" or "admin") for this
+    username and password, or None. A legacy or outdated hash is replaced
+    on success. Blocks for one hash; run it on a worker thread.
+    """
+    global _dummy_hash
+    lookup, rehash = ACCOUNTS[kind]
+    rows = db.run_named(lookup, (username,))
+    if not rows:
+        # hash anyway, so unknown usernames take as long as wrong passwords
+        if _dummy_hash is None:
+            _dummy_hash = hash_password("dummy password")
+        verify(password, _dummy_hash)
+        return None
+
+    row = rows[0]
+    if not verify(password, row["password"]):
+        return None
+    if needs_rehash(row["password"]):
+        # only if nobody changed the password in the meantime
+        db.run_named(rehash, (hash_password(password), row["id"], row["password"]))
+    return row
@@ -1,7 +1,12 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
 import databaseConnection as db
-import re
+import geocoding
+import fareEngine
+from treeBinding import TreeBinding
+import uiWorker
+import changeFeed
+import validation
 
 # Theme colors
 PRIMARY_YELLOW = "#FFC300"
@@ -62,11 +67,46 @@ def apply_styles():
     )
 
 
+#  Data layer (no Tk; run on the worker, also driven by benchmarks/dayOfOperations.py)
+def book_trip(fields, fare, method):
+    """
+    Insert a trip (fields in trip_insert order, without coordinates) and
+    its payment. Returns the new trip id.
+    """
+    coords = geocoding.geocode_trip(fields[2], fields[3])
+    # trip + payment in one commit, so no orphan payments
+    with db.transaction() as tx:
+        trip_id = tx.run("trip_insert", (*fields, *coords, unplaced(coords)))
+        tx.run("payment_insert", (trip_id, fare, method, "paid"))
+    return trip_id
+
+
+def unplaced(coords):
+    """1 if an end could not be geocoded, i.e. the fare is fareEngine's fallback."""
+    return int(None in coords)
+
+
+def cancel_booking(trip_id):
+    """Cancel a trip and free its driver. False if the trip does not exist."""
+    with db.transaction() as tx:
+        trip_info = tx.run("trip_state", (trip_id,))
+        if not trip_info:
+            return False
+
+        driver_id = trip_info[0]["driver_id"]
+        tx.run("trip_cancel", (trip_id,))
+        if driver_id:
+            tx.run("driver_set_available", (driver_id,))
+    return True
+
+
 class CustomerDashboard:
-    def __init__(self, customer):
-        self.customer = customer
+    def __init__(self, customer_session):
+        # the profile is read from the session, never queried again
+        self.session = customer_session
+        self.customer = customer = customer_session.user
         self.win = tk.Tk()
-        self.win.title(f"Customer Dashboard • {customer['name']}")
+        self.win.title(f"Customer Dashboard • {customer.name}")
         self.win.geometry("1200x700")
         self.win.configure(bg=PRIMARY_DARK)
 
@@ -103,7 +143,7 @@ class CustomerDashboard:
 
         tk.Label(
             welcome_box,
-            text=f"Welcome, {customer['name']}",
+            text=f"Welcome, {customer.name}",
             font=("Segoe UI", 12, "bold"),
             bg=PRIMARY_DARK,
             fg=PRIMARY_YELLOW,
@@ -170,6 +210,9 @@ class CustomerDashboard:
         self.fare = self.create_form_entry(
             form_container, "Estimated Fare (Rs.)", 6
         )
+        self.fare.configure(state="readonly")
+        for entry in (self.pick, self.drop, self.pick_date, self.pick_time):
+            entry.bind("<FocusOut>", lambda e: self.update_fare_estimate())
 
         ttk.Button(
             left_frame,
@@ -245,6 +288,8 @@ class CustomerDashboard:
         vsb.pack(side="right", fill="y")
         hsb.pack(side="bottom", fill="x")
         self.tree.pack(side="left", fill="both", expand=True)
+        self.worker = uiWorker.Worker(self.win)
+        self.trips = TreeBinding(self.tree, "customer_trips", self.render_trip)
 
         # Trip action buttons
         btn_box = tk.Frame(right_frame, bg=CARD_BG)
@@ -272,6 +317,8 @@ class CustomerDashboard:
         ).pack(side="left")
 
         self.show_trips()
+        # driver assigned, trip completed, ... show up without Refresh
+        changeFeed.subscribe(lambda events: self.show_trips(), self.win, customer_id=self.customer.id)
         self.win.mainloop()
 
     #  helpers to keep popups tied to parent 
@@ -301,14 +348,23 @@ class CustomerDashboard:
         entry.grid(row=row, column=1, sticky="w", pady=(0, 10), padx=(10, 0))
         return entry
 
+    def quote_fare(self, pickup, dropoff, date_str, time_str):
+        return fareEngine.quote(pickup, dropoff, fareEngine.pickup_datetime(date_str, time_str))
+
+    def update_fare_estimate(self):
+        q = None
+        if self.pick.get().strip() and self.drop.get().strip():
+            q = self.quote_fare(self.pick.get(), self.drop.get(), self.pick_date.get(), self.pick_time.get())
+        self.fare.configure(state="normal")
+        self.fare.delete(0, tk.END)
+        if q and q.estimated:
+            self.fare.insert(0, f"{q.fare} (estimate, unknown address)")
+        elif q:
+            self.fare.insert(0, f"{q.fare} ({q.tariff}, {q.km:.1f} km)")
+        self.fare.configure(state="readonly")
+
     def validate_datetime(self, date_str, time_str):
-        date_pattern = r"^\d{4}-\d{2}-\d{2}$"
-        time_pattern = r"^\d{2}:\d{2}:\d{2}$"
-        if date_str and not re.match(date_pattern, date_str):
-            return "Date must be in YYYY-MM-DD format."
-        if time_str and not re.match(time_pattern, time_str):
-            return "Time must be in HH:MM:SS (24hr) format."
-        return None
+        return validation.datetime_error(date_str, time_str)
 
     def cancel_trip_handler(self):
         selected_item = self.tree.focus()
@@ -332,27 +388,17 @@ class CustomerDashboard:
             self.cancel_trip(trip_id)
 
     def cancel_trip(self, trip_id):
-        trip_info = db.run_query(
-            "SELECT driver_id, status FROM trip WHERE id=?",
-            (trip_id,),
-            fetch=True,
-        )
-        if not trip_info:
-            return
+        def done(cancelled):
+            if cancelled:
+                messagebox.showinfo("Success", "Trip cancelled.", parent=self.win)
+            self.show_trips()
 
-        driver_id = trip_info[0]["driver_id"]
-        try:
-            db.run_query(
-                "UPDATE trip SET status='cancelled', dropoff_date=NULL, dropoff_time=NULL WHERE id=?",
-                (trip_id,),
-            )
-            if driver_id:
-                db.run_query("UPDATE driver SET available=1 WHERE id=?", (driver_id,))
-            messagebox.showinfo("Success", "Trip cancelled.", parent=self.win)
-        except Exception as e:
+        def failed(e):
             messagebox.showerror("Error", f"Failed to cancel: {e}", parent=self.win)
+            self.show_trips()
 
-        self.show_trips()
+        self.worker.submit(cancel_booking, trip_id, on_done=done, on_error=failed, key="cancel", replace=False,
+                           busy=self.win)
 
     def open_update_window(self):
         selected_item = self.tree.focus()
@@ -367,11 +413,14 @@ class CustomerDashboard:
             messagebox.showerror("Error", "Only 'requested' trips can be updated.", parent=self.win)
             return
 
-        current_data = db.run_query(
-            "SELECT pickup, dropoff, pickup_date, pickup_time, dropoff_date, dropoff_time, fare FROM trip WHERE id=?",
-            (trip_id,),
-            fetch=True,
+        self.worker.submit(
+            db.run_named, "trip_details", (trip_id,),
+            on_done=lambda rows: self.show_update_window(trip_id, rows),
+            key="details",
+            busy=self.win,
         )
+
+    def show_update_window(self, trip_id, current_data):
         if not current_data:
             return
         data = current_data[0]
@@ -427,7 +476,8 @@ class CustomerDashboard:
         self.u_pick_time = create_u_entry("Pickup Time", data["pickup_time"])
         self.u_drop_date = create_u_entry("Dropoff Date (Opt.)", data["dropoff_date"])
         self.u_drop_time = create_u_entry("Dropoff Time (Opt.)", data["dropoff_time"])
-        self.u_fare = create_u_entry("New Fare", float(data["fare"]))
+        self.u_fare = create_u_entry("Current Fare", float(data["fare"]))
+        self.u_fare.configure(state="readonly")
 
         ttk.Button(
             inner,
@@ -440,7 +490,6 @@ class CustomerDashboard:
         vals = [
             self.u_pick.get(),
             self.u_drop.get(),
-            self.u_fare.get(),
             self.u_pick_date.get(),
             self.u_pick_time.get(),
         ]
@@ -453,61 +502,65 @@ class CustomerDashboard:
             messagebox.showerror("Error", err, parent=window)
             return
 
-        try:
-            q = """
-            UPDATE trip SET pickup=?, dropoff=?, pickup_date=?, pickup_time=?,
-                            dropoff_date=?, dropoff_time=?, fare=?
-            WHERE id=? AND status='requested'
-            """
-            db.run_query(
-                q,
-                (
-                    self.u_pick.get(),
-                    self.u_drop.get(),
-                    self.u_pick_date.get(),
-                    self.u_pick_time.get(),
-                    self.u_drop_date.get() or None,
-                    self.u_drop_time.get() or None,
-                    float(self.u_fare.get()),
-                    trip_id,
-                ),
-            )
-            messagebox.showinfo("Success", "Trip updated.", parent=window)
+        q = self.quote_fare(self.u_pick.get(), self.u_drop.get(), self.u_pick_date.get(), self.u_pick_time.get())
+        if q is None:
+            messagebox.showerror("Error", "Could not price this trip right now. Please try again.", parent=window)
+            return
+
+        pick, drop = self.u_pick.get(), self.u_drop.get()
+        fields = (
+            pick,
+            drop,
+            self.u_pick_date.get(),
+            self.u_pick_time.get(),
+            self.u_drop_date.get() or None,
+            self.u_drop_time.get() or None,
+            q.fare,
+        )
+
+        def work():
+            coords = geocoding.geocode_trip(pick, drop)
+            with db.transaction() as tx:
+                if not tx.run("trip_update_requested", (*fields, *coords, unplaced(coords), trip_id)):
+                    return None
+                # a paid trip keeps the fare it was charged
+                return tx.run("trip_details", (trip_id,))[0]["fare"]
+
+        def done(fare):
+            if fare is None:
+                messagebox.showerror("Error", "Update failed.", parent=window)
+                return
+            if fare != q.fare:
+                messagebox.showinfo("Success", f"Trip updated. The fare stays at Rs. {fare}, as already paid.",
+                                    parent=window)
+            else:
+                messagebox.showinfo("Success", "Trip updated.", parent=window)
             window.destroy()
             self.show_trips()
-        except Exception as e:
+
+        def failed(e):
             messagebox.showerror("Error", f"Update failed: {e}", parent=window)
 
+        self.worker.submit(work, on_done=done, on_error=failed, key="update", replace=False, busy=window)
+
     def show_trips(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-
-        q = """
-        SELECT t.id, d.name AS driver, t.pickup, t.dropoff, t.pickup_date, t.pickup_time,
-               t.dropoff_date, t.dropoff_time, t.fare, t.status
-        FROM trip t
-        LEFT JOIN driver d ON t.driver_id = d.id
-        WHERE t.customer_id=?
-        ORDER BY t.created_at DESC
-        """
-        rows = db.run_query(q, (self.customer["id"],), fetch=True) or []
-        for r in rows:
-            self.tree.insert(
-                "",
-                "end",
-                values=(
-                    r["id"],
-                    r["driver"] or "Not assigned",
-                    r["pickup"],
-                    r["dropoff"],
-                    str(r["pickup_date"]),
-                    str(r["pickup_time"]),
-                    str(r["dropoff_date"] or ""),
-                    str(r["dropoff_time"] or ""),
-                    float(r["fare"]),
-                    r["status"],
-                ),
-            )
+        self.trips.refresh((self.customer.id,), self.worker)
+
+    @staticmethod
+    def render_trip(r):
+        values = (
+            r["id"],
+            r["driver"] or "Not assigned",
+            r["pickup"],
+            r["dropoff"],
+            str(r["pickup_date"]),
+            str(r["pickup_time"]),
+            str(r["dropoff_date"] or ""),
+            str(r["dropoff_time"] or ""),
+            float(r["fare"]),
+            r["status"],
+        )
+        return values, ()
 
     def clear_booking_form(self):
         for entry in (
@@ -517,15 +570,14 @@ class CustomerDashboard:
             self.pick_time,
             self.drop_date,
             self.drop_time,
-            self.fare,
         ):
             entry.delete(0, tk.END)
+        self.update_fare_estimate()
 
     def open_payment_window(self):
         vals = [
             self.pick.get(),
             self.drop.get(),
-            self.fare.get(),
             self.pick_date.get(),
             self.pick_time.get(),
         ]
@@ -538,11 +590,19 @@ class CustomerDashboard:
             messagebox.showerror("Error", err, parent=self.win)
             return
 
-        try:
-            self.temp_fare = float(self.fare.get())
-        except Exception:
-            messagebox.showerror("Error", "Invalid fare amount.", parent=self.win)
+        q = self.quote_fare(self.pick.get(), self.drop.get(), self.pick_date.get(), self.pick_time.get())
+        if q is None:
+            messagebox.showerror("Error", "Could not price this trip right now. Please try again.", parent=self.win)
             return
+        if q.estimated and not messagebox.askyesno(
+            "Estimated Fare",
+            f"The pickup or dropoff is not a known place, so Rs. {q.fare} is an estimate "
+            "that our staff will review. Book anyway?",
+            parent=self.win,
+        ):
+            return
+        self.temp_fare = float(q.fare)
+        self.update_fare_estimate()
 
         pay_win = tk.Toplevel(self.win)
         pay_win.title("Payment Gateway")
@@ -607,43 +667,33 @@ class CustomerDashboard:
         ).pack(pady=28, fill="x")
 
     def process_payment(self, window):
-        try:
-            method = self.payment_method.get()
-
-            pay_id = db.run_query(
-                "INSERT INTO payment (trip_id, amount, method, status) VALUES (NULL, ?, ?, 'paid')",
-                (self.temp_fare, method),
-            )
-
-            driver_id = None
-            status = "requested"
-
-            trip_id = db.run_query(
-                """
-                INSERT INTO trip (customer_id, driver_id, pickup, dropoff, pickup_date, pickup_time,
-                                  dropoff_date, dropoff_time, fare, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    self.customer["id"],
-                    driver_id,
-                    self.pick.get(),
-                    self.drop.get(),
-                    self.pick_date.get(),
-                    self.pick_time.get(),
-                    self.drop_date.get() or None,
-                    self.drop_time.get() or None,
-                    self.temp_fare,
-                    status,
-                ),
-            )
-
-            db.run_query("UPDATE payment SET trip_id=? WHERE id=?", (trip_id, pay_id))
+        method = self.payment_method.get()
+
+        driver_id = None
+        status = "requested"
+        fare = self.temp_fare
+        fields = (
+            self.customer.id,
+            driver_id,
+            self.pick.get(),
+            self.drop.get(),
+            self.pick_date.get(),
+            self.pick_time.get(),
+            self.drop_date.get() or None,
+            self.drop_time.get() or None,
+            fare,
+            status,
+        )
 
+        def done(result):
             window.destroy()
             messagebox.showinfo("Success", f"Trip booked successfully! Status: {status}", parent=self.win)
             self.show_trips()
             self.clear_booking_form()
 
-        except Exception as e:
+        def failed(e):
             messagebox.showerror("Error", f"Payment/Booking failed: {e}", parent=window)
+
+        # replace=False: a second click while booking is ignored, not a second trip
+        self.worker.submit(book_trip, fields, fare, method, on_done=done, on_error=failed, key="book",
+                           replace=False, busy=window)
@@ -1,7 +1,9 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
-import re
 import databaseConnection as db
+import credentials
+import uiWorker
+import validation
 
 # Theme colors
 PRIMARY_YELLOW = "#FFC300"
@@ -136,55 +138,43 @@ def open_registration(parent=None):
             messagebox.showerror("Error", "All fields are required.", parent=win)
             return
 
-        if len(n) < 3 or not re.match(r"^[A-Za-z\s'.-]+$", n):
-            messagebox.showerror(
-                "Invalid Name",
-                "Name must be at least 3 characters and contain letters only.",
-                parent=win,
-            )
+        errors = validation.customer_errors(n, em, phone, pwd)
+        if errors:
+            messagebox.showerror(*errors[0], parent=win)
             return
 
-        if not re.match(r"^[^@]+@[^@]+\.[^@]+$", em):
-            messagebox.showerror("Invalid Email", "Please enter a valid email address.", parent=win)
-            return
-
-        if not phone.isdigit() or len(phone) != 10:
-            messagebox.showerror("Invalid Telephone", "Telephone must be exactly 10 digits.", parent=win)
-            return
-
-        if len(pwd) < 6 or not re.search(r"[A-Za-z]", pwd) or not re.search(r"\d", pwd):
-            messagebox.showerror(
-                "Weak Password",
-                "Password must be at least 6 characters and contain letters & numbers.",
-                parent=win,
-            )
-            return
-
-        check = db.run_query("SELECT 1 FROM customer WHERE email=?", (em,), fetch=True)
-        if check:
-            messagebox.showerror(
-                "Email Already Registered",
-                "This email is already registered.\nPlease login instead.",
-                parent=win,
-            )
-            return
-
-        try:
-            db.run_query(
-                "INSERT INTO customer (name, email, telephone, password) VALUES (?,?,?,?)",
-                (n, em, phone, pwd),
-            )
-            messagebox.showinfo("Success", "Registration successful! Please login.", parent=win)
-            win.destroy()
-        except Exception as e:
+        # hashing the password takes a while; do it on a worker thread
+        def work():
+            if db.run_named("customer_by_email", (em,)):
+                return False
+            return db.run_named("customer_insert", (n, em, phone, credentials.hash_password(pwd)))
+
+        def done(result):
+            if result is False:
+                messagebox.showerror(
+                    "Email Already Registered",
+                    "This email is already registered.\nPlease login instead.",
+                    parent=win,
+                )
+            elif result is None:
+                messagebox.showerror("Error", "Registration failed.", parent=win)
+            else:
+                messagebox.showinfo("Success", "Registration successful! Please login.", parent=win)
+                win.destroy()
+
+        def failed(e):
             messagebox.showerror("Error", f"Registration failed:\n{e}", parent=win)
 
-    ttk.Button(
+        worker.submit(work, on_done=done, on_error=failed, key="register", replace=False, busy=button)
+
+    worker = uiWorker.Worker(win)
+    button = ttk.Button(
         inner,
         text="Create Account",
         style="Primary.TButton",
         command=register,
-    ).pack(fill="x", pady=(26, 8))
+    )
+    button.pack(fill="x", pady=(26, 8))
 
     tk.Label(
         inner,
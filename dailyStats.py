@@ -0,0 +1,115 @@
+import datetime
+from collections import namedtuple
+
+import databaseConnection as db
+import migrations
+
+# Admin KPIs from the daily_stats table (migration 8).
+# Triggers on trip and payment keep one row per (day, trip status) and
+# (day, payment method) current, so a summary reads O(days) rows however
+# many trips there are. Days are UTC, like created_at / paid_at.
+
+KPI_DAYS = 30
+
+Summary = namedtuple(
+    "Summary",
+    "days trips trips_by_status revenue revenue_today revenue_by_day payment_mix drivers busy_drivers",
+)
+
+
+def summary(days=KPI_DAYS, today=None):
+    """
+    KPIs for the last `days` days (today included). Returns a Summary or
+    None on a database error.
+    trips_by_status: {status: count}; revenue_by_day: [(day, amount)]
+    oldest first; payment_mix: {method: (count, amount)}.
+    """
+    today = today or datetime.datetime.now(datetime.timezone.utc).date()
+    start = today - datetime.timedelta(days=days - 1)
+
+    rows = db.run_named("daily_stats_since", (start.isoformat(),))
+    drivers = db.run_named("driver_utilization")
+    if rows is None or drivers is None:
+        return None
+
+    by_status, mix, by_day = {}, {}, {}
+    for r in rows:
+        if not r["count"] and not r["amount"]:
+            continue
+        if r["metric"] == "trips":
+            by_status[r["key"]] = by_status.get(r["key"], 0) + r["count"]
+        elif r["metric"] == "payments":
+            count, amount = mix.get(r["key"], (0, 0.0))
+            mix[r["key"]] = (count + r["count"], amount + r["amount"])
+            by_day[r["day"]] = by_day.get(r["day"], 0.0) + r["amount"]
+
+    revenue_by_day = [
+        (day.isoformat(), by_day.get(day.isoformat(), 0.0))
+        for day in (start + datetime.timedelta(days=i) for i in range(days))
+    ]
+    return Summary(
+        days=days,
+        trips=sum(by_status.values()),
+        trips_by_status=by_status,
+        revenue=sum(by_day.values()),
+        revenue_today=by_day.get(today.isoformat(), 0.0),
+        revenue_by_day=revenue_by_day,
+        payment_mix=mix,
+        drivers=drivers[0]["total"],
+        busy_drivers=drivers[0]["busy"],
+    )
+
+
+def rebuild():
+    """Recompute daily_stats from scratch (full scan of trip and payment)."""
+    with db.transaction() as tx:
+        migrations.fill_daily_stats(tx.conn.cursor())
+
+
+def check():
+    """
+    Compare daily_stats with a full recomputation.
+    Returns a list of (day, metric, key, stored, expected) that differ.
+    """
+    stored = _rows("SELECT day, metric, key, count, amount FROM daily_stats")
+    expected = {}
+    for metric in migrations.STATS_SOURCES:
+        expected.update(_rows(migrations.daily_stats_select(metric)))
+
+    diffs = []
+    for k in sorted(set(stored) | set(expected)):
+        a, b = stored.get(k, (0, 0.0)), expected.get(k, (0, 0.0))
+        if a[0] != b[0] or abs(a[1] - b[1]) > 0.005:
+            diffs.append((*k, a, b))
+    return diffs
+
+
+def _rows(sql):
+    rows = db.run_query(sql, fetch=True)
+    return {
+        (r[0], r[1], r[2]): (r[3], r[4])
+        for r in rows or ()
+        if r[3] or r[4]
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--rebuild" in sys.argv:
+        rebuild()
+    elif "--check" in sys.argv:
+        diffs = check()
+        for d in diffs:
+            print("MISMATCH", *d)
+        print("daily_stats OK" if not diffs else f"{len(diffs)} mismatches")
+        sys.exit(1 if diffs else 0)
+
+    s = summary()
+    if s:
+        print(f"Last {s.days} days: {s.trips} trips, Rs. {s.revenue:.2f} revenue")
+        for status, n in sorted(s.trips_by_status.items()):
+            print(f"  {status or '-':<10} {n}")
+        for method, (n, amount) in sorted(s.payment_mix.items()):
+            print(f"  {method or '-':<10} {n} payments, Rs. {amount:.2f}")
+        print(f"Drivers on trip: {s.busy_drivers} / {s.drivers}")
@@ -1,8 +1,18 @@
 import tkinter as tk
-from tkinter import messagebox, ttk
-import re
+from tkinter import filedialog, messagebox, simpledialog, ttk
+import datetime
 import databaseConnection as db
 import assignDriver
+from pagedTree import SEARCH_MIN_CHARS, PageSource, PagedTree, fts_phrase
+from treeBinding import TreeBinding
+import uiWorker
+import changeFeed
+import dailyStats
+import accountingExport
+import driverImport
+import validation
+import credentials
+import matchingEngine
 
 # Theme colors
 PRIMARY_YELLOW = "#FFC300"
@@ -11,6 +21,9 @@ CARD_BG = "#0b1220"
 TEXT_LIGHT = "#e5e7eb"
 TEXT_MUTED = "#9ca3af"
 ACCENT_BLUE = "#38bdf8"
+ERROR_RED = "#fca5a5"
+
+DISPATCH_POLL_MS = 1000   # auto-dispatch status refresh
 
 
 #  Window Helpers 
@@ -44,9 +57,11 @@ def center_on_parent(child: tk.Toplevel, parent: tk.Misc, w: int, h: int):
 
 #  Admin Dashboard 
 class AdminDashboard:
-    def __init__(self):
+    def __init__(self, admin_session=None):
+        self.session = admin_session  # None when started directly (__main__)
         self.win = tk.Tk()
-        self.win.title("Admin Dashboard • FastTrack")
+        user = admin_session.user.username if admin_session else "FastTrack"
+        self.win.title(f"Admin Dashboard • {user}")
         self.win.geometry("1040x640")
         self.win.configure(bg=PRIMARY_DARK)
         self.win.resizable(False, False)
@@ -128,6 +143,8 @@ class AdminDashboard:
             bg=PRIMARY_DARK,
         ).pack(anchor="w")
 
+        self.build_kpi_panel(left)
+
         # Right actions card
         right = tk.Frame(main_container, bg=PRIMARY_DARK)
         right.pack(side="right", fill="y")
@@ -202,6 +219,40 @@ class AdminDashboard:
             command=self.open_payments,
         ).grid(row=1, column=1, padx=10, pady=10, ipady=4)
 
+        ttk.Button(
+            grid,
+            text="Export for Accounting",
+            style="Secondary.TButton",
+            command=self.export_month,
+        ).grid(row=2, column=0, columnspan=2, sticky="ew", padx=10, pady=10, ipady=4)
+
+        # automatic dispatch (matchingEngine), next to manual Assign Driver
+        self.dispatch_strategy = ttk.Combobox(
+            grid, values=matchingEngine.STRATEGIES, state="readonly", width=btn_w - 4
+        )
+        self.dispatch_strategy.set(matchingEngine.DEFAULT_STRATEGY)
+        self.dispatch_strategy.grid(row=3, column=0, padx=10, pady=10)
+
+        self.dispatch_button = ttk.Button(
+            grid,
+            text="Start Auto-Dispatch",
+            style="Secondary.TButton",
+            width=btn_w,
+            command=self.toggle_dispatch,
+        )
+        self.dispatch_button.grid(row=3, column=1, padx=10, pady=10, ipady=4)
+
+        self.dispatch_status = tk.Label(
+            inner,
+            text="Auto-dispatch is off",
+            font=("Segoe UI", 9),
+            fg=TEXT_MUTED,
+            bg=CARD_BG,
+            justify="left",
+            wraplength=380,
+        )
+        self.dispatch_status.pack(anchor="w")
+
         tk.Label(
             inner,
             text="FastTrack Taxi Services • Admin Panel",
@@ -210,7 +261,123 @@ class AdminDashboard:
             bg=CARD_BG,
         ).pack(side="bottom", pady=(18, 0))
 
+        self.worker = uiWorker.Worker(self.win)
+        self.load_kpis()
+        changeFeed.subscribe(lambda events: self.load_kpis(), self.win)
+        self.show_dispatch()
+
         self.win.mainloop()
+        # dispatch stops with the admin console
+        matchingEngine.stop_dispatch(timeout=5)
+
+    # KPIs
+    def build_kpi_panel(self, parent):
+        panel = tk.Frame(parent, bg=PRIMARY_DARK)
+        panel.pack(fill="x", anchor="w", pady=(28, 0))
+
+        tk.Label(
+            panel,
+            text=f"Last {dailyStats.KPI_DAYS} days",
+            font=("Segoe UI", 12, "bold"),
+            fg=TEXT_LIGHT,
+            bg=PRIMARY_DARK,
+        ).grid(row=0, column=0, columnspan=3, sticky="w", pady=(0, 8))
+
+        self.kpi = {}
+        tiles = [
+            ("trips", "Trips"),
+            ("completed", "Completed"),
+            ("cancelled", "Cancelled"),
+            ("revenue", "Revenue"),
+            ("today", "Revenue today"),
+            ("drivers", "Drivers on trip"),
+        ]
+        for i, (key, caption) in enumerate(tiles):
+            tile = tk.Frame(panel, bg=CARD_BG, highlightthickness=1, highlightbackground="#1f2937")
+            tile.grid(row=1 + i // 3, column=i % 3, sticky="nsew", padx=(0, 8), pady=(0, 8))
+            self.kpi[key] = tk.Label(
+                tile, text="…", font=("Segoe UI Semibold", 14), fg=PRIMARY_YELLOW, bg=CARD_BG, width=11
+            )
+            self.kpi[key].pack(anchor="w", padx=10, pady=(8, 0))
+            tk.Label(tile, text=caption, font=("Segoe UI", 9), fg=TEXT_MUTED, bg=CARD_BG).pack(
+                anchor="w", padx=10, pady=(0, 8)
+            )
+
+        self.kpi_mix = tk.Label(panel, text="", font=("Segoe UI", 9), fg=TEXT_MUTED, bg=PRIMARY_DARK)
+        self.kpi_mix.grid(row=3, column=0, columnspan=3, sticky="w", pady=(4, 4))
+
+        # daily revenue bars
+        self.kpi_chart = tk.Canvas(panel, height=70, bg=PRIMARY_DARK, highlightthickness=0)
+        self.kpi_chart.grid(row=4, column=0, columnspan=3, sticky="ew")
+
+    def load_kpis(self):
+        self.worker.submit(dailyStats.summary, on_done=self.show_kpis, key="kpi")
+
+    def show_kpis(self, s):
+        if s is None:
+            return
+        by_status = s.trips_by_status
+        self.kpi["trips"].config(text=f"{s.trips:,}")
+        self.kpi["completed"].config(text=f"{by_status.get('completed', 0) + by_status.get('paid', 0):,}")
+        self.kpi["cancelled"].config(text=f"{by_status.get('cancelled', 0):,}")
+        self.kpi["revenue"].config(text=f"Rs. {s.revenue:,.0f}")
+        self.kpi["today"].config(text=f"Rs. {s.revenue_today:,.0f}")
+        pct = 100 * s.busy_drivers / s.drivers if s.drivers else 0
+        self.kpi["drivers"].config(text=f"{s.busy_drivers}/{s.drivers} ({pct:.0f}%)")
+
+        paid = sum(n for n, _ in s.payment_mix.values())
+        mix = "   ".join(
+            f"{method or '-'} {100 * n / paid:.0f}%"
+            for method, (n, _) in sorted(s.payment_mix.items(), key=lambda kv: -kv[1][0])
+        )
+        self.kpi_mix.config(text=f"Payment mix:   {mix}" if paid else "No payments yet")
+
+        chart = self.kpi_chart
+        chart.delete("all")
+        w, h = chart.winfo_width(), int(chart["height"])
+        if w <= 1:  # not mapped yet
+            w = 440
+        top = max((amount for _, amount in s.revenue_by_day), default=0) or 1
+        bar = w / len(s.revenue_by_day)
+        for i, (day, amount) in enumerate(s.revenue_by_day):
+            y = h - (h - 4) * amount / top
+            chart.create_rectangle(i * bar + 1, y, (i + 1) * bar - 1, h, fill=ACCENT_BLUE, width=0)
+
+    # Auto-dispatch
+    def toggle_dispatch(self):
+        engine = matchingEngine.dispatch_engine()
+        if engine is not None and engine.running():
+            func, args = matchingEngine.stop_dispatch, ()
+        else:
+            func, args = matchingEngine.start_dispatch, (self.dispatch_strategy.get(),)
+        self.worker.submit(
+            func, *args,
+            on_done=lambda result: self.show_dispatch(poll=False),
+            on_error=lambda e: messagebox.showerror("Auto-Dispatch", f"Auto-dispatch failed: {e}", parent=self.win),
+            key="dispatch",
+            replace=False,
+            busy=self.win,
+        )
+
+    def show_dispatch(self, poll=True):
+        engine = matchingEngine.dispatch_engine()
+        s = engine.stats() if engine is not None else None
+        running = bool(s and s["running"])
+        self.dispatch_button.config(text="Stop Auto-Dispatch" if running else "Start Auto-Dispatch")
+        self.dispatch_strategy.config(state="disabled" if running else "readonly")
+
+        if s is None:
+            text = "Auto-dispatch is off"
+        else:
+            text = (
+                f"Auto-dispatch {'on' if running else 'off'} ({s['strategy']}): "
+                f"{s['assigned']:,} assigned in {s['batches']:,} batches, {s['conflicts']:,} conflicts"
+            )
+            if s["last_error"]:
+                text += f"\n{s['errors']:,} failed batches, last: {s['last_error']}"
+        self.dispatch_status.config(text=text, fg=ERROR_RED if s and s["last_error"] else TEXT_MUTED)
+        if poll:
+            self.win.after(DISPATCH_POLL_MS, self.show_dispatch)
 
     # Navigation
     def open_drivers(self):
@@ -226,6 +393,35 @@ class AdminDashboard:
     def open_payments(self):
         PaymentManager(self.win)
 
+    def export_month(self):
+        last_month = datetime.date.today().replace(day=1) - datetime.timedelta(days=1)
+        month = simpledialog.askstring(
+            "Export", "Month to export (YYYY-MM):", initialvalue=last_month.strftime("%Y-%m"), parent=self.win
+        )
+        if not month:
+            return
+        try:
+            accountingExport.month_range(month)
+        except ValueError:
+            messagebox.showerror("Export", "Enter the month as YYYY-MM.", parent=self.win)
+            return
+        folder = filedialog.askdirectory(title="Export to folder", parent=self.win)
+        if not folder:
+            return
+
+        def done(written):
+            lines = "\n".join(f"{path}: {n:,} rows" for path, n in written.items())
+            messagebox.showinfo("Export", f"Exported:\n{lines}", parent=self.win)
+
+        self.worker.submit(
+            accountingExport.export_month, month, folder,
+            on_done=done,
+            on_error=lambda e: messagebox.showerror("Export", f"Export failed: {e}", parent=self.win),
+            key="export",
+            replace=False,
+            busy=self.win,
+        )
+
 
 #  Driver Manager 
 class DriverManager:
@@ -281,6 +477,13 @@ class DriverManager:
             command=self.delete_driver,
         ).pack(side="left", padx=6)
 
+        ttk.Button(
+            action_frame,
+            text="Import CSV",
+            style="Secondary.TButton",
+            command=self.import_drivers,
+        ).pack(side="left", padx=6)
+
         # Table
         tree_frame = tk.Frame(self.win, bg=CARD_BG, bd=1, relief=tk.SOLID)
         tree_frame.pack(fill="both", expand=True, padx=24, pady=(0, 24))
@@ -317,31 +520,57 @@ class DriverManager:
         x_scroll.pack(side="bottom", fill="x")
         self.tree.pack(side="left", fill="both", expand=True)
 
+        self.worker = uiWorker.Worker(self.win)
+        self.drivers = TreeBinding(self.tree, "all_drivers", self.render)
         self.load()
 
     def load(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-
-        rows = db.run_query("SELECT * FROM driver", fetch=True) or []
-        for r in rows:
-            status = "Yes" if r["available"] == 1 else "No"
-            self.tree.insert(
-                "",
-                "end",
-                values=(
-                    r["id"],
-                    r["name"],
-                    r["email"],
-                    r["phone"],
-                    r["license_number"],
-                    status,
-                ),
-            )
+        self.drivers.refresh(worker=self.worker)
+
+    @staticmethod
+    def render(r):
+        status = "Yes" if r["available"] == 1 else "No"
+        values = (
+            r["id"],
+            r["name"],
+            r["email"],
+            r["phone"],
+            r["license_number"],
+            status,
+        )
+        return values, ()
 
     def add_driver(self):
         AddDriverWindow(self.win, self)
 
+    def import_drivers(self):
+        path = filedialog.askopenfilename(
+            title="Import drivers",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            parent=self.win,
+        )
+        if not path:
+            return
+
+        def done(result):
+            text = f"{result.inserted} drivers imported."
+            if result.errors:
+                shown = [f"line {e.line}: {e.message}" for e in result.errors[:15]]
+                if len(result.errors) > len(shown):
+                    shown.append(f"... and {len(result.errors) - len(shown)} more")
+                text += f"\n{len(result.errors)} rows rejected:\n" + "\n".join(shown)
+            messagebox.showinfo("Import", text, parent=self.win)
+            self.load()
+
+        self.worker.submit(
+            driverImport.import_csv, path,
+            on_done=done,
+            on_error=lambda e: messagebox.showerror("Import", f"Import failed: {e}", parent=self.win),
+            key="import",
+            replace=False,
+            busy=self.win,
+        )
+
     def get_selected_driver_id(self):
         sel = self.tree.selection()
         if not sel:
@@ -369,12 +598,21 @@ class DriverManager:
         ):
             return
 
-        try:
-            db.run_query("DELETE FROM driver WHERE id=?", (driver_id,))
+        def done(result):
+            if result is None:
+                messagebox.showerror("Error", "Failed to delete driver.", parent=self.win)
+                return
             messagebox.showinfo("Deleted", "Driver deleted successfully.", parent=self.win)
             self.load()
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to delete driver: {e}", parent=self.win)
+
+        self.worker.submit(
+            db.run_named, "driver_delete", (driver_id,),
+            on_done=done,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to delete driver: {e}", parent=self.win),
+            key="delete",
+            replace=False,
+            busy=self.win,
+        )
 
 
 #  Add Driver 
@@ -389,6 +627,7 @@ class AddDriverWindow:
 
         center_on_parent(self.win, parent_win, 480, 560)
         make_modal(self.win, parent_win)
+        self.worker = uiWorker.Worker(self.win)
 
         outer = tk.Frame(self.win, bg=PRIMARY_DARK)
         outer.pack(fill="both", expand=True, padx=24, pady=24)
@@ -458,51 +697,35 @@ class AddDriverWindow:
             messagebox.showerror("Error", "All fields are required", parent=self.win)
             return
 
-        if len(name) < 3 or not re.match(r"^[A-Za-z\s'.-]+$", name):
-            messagebox.showerror(
-                "Invalid Name",
-                "Enter a valid name (at least 3 letters, letters and spaces only).",
-                parent=self.win,
-            )
-            return
-
-        if not re.match(r"^[^@]+@[^@]+\.[^@]+$", email):
-            messagebox.showerror("Invalid Email", "Enter a valid email address.", parent=self.win)
-            return
-
-        if not phone.isdigit() or len(phone) != 10:
-            messagebox.showerror("Invalid Phone", "Enter a valid 10-digit phone number.", parent=self.win)
-            return
-
-        if len(lic) < 3 or not re.match(r"^[A-Za-z0-9\- ]+$", lic):
-            messagebox.showerror("Invalid License", "Enter a valid license number.", parent=self.win)
+        errors = validation.driver_errors(name, email, phone, lic, pw)
+        if errors:
+            messagebox.showerror(*errors[0], parent=self.win)
             return
 
-        if len(pw) < 6:
-            messagebox.showerror("Weak Password", "Password must be at least 6 characters long.", parent=self.win)
-            return
-
-        if not re.search(r"[A-Za-z]", pw) or not re.search(r"\d", pw):
-            messagebox.showerror(
-                "Weak Password",
-                "Password must contain at least one letter and one number.",
-                parent=self.win,
-            )
-            return
-
-        q = "INSERT INTO driver (name,email,phone,license_number,password) VALUES (?,?,?,?,?)"
-        try:
-            db.run_query(q, (name, email, phone, lic, pw))
+        def done(result):
+            if result is None:
+                messagebox.showerror("Error", "Failed to add driver. Is the email already registered?", parent=self.win)
+                return
             messagebox.showinfo("Success", "Driver added successfully", parent=self.win)
             self.win.destroy()
             self.manager.load()
-        except Exception as e:
+
+        def failed(e):
             err = str(e)
             if "UNIQUE constraint failed" in err and "driver.email" in err:
                 messagebox.showerror("Email Exists", "This email is already registered for another driver.", parent=self.win)
             else:
                 messagebox.showerror("Error", f"Failed to add driver: {err}", parent=self.win)
 
+        def work():
+            # hashing is slow on purpose, so it runs on the worker too
+            return db.run_named("driver_insert", (name, email, phone, lic, credentials.hash_password(pw)))
+
+        self.worker.submit(
+            work,
+            on_done=done, on_error=failed, key="save", replace=False, busy=self.win,
+        )
+
 
 #  Edit Driver 
 class EditDriverWindow:
@@ -566,13 +789,8 @@ class EditDriverWindow:
         self.lic = create_entry("License Number")
         self.pw = create_entry("Password (leave blank to keep same)")
 
-        row = db.run_query("SELECT * FROM driver WHERE id=?", (self.driver_id,), fetch=True)
-        if row:
-            data = row[0]
-            self.name.insert(0, data["name"])
-            self.email.insert(0, data["email"])
-            self.phone.insert(0, data["phone"])
-            self.lic.insert(0, data["license_number"])
+        self.worker = uiWorker.Worker(self.win)
+        self.worker.submit(db.run_named, "driver_by_id", (self.driver_id,), on_done=self.fill, busy=self.win)
 
         ttk.Button(
             inner,
@@ -583,6 +801,14 @@ class EditDriverWindow:
 
         self.win.geometry("480x560")
 
+    def fill(self, row):
+        if row:
+            data = row[0]
+            self.name.insert(0, data["name"])
+            self.email.insert(0, data["email"])
+            self.phone.insert(0, data["phone"])
+            self.lic.insert(0, data["license_number"])
+
     def update_driver(self):
         name = self.name.get().strip()
         email = self.email.get().strip()
@@ -594,58 +820,66 @@ class EditDriverWindow:
             messagebox.showerror("Error", "Name, email, phone and license are required.", parent=self.win)
             return
 
-        if len(name) < 3 or not re.match(r"^[A-Za-z\s'.-]+$", name):
-            messagebox.showerror("Invalid Name", "Enter a valid name (at least 3 letters, letters and spaces only).", parent=self.win)
-            return
-
-        if not re.match(r"^[^@]+@[^@]+\.[^@]+$", email):
-            messagebox.showerror("Invalid Email", "Enter a valid email address.", parent=self.win)
-            return
-
-        if not phone.isdigit() or len(phone) != 10:
-            messagebox.showerror("Invalid Phone", "Enter a valid 10-digit phone number.", parent=self.win)
+        errors = validation.driver_errors(name, email, phone, lic, pw, password_required=False)
+        if errors:
+            messagebox.showerror(*errors[0], parent=self.win)
             return
 
-        if len(lic) < 3 or not re.match(r"^[A-Za-z0-9\- ]+$", lic):
-            messagebox.showerror("Invalid License", "Enter a valid license number.", parent=self.win)
-            return
+        def work():
+            if pw:
+                params = (name, email, phone, lic, credentials.hash_password(pw), self.driver_id)
+                return db.run_named("driver_update_with_password", params)
+            return db.run_named("driver_update", (name, email, phone, lic, self.driver_id))
 
-        if pw:
-            if len(pw) < 6:
-                messagebox.showerror("Weak Password", "Password must be at least 6 characters long.", parent=self.win)
-                return
-            if not re.search(r"[A-Za-z]", pw) or not re.search(r"\d", pw):
-                messagebox.showerror("Weak Password", "Password must contain at least one letter and one number.", parent=self.win)
+        def done(result):
+            if result is None:
+                messagebox.showerror("Error", "Failed to update driver. Is the email already registered?", parent=self.win)
                 return
-
-            q = """
-            UPDATE driver
-            SET name=?, email=?, phone=?, license_number=?, password=?
-            WHERE id=?
-            """
-            params = (name, email, phone, lic, pw, self.driver_id)
-        else:
-            q = """
-            UPDATE driver
-            SET name=?, email=?, phone=?, license_number=?
-            WHERE id=?
-            """
-            params = (name, email, phone, lic, self.driver_id)
-
-        try:
-            db.run_query(q, params)
             messagebox.showinfo("Success", "Driver updated successfully.", parent=self.win)
             self.win.destroy()
             self.manager.load()
-        except Exception as e:
+
+        def failed(e):
             err = str(e)
             if "UNIQUE constraint failed" in err and "driver.email" in err:
                 messagebox.showerror("Email Exists", "This email is already registered for another driver.", parent=self.win)
             else:
                 messagebox.showerror("Error", f"Failed to update driver: {err}", parent=self.win)
 
+        self.worker.submit(
+            work,
+            on_done=done, on_error=failed, key="save", replace=False, busy=self.win,
+        )
+
 
 #  Trip Manager 
+TRIP_STATUSES = ("All", "requested", "assigned", "completed", "paid", "cancelled")
+FARE_REVIEW = "fare review"   # trips priced with the fallback tariff (see fareEngine)
+
+TRIP_PAGES = PageSource(
+    "trip",
+    columns="""t.id, c.name AS customer, d.name AS driver, t.pickup, t.dropoff,
+               t.pickup_date, t.pickup_time, t.dropoff_date, t.dropoff_time,
+               t.fare, t.status, t.fare_review""",
+    from_sql="""trip t
+                LEFT JOIN customer c ON t.customer_id = c.id
+                LEFT JOIN driver d   ON t.driver_id   = d.id""",
+    sort_keys={
+        "id": "t.id",
+        "fare": "IFNULL(t.fare, 0)",
+        "pick_date": "IFNULL(t.pickup_date, '')",
+        "status": "IFNULL(t.status, '')",
+    },
+    filters={
+        "status": "IFNULL(t.status, '') = ?",
+        "review": "t.fare_review = 1",
+        "search": "trip_search MATCH ?",   # pickup, dropoff, customer and driver name
+    },
+    pins={"status": "status"},
+    search="trip_search",
+)
+
+
 class TripManager:
     def __init__(self, parent):
         self.parent = parent
@@ -674,6 +908,32 @@ class TripManager:
             command=self.load,
         ).pack(side="right")
 
+        ttk.Button(
+            top_frame,
+            text="Approve Fare",
+            style="Secondary.TButton",
+            command=self.approve_fare,
+        ).pack(side="right", padx=6)
+
+        ttk.Button(
+            top_frame,
+            text="Apply",
+            style="Secondary.TButton",
+            command=self.apply_filters,
+        ).pack(side="right", padx=6)
+
+        self.search = ttk.Entry(top_frame, width=24)
+        self.search.pack(side="right", padx=6)
+        self.search.bind("<Return>", lambda e: self.apply_filters())
+        tk.Label(top_frame, text="Search", bg=PRIMARY_DARK, fg=TEXT_MUTED).pack(side="right")
+
+        self.status_filter = ttk.Combobox(top_frame, values=TRIP_STATUSES + (FARE_REVIEW,), state="readonly",
+                                          width=12)
+        self.status_filter.current(0)
+        self.status_filter.pack(side="right", padx=6)
+        self.status_filter.bind("<<ComboboxSelected>>", lambda e: self.apply_filters())
+        tk.Label(top_frame, text="Status", bg=PRIMARY_DARK, fg=TEXT_MUTED).pack(side="right")
+
         tree_frame = tk.Frame(self.win, bg=CARD_BG, bd=1, relief=tk.SOLID)
         tree_frame.pack(fill="both", expand=True, padx=24, pady=(0, 24))
 
@@ -696,9 +956,13 @@ class TripManager:
             self.tree.heading(c, text=name)
             self.tree.column(c, width=w, anchor="center")
 
+        # sorting is done in SQL, on indexed keys only
+        for c in TRIP_PAGES.sort_keys:
+            self.tree.heading(c, command=lambda c=c: self.pager.sort_by(c))
+
         y_scroll = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
         x_scroll = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscroll=y_scroll.set, xscroll=x_scroll.set)
+        self.tree.configure(xscroll=x_scroll.set)
 
         y_scroll.pack(side="right", fill="y")
         x_scroll.pack(side="bottom", fill="x")
@@ -706,56 +970,112 @@ class TripManager:
 
         self.tree.tag_configure("cancelled", background="#3b0f0f", foreground="#fecaca")
         self.tree.tag_configure("completed", background="#022c22", foreground="#bbf7d0")
+        self.tree.tag_configure("review", background="#3b2f0b", foreground="#fde68a")
 
+        self.worker = uiWorker.Worker(self.win)
+        self.pager = PagedTree(self.tree, TRIP_PAGES, self.render, sort="id", scrollbar=y_scroll,
+                               worker=self.worker)
         self.load()
 
     def load(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
+        self.pager.reload()
+
+    def apply_filters(self):
+        status = self.status_filter.get()
+        text = self.search.get().strip()
+        if 0 < len(text) < SEARCH_MIN_CHARS:
+            messagebox.showwarning("Search", f"Type at least {SEARCH_MIN_CHARS} characters to search.",
+                                   parent=self.win)
+            return
+        # search results come newest (or oldest) first, whatever column is sorted
+        self.pager.set_filters(
+            status=None if status in ("All", FARE_REVIEW) else status,
+            review=status == FARE_REVIEW or None,
+            search=fts_phrase(text) if text else None,
+        )
 
-        q = """
-        SELECT t.id, c.name as customer, d.name as driver, t.pickup, t.dropoff,
-               t.pickup_date, t.pickup_time, t.dropoff_date, t.dropoff_time,
-               t.fare, t.status
-        FROM trip t
-        LEFT JOIN customer c ON t.customer_id = c.id
-        LEFT JOIN driver d   ON t.driver_id   = d.id
-        """
-        rows = db.run_query(q, fetch=True) or []
-
-        for r in rows:
-            p_date = str(r["pickup_date"]) if r["pickup_date"] else ""
-            p_time = str(r["pickup_time"]) if r["pickup_time"] else ""
-            d_date = str(r["dropoff_date"]) if r["dropoff_date"] else ""
-            d_time = str(r["dropoff_time"]) if r["dropoff_time"] else ""
-
-            tags = ()
-            if r["status"] == "cancelled":
-                tags = ("cancelled",)
-            elif r["status"] == "completed":
-                tags = ("completed",)
-
-            self.tree.insert(
-                "",
-                "end",
-                values=(
-                    r["id"],
-                    r["customer"] or "-",
-                    r["driver"] or "-",
-                    r["pickup"],
-                    r["dropoff"],
-                    p_date,
-                    p_time,
-                    d_date,
-                    d_time,
-                    float(r["fare"]) if r["fare"] else 0.0,
-                    r["status"],
-                ),
-                tags=tags,
-            )
+    def approve_fare(self):
+        sel = self.tree.selection()
+        if not sel:
+            messagebox.showwarning("Select Trip", "Please select a trip first.", parent=self.win)
+            return
+        trip_id = self.tree.item(sel[0])["values"][0]
+
+        def done(result):
+            if not result:
+                messagebox.showerror("Error", "Failed to approve the fare.", parent=self.win)
+                return
+            self.load()
+
+        self.worker.submit(
+            db.run_named, "trip_approve_fare", (trip_id,),
+            on_done=done,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to approve the fare: {e}", parent=self.win),
+            key="approve",
+            replace=False,
+            busy=self.win,
+        )
+
+    @staticmethod
+    def render(r):
+        p_date = str(r["pickup_date"]) if r["pickup_date"] else ""
+        p_time = str(r["pickup_time"]) if r["pickup_time"] else ""
+        d_date = str(r["dropoff_date"]) if r["dropoff_date"] else ""
+        d_time = str(r["dropoff_time"]) if r["dropoff_time"] else ""
+
+        tags = ()
+        if r["fare_review"]:
+            tags = ("review",)
+        elif r["status"] == "cancelled":
+            tags = ("cancelled",)
+        elif r["status"] == "completed":
+            tags = ("completed",)
+
+        values = (
+            r["id"],
+            r["customer"] or "-",
+            r["driver"] or "-",
+            r["pickup"],
+            r["dropoff"],
+            p_date,
+            p_time,
+            d_date,
+            d_time,
+            float(r["fare"]) if r["fare"] else 0.0,
+            r["status"],
+        )
+        return values, tags
 
 
 #  Payment Manager 
+PAYMENT_METHODS = ("All", "eSewa", "Khalti", "Fonepay")
+
+PAYMENT_PAGES = PageSource(
+    "payment",
+    columns="id, trip_id, amount, method, status, paid_at",
+    from_sql="payment",
+    sort_keys={
+        "id": "id",
+        "amount": "IFNULL(amount, 0)",
+        "method": "IFNULL(method, '')",
+    },
+    filters={"method": "IFNULL(method, '') = ?"},
+    pins={"method": "method"},
+)
+
+# every list page the two windows can ask for must seek an index
+# (checked by running databaseConnection.py)
+db.HOT_QUERIES.update(TRIP_PAGES.hot_queries((
+    {},
+    {"status": "requested"},
+    {"review": True},
+    {"search": fts_phrase("chowk")},
+    {"status": "requested", "search": fts_phrase("chowk")},
+    {"review": True, "search": fts_phrase("chowk")},
+)))
+db.HOT_QUERIES.update(PAYMENT_PAGES.hot_queries(({}, {"method": "eSewa"})))
+
+
 class PaymentManager:
     def __init__(self, parent):
         self.parent = parent
@@ -784,6 +1104,12 @@ class PaymentManager:
             command=self.load,
         ).pack(side="right")
 
+        self.method_filter = ttk.Combobox(top_frame, values=PAYMENT_METHODS, state="readonly", width=12)
+        self.method_filter.current(0)
+        self.method_filter.pack(side="right", padx=6)
+        self.method_filter.bind("<<ComboboxSelected>>", lambda e: self.apply_filters())
+        tk.Label(top_frame, text="Method", bg=PRIMARY_DARK, fg=TEXT_MUTED).pack(side="right")
+
         tree_frame = tk.Frame(self.win, bg=CARD_BG, bd=1, relief=tk.SOLID)
         tree_frame.pack(fill="both", expand=True, padx=24, pady=(0, 24))
 
@@ -807,34 +1133,40 @@ class PaymentManager:
             self.tree.heading(c, text=text)
             self.tree.column(c, anchor="center", width=140)
 
+        for c in PAYMENT_PAGES.sort_keys:
+            self.tree.heading(c, command=lambda c=c: self.pager.sort_by(c))
+
         y_scroll = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
         x_scroll = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscroll=y_scroll.set, xscroll=x_scroll.set)
+        self.tree.configure(xscroll=x_scroll.set)
 
         y_scroll.pack(side="right", fill="y")
         x_scroll.pack(side="bottom", fill="x")
         self.tree.pack(side="left", fill="both", expand=True)
 
+        self.worker = uiWorker.Worker(self.win)
+        self.pager = PagedTree(self.tree, PAYMENT_PAGES, self.render, sort="id", scrollbar=y_scroll,
+                               worker=self.worker)
         self.load()
 
     def load(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-
-        rows = db.run_query("SELECT * FROM payment", fetch=True) or []
-        for r in rows:
-            self.tree.insert(
-                "",
-                "end",
-                values=(
-                    r["id"],
-                    r["trip_id"],
-                    float(r["amount"]),
-                    r["method"],
-                    r["status"],
-                    r["paid_at"],
-                ),
-            )
+        self.pager.reload()
+
+    def apply_filters(self):
+        method = self.method_filter.get()
+        self.pager.set_filters(method=None if method == "All" else method)
+
+    @staticmethod
+    def render(r):
+        values = (
+            r["id"],
+            r["trip_id"],
+            float(r["amount"]) if r["amount"] is not None else 0.0,
+            r["method"],
+            r["status"],
+            r["paid_at"],
+        )
+        return values, ()
 
 
 if __name__ == "__main__":
@@ -1,117 +1,303 @@
 import sqlite3
 from sqlite3 import Error
+import atexit
+import sys
 import datetime
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+import migrations
+import queries
 
 # Database file
 SQLITE_DB_FILE = "taxibooking.db"
 
+# Extra connections kept for nested use on one thread
+POOL_MAX_OVERFLOW = 4
+
+# Per-connection prepared statement cache (must hold the whole registry)
+STATEMENT_CACHE_SIZE = 256
+
+# PRAGMAs applied to every new connection (edit to tune)
+PRAGMA_PROFILE = {
+    "journal_mode": "WAL",      # readers don't block the writer
+    "synchronous": "NORMAL",    # safe with WAL, far fewer fsyncs
+    "cache_size": -16000,       # negative = KiB, so ~16 MB page cache
+    "mmap_size": 134217728,     # 128 MB memory-mapped reads
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,       # ms to wait for a lock before failing
+    "wal_autocheckpoint": 1000,  # pages
+}
 
-def create_connection():
+
+def create_connection(db_file=None):
     """Create and return SQLite connection."""
     conn = None
     try:
         conn = sqlite3.connect(
-            SQLITE_DB_FILE,
+            db_file or SQLITE_DB_FILE,
             detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
         )
         conn.row_factory = sqlite3.Row
+        apply_pragmas(conn)
         return conn
     except Error as e:
         print("DB Connection error:", e)
         return None
 
 
-def create_tables():
-    """Create tables if they do not exist."""
-    conn = create_connection()
-    if not conn:
-        print("Cannot create tables: DB connection failed.")
-        return
+def apply_pragmas(conn, profile=None):
+    """Apply a PRAGMA profile (defaults to PRAGMA_PROFILE) to conn."""
+    for name, value in (profile or PRAGMA_PROFILE).items():
+        try:
+            conn.execute(f"PRAGMA {name}={value}")
+        except Error as e:
+            print(f"PRAGMA {name} error:", e)
 
-    cursor = conn.cursor()
-    try:
-        # ADMIN
-        cursor.execute(
-            """
-CREATE TABLE IF NOT EXISTS admin (
-    id INTEGER PRIMARY KEY,
-    username TEXT UNIQUE,
-    password TEXT
-);
-"""
-        )
 
-        # CUSTOMER
-        cursor.execute(
-            """
-CREATE TABLE IF NOT EXISTS customer (
-    id INTEGER PRIMARY KEY,
-    name TEXT,
-    email TEXT UNIQUE,
-    telephone TEXT,
-    password TEXT
-);
-"""
-        )
+def checkpoint(mode="PASSIVE"):
+    """
+    Run a WAL checkpoint.
+    mode: PASSIVE, FULL, RESTART or TRUNCATE.
+    Returns (busy, wal_pages, checkpointed_pages) or None.
+    """
+    mode = mode.upper()
+    if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+        raise ValueError(f"Unknown checkpoint mode: {mode}")
 
-        # DRIVER
-        cursor.execute(
-            """
-CREATE TABLE IF NOT EXISTS driver (
-    id INTEGER PRIMARY KEY,
-    name TEXT,
-    email TEXT UNIQUE,
-    phone TEXT,
-    license_number TEXT,
-    password TEXT,
-    available INTEGER DEFAULT 1
-);
-"""
-        )
+    with get_pool().connection() as conn:
+        if not conn:
+            return None
+        try:
+            row = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+            return tuple(row) if row else None
+        except Error as e:
+            print("Checkpoint error:", e)
+            return None
 
-        # TRIP
-        cursor.execute(
-            """
-CREATE TABLE IF NOT EXISTS trip (
-    id INTEGER PRIMARY KEY,
-    customer_id INTEGER,
-    driver_id INTEGER,
-    pickup TEXT,
-    dropoff TEXT,
-    pickup_date TEXT,
-    pickup_time TEXT,
-    dropoff_date TEXT NULL,
-    dropoff_time TEXT NULL,
-    fare REAL,
-    status TEXT DEFAULT 'requested',
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (customer_id) REFERENCES customer(id) ON DELETE SET NULL,
-    FOREIGN KEY (driver_id) REFERENCES driver(id) ON DELETE SET NULL
-);
-"""
-        )
 
-        # PAYMENT
-        cursor.execute(
-            """
-CREATE TABLE IF NOT EXISTS payment (
-    id INTEGER PRIMARY KEY,
-    trip_id INTEGER,
-    amount REAL,
-    method TEXT,
-    status TEXT,
-    paid_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (trip_id) REFERENCES trip(id) ON DELETE SET NULL
-);
-"""
-        )
+class ConnectionPool:
+    """
+    Long-lived SQLite connections, one per thread.
+    If a thread's connection is already in use, a connection is borrowed
+    from a small overflow list (at most max_overflow are kept idle).
+    A thread's connection is closed when the thread ends.
+    """
+
+    def __init__(self, db_file, max_overflow=POOL_MAX_OVERFLOW):
+        self.db_file = db_file
+        self.max_overflow = max_overflow
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._overflow = []
+        self._connections = []
+
+    def _open(self):
+        conn = create_connection(self.db_file)
+        with self._lock:
+            self.misses += 1
+            if conn:
+                self._connections.append(conn)
+        return conn
+
+    def acquire(self):
+        conn = getattr(self._local, "conn", None)
+
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            self._local.busy = conn is not None
+            if conn is not None:
+                # the thread's locals go away with the thread, and this with them
+                self._local.owner = _Owner()
+                # not at exit: close_pool() still checkpoints through it
+                weakref.finalize(self._local.owner, self._discard, conn).atexit = False
+            return conn
+
+        if not self._local.busy:
+            self._local.busy = True
+            with self._lock:
+                self.hits += 1
+            return conn
+
+        # thread's own connection is busy -> overflow
+        with self._lock:
+            if self._overflow:
+                self.hits += 1
+                return self._overflow.pop()
+        return self._open()
+
+    def release(self, conn):
+        if conn is getattr(self._local, "conn", None):
+            self._local.busy = False
+            return
+
+        with self._lock:
+            if len(self._overflow) < self.max_overflow:
+                self._overflow.append(conn)
+                return
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+
+    def _discard(self, conn):
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        try:
+            conn.close()
+        except Error:
+            pass
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; anything left uncommitted is rolled back."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            if conn is not None:
+                if conn.in_transaction:
+                    conn.rollback()
+                self.release(conn)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "open": len(self._connections),
+                "idle_overflow": len(self._overflow),
+            }
+
+    def close_all(self):
+        with self._lock:
+            conns, self._connections = self._connections, []
+            self._overflow = []
+        for conn in conns:
+            try:
+                conn.close()
+            except Error:
+                pass
+
+
+class _Owner:
+    """Marker kept in a thread's locals so the pool sees the thread end."""
+
+
+# Registry queries that must be served by an index, with sample
+# parameters (see check_query_plans); dashboard adds its list pages
+HOT_QUERIES = {
+    "pending_trips": (),
+    "customer_trips": (1,),
+    "driver_trips": (1,),
+    "available_drivers": (),
+    "payment_by_trip": (1,),
+}
+
+
+def check_query_plans():
+    """
+    Run EXPLAIN QUERY PLAN for HOT_QUERIES.
+    Returns {query name: list of offending plan lines}; empty lists mean
+    the query is fully index-driven. Offending are full scans, and in a
+    filtered page (a query with LIMIT) a sort or a walk of a whole
+    (non-partial) index, which both read every matching row first.
+    """
+    problems = {}
+    with get_pool().connection() as conn:
+        if not conn:
+            return None
+        partial = {
+            row["name"]
+            for row in conn.execute("SELECT name, sql FROM sqlite_master WHERE type='index' AND sql IS NOT NULL")
+            if " WHERE " in " ".join(row["sql"].upper().split())
+        }
+        for name, params in HOT_QUERIES.items():
+            sql = queries.get(name).sql
+            words = sql.upper().split()
+            paged = "LIMIT" in words
+            filtered = paged and "WHERE" in words
+            plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+            problems[name] = [
+                detail
+                for detail in (row["detail"] for row in plan)
+                if (detail.startswith("SCAN") and "INDEX" not in detail)
+                or (paged and detail.startswith("USE TEMP B-TREE FOR ORDER BY"))
+                or (filtered and detail.startswith("SCAN") and "VIRTUAL TABLE" not in detail
+                    and detail.split()[-1] not in partial)
+            ]
+    return problems
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the shared pool (re-created if SQLITE_DB_FILE changed)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.db_file != SQLITE_DB_FILE:
+            if _pool is not None:
+                _pool.close_all()
+            _pool = ConnectionPool(SQLITE_DB_FILE)
+        return _pool
+
+
+def pool_stats():
+    """Hit/miss counters of the shared pool."""
+    return get_pool().stats()
+
+
+def close_pool():
+    """
+    Close every pooled connection (registered with atexit).
+    The WAL is checkpointed and truncated first.
+    """
+    global _pool
+    if _pool is not None:
+        checkpoint("TRUNCATE")
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+            _pool = None
+
+
+atexit.register(close_pool)
+
+
+def create_tables():
+    """Bring the schema up to date (see migrations.py)."""
+    with get_pool().connection() as conn:
+        if not conn:
+            print("Cannot create tables: DB connection failed.")
+            return
+        _create_tables(conn)
+
+
+def _create_tables(conn):
+    cursor = conn.cursor()
+    try:
+        # usual case at startup: one PRAGMA, nothing to check or seed
+        if migrations.get_version(conn) >= migrations.latest_version():
+            return
+
+        migrations.migrate(conn)
 
         # Default admin
         cursor.execute("SELECT COUNT(*) FROM admin;")
         if cursor.fetchone()[0] == 0:
+            import credentials  # imports this module
             cursor.execute(
                 "INSERT INTO admin (username, password) VALUES (?, ?);",
-                ("admin", "admin123"),
+                ("admin", credentials.hash_password("admin123")),
             )
 
         conn.commit()
@@ -119,18 +305,117 @@ CREATE TABLE IF NOT EXISTS payment (
     except Error as e:
         print("Error creating tables:", e)
     finally:
-        conn.close()
+        cursor.close()
 
 
 def run_query(query, values=None, fetch=False, many=False):
     """
     Run a query.
     Uses '?' placeholders for SQLite.
+    Returns rows (fetch), lastrowid (INSERT) or the affected row count.
     """
-    conn = create_connection()
-    if not conn:
-        return None
+    with get_pool().connection() as conn:
+        if not conn:
+            return None
+        try:
+            return _execute(conn, query, queries.query_kind(query), values, fetch, many)
+        except Error as e:
+            conn.rollback()
+            print(f"Query error (Query: {query[:50]}...):", e)
+            return None
+
+
+def run_named(name, values=None, fetch=None, many=False):
+    """
+    Run a query from the registry in queries.py.
+    fetch defaults to True for read queries.
+    """
+    q = queries.get(name)
+    if fetch is None:
+        fetch = q.kind == "read"
+
+    start = time.perf_counter()
+    failed = True
+    result = None
+    with get_pool().connection() as conn:
+        if conn:
+            try:
+                result = _execute(conn, q.sql, q.kind, values, fetch, many)
+                failed = False
+            except Error as e:
+                conn.rollback()
+                print(f"Query error ({name}):", e)
+    queries.record(q, time.perf_counter() - start, failed=failed)
+    return result
 
+
+#  Transactions 
+class Transaction:
+    """Statements run on one connection and committed together."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def run(self, name, values=None, fetch=None, many=False):
+        """Run a registry query; errors are raised, not printed."""
+        q = queries.get(name)
+        if fetch is None:
+            fetch = q.kind == "read"
+
+        start = time.perf_counter()
+        try:
+            result = _execute(self.conn, q.sql, q.kind, values, fetch, many, commit=False)
+        except Error:
+            queries.record(q, time.perf_counter() - start, failed=True)
+            raise
+        queries.record(q, time.perf_counter() - start)
+        return result
+
+    def execute(self, query, values=None, fetch=False, many=False):
+        """Run raw SQL inside the transaction."""
+        return _execute(
+            self.conn, query, queries.query_kind(query), values, fetch, many, commit=False
+        )
+
+
+_tx_local = threading.local()
+
+
+@contextmanager
+def transaction():
+    """
+    Group several writes under one BEGIN IMMEDIATE ... COMMIT.
+
+        with db.transaction() as tx:
+            trip_id = tx.run("trip_insert", (...))
+            tx.run("payment_insert", (trip_id, ...))
+
+    Everything is rolled back if the block raises. A nested
+    transaction() on the same thread joins the outer one.
+    """
+    outer = getattr(_tx_local, "tx", None)
+    if outer is not None:
+        yield outer
+        return
+
+    with get_pool().connection() as conn:
+        if not conn:
+            raise Error("DB connection failed.")
+
+        conn.execute("BEGIN IMMEDIATE")
+        tx = Transaction(conn)
+        _tx_local.tx = tx
+        try:
+            yield tx
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            _tx_local.tx = None
+
+
+def _execute(conn, query, kind, values, fetch, many, commit=True):
     cur = conn.cursor()
 
     try:
@@ -147,20 +432,34 @@ def run_query(query, values=None, fetch=False, many=False):
         if fetch:
             return cur.fetchall()
 
-        conn.commit()
+        if commit:
+            conn.commit()
 
-        if query.strip().upper().startswith("INSERT"):
+        if kind == "insert":
             return cur.lastrowid
 
-        return None
-    except Error as e:
-        conn.rollback()
-        print(f"Query error (Query: {query[:50]}...):", e)
-        return None
+        return cur.rowcount
     finally:
         cur.close()
-        conn.close()
 
 
-if __name__ == "__main__":
+def main():
+    """Migrate, then check HOT_QUERIES. Returns the exit status."""
     create_tables()
+    plans = check_query_plans()
+    if plans is None:
+        print("Query plan check failed: no connection")
+        return 1
+    for name, scans in plans.items():
+        print(f"{name}: {'OK' if not scans else 'NOT INDEXED ' + '; '.join(scans)}")
+    # non-zero exit, so a CI step fails when a hot query loses its index
+    return 1 if any(plans.values()) else 0
+
+
+if __name__ == "__main__":
+    # through the imported module: that is the one dashboard adds its
+    # list pages to
+    import databaseConnection
+    import dashboard  # noqa: F401
+
+    sys.exit(databaseConnection.main())
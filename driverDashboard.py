@@ -1,6 +1,10 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
 import databaseConnection as db
+from treeBinding import TreeBinding
+import uiWorker
+import changeFeed
+import session
 import datetime
 
 # Theme colors
@@ -130,12 +134,14 @@ class DriverLogin:
         self.email = self.create_input(inner, "Email Address")
         self.pw = self.create_input(inner, "Password", show="*")
 
-        ttk.Button(
+        self.login_btn = ttk.Button(
             inner,
             text="Login",
             style="Primary.TButton",
             command=self.login
-        ).pack(fill="x", pady=24)
+        )
+        self.login_btn.pack(fill="x", pady=24)
+        self.worker = uiWorker.Worker(self.win)
 
         self.email.focus()
 
@@ -178,27 +184,46 @@ class DriverLogin:
             messagebox.showerror("Error", "All fields are required", parent=self.win)
             return
 
-        q = "SELECT * FROM driver WHERE email=? AND password=?"
-        r = db.run_query(q, (email, pw), fetch=True) or []
+        # the hash check is slow on purpose; keep it off the Tk thread
+        self.worker.submit(
+            session.login, "driver", email, pw,
+            on_done=self.logged_in, on_error=self.login_failed,
+            key="login", replace=False, busy=self.login_btn,
+        )
 
-        if r:
+    def logged_in(self, driver_session):
+        if driver_session:
             # close login window
             self.win.destroy()
 
             # open dashboard attached to parent (or standalone)
-            DriverDashboard(r[0], parent=self.parent)
+            DriverDashboard(driver_session, parent=self.parent)
         else:
             messagebox.showerror("Error", "Invalid driver credentials", parent=self.win)
 
+    def login_failed(self, exc):
+        messagebox.showerror("Error", f"Login failed: {exc}", parent=self.win)
+
+
+#  Data layer (no Tk; also driven by benchmarks/dayOfOperations.py)
+def mark_completed(trip_id, driver_id, date=None, time=None):
+    """Complete a trip (dropoff stamped now by default) and free its driver."""
+    now = datetime.datetime.now()
+    with db.transaction() as tx:
+        tx.run("trip_complete", (date or now.strftime("%Y-%m-%d"), time or now.strftime("%H:%M:%S"), trip_id))
+        tx.run("driver_set_available", (driver_id,))
+
 
 #  Driver Dashboard 
 class DriverDashboard:
-    def __init__(self, driver, parent=None):
-        self.driver = driver
+    def __init__(self, driver_session, parent=None):
+        # profile comes from the session; refreshes only refetch availability
+        self.session = driver_session
+        driver = driver_session.user
 
         #  IMPORTANT: Use Toplevel, not Tk()
         self.win = tk.Toplevel(parent) if parent else tk.Toplevel()
-        self.win.title(f"Driver Dashboard • {driver['name']}")
+        self.win.title(f"Driver Dashboard • {driver.name}")
         self.win.geometry("1150x620")
         self.win.configure(bg=PRIMARY_DARK)
 
@@ -231,15 +256,16 @@ class DriverDashboard:
         right = tk.Frame(header, bg=PRIMARY_DARK)
         right.pack(side="right")
 
-        tk.Label(
+        self.name_label = tk.Label(
             right,
-            text=self.driver["name"],
+            text=driver.name,
             font=("Segoe UI", 12, "bold"),
             bg=PRIMARY_DARK,
             fg=TEXT_LIGHT
-        ).pack(anchor="e")
+        )
+        self.name_label.pack(anchor="e")
 
-        status = "Available" if int(self.driver["available"]) == 1 else "On Trip"
+        status = "Available" if int(driver.available) == 1 else "On Trip"
         self.status_label = tk.Label(
             right,
             text=status,
@@ -316,53 +342,61 @@ class DriverDashboard:
 
         self.tree.bind("<Double-1>", lambda e: self.complete_trip())
 
+        self.worker = uiWorker.Worker(self.win)
+        self.trips = TreeBinding(self.tree, "driver_trips", self.render_trip)
         self.load_trips()
+        changeFeed.subscribe(self.on_trip_events, self.win, driver_id=driver.id)
 
     def refresh_driver_data(self):
-        r = db.run_query("SELECT * FROM driver WHERE id=?", (self.driver["id"],), fetch=True) or []
-        if r:
-            self.driver = r[0]
-            status = "Available" if int(self.driver["available"]) == 1 else "On Trip"
+        self.worker.submit(
+            self.session.refresh,
+            on_done=self.show_driver_data,
+            key="driver",
+        )
+
+    def show_driver_data(self, driver):
+        if driver:
+            if driver.name != self.name_label.cget("text"):
+                self.name_label.config(text=driver.name)
+                self.win.title(f"Driver Dashboard • {driver.name}")
+            status = "Available" if int(driver.available) == 1 else "On Trip"
             self.status_label.config(
                 text=status,
                 fg="green" if status == "Available" else "red"
             )
 
+    def on_trip_events(self, events):
+        # a new assignment also changes this driver's availability
+        self.refresh_driver_data()
+        self.load_trips()
+
     def load_trips(self):
-        self.tree.delete(*self.tree.get_children())
-
-        q = """
-        SELECT t.id, c.name as customer, t.pickup, t.dropoff,
-               t.pickup_date, t.pickup_time,
-               t.dropoff_date, t.dropoff_time,
-               t.fare, t.status
-        FROM trip t
-        LEFT JOIN customer c ON t.customer_id = c.id
-        WHERE t.driver_id=? AND t.status NOT IN ('completed', 'cancelled')
-        ORDER BY t.created_at DESC
-        """
-
-        rows = db.run_query(q, (self.driver["id"],), fetch=True) or []
-
-        for r in rows:
-            fare = f"Rs. {float(r['fare']):.2f}"
-            p_date = r["pickup_date"] or ""
-            p_time = r["pickup_time"] or ""
-            d_date = r["dropoff_date"] or ""
-            d_time = r["dropoff_time"] or ""
-            status = str(r["status"]).capitalize()
-
-            self.tree.insert("", "end", values=(
-                r["id"], r["customer"] or "Unknown",
-                r["pickup"], r["dropoff"],
-                p_date, p_time, d_date, d_time,
-                fare, status,
-            ))
+        self.trips.refresh((self.session.user.id,), self.worker, self.trips_loaded)
 
+    def trips_loaded(self, ok):
         #  FIX: no .get() here
-        if not rows and int(self.driver["available"]) == 0:
-            db.run_query("UPDATE driver SET available=1 WHERE id=?", (self.driver["id"],))
-            self.refresh_driver_data()
+        driver = self.session.user
+        if ok and not len(self.trips) and int(driver.available) == 0:
+            self.worker.submit(
+                db.run_named, "driver_set_available", (driver.id,),
+                on_done=lambda _: self.refresh_driver_data(),
+            )
+
+    @staticmethod
+    def render_trip(r):
+        fare = f"Rs. {float(r['fare']):.2f}"
+        p_date = r["pickup_date"] or ""
+        p_time = r["pickup_time"] or ""
+        d_date = r["dropoff_date"] or ""
+        d_time = r["dropoff_time"] or ""
+        status = str(r["status"]).capitalize()
+
+        return (
+            r["id"], r["customer"] or "Unknown",
+            r["pickup"], r["dropoff"],
+            p_date, p_time, d_date, d_time,
+            fare, status,
+        ), ()
 
     def complete_trip(self):
         sel = self.tree.selection()
@@ -378,18 +412,16 @@ class DriverDashboard:
             messagebox.showerror("Error", "This trip is cancelled.", parent=self.win)
             return
 
-        date = datetime.date.today().strftime("%Y-%m-%d")
-        time = datetime.datetime.now().strftime("%H:%M:%S")
+        def done(result):
+            self.refresh_driver_data()
+            messagebox.showinfo("Success", "Trip marked completed.", parent=self.win)
+            self.load_trips()
 
-        db.run_query(
-            "UPDATE trip SET status='completed', dropoff_date=?, dropoff_time=? WHERE id=?",
-            (date, time, trip_id),
-        )
-        db.run_query("UPDATE driver SET available=1 WHERE id=?", (self.driver["id"],))
+        def failed(e):
+            messagebox.showerror("Error", f"Failed to complete trip: {e}", parent=self.win)
 
-        self.refresh_driver_data()
-        messagebox.showinfo("Success", "Trip marked completed.", parent=self.win)
-        self.load_trips()
+        self.worker.submit(mark_completed, trip_id, self.session.user.id, on_done=done, on_error=failed,
+                           key="complete", replace=False, busy=self.win)
 
 
 if __name__ == "__main__":
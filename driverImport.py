@@ -0,0 +1,132 @@
+import argparse
+import csv
+from collections import namedtuple
+
+import credentials
+import databaseConnection as db
+import queries
+import validation
+
+# Bulk driver onboarding from CSV.
+# Rows are checked column by column with the same rules as the Add Driver
+# form (validation.column_errors). Emails
+# are checked against each other and against the driver table under the
+# transaction's write lock; valid rows are then inserted with executemany
+# in BATCH-sized batches inside that one transaction. Invalid rows are
+# skipped and reported with their line number. Passwords are hashed
+# (credentials.hash_many, in parallel) before the transaction starts, so
+# the slow part does not hold the write lock.
+
+BATCH = 1000
+COLUMNS = ("name", "email", "phone", "license_number", "password")
+IN_CHUNK = 500  # emails per existing-email lookup (bound parameter limit)
+
+RowError = namedtuple("RowError", "line email message")
+ImportResult = namedtuple("ImportResult", "inserted errors")
+
+
+def read_csv(path):
+    """
+    Rows of a driver CSV as (line, values) with values in COLUMNS order.
+    The header must name every column in COLUMNS (in any order).
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        header = {h.strip().lower(): h for h in reader.fieldnames or ()}
+        missing = [c for c in COLUMNS if c not in header]
+        if missing:
+            raise ValueError(f"Missing column(s): {', '.join(missing)}")
+        # line numbers as a spreadsheet shows them (header is line 1)
+        return [
+            (i, tuple((row[header[c]] or "").strip() for c in COLUMNS))
+            for i, row in enumerate(reader, start=2)
+        ]
+
+
+# CSV column -> validation field
+FIELDS = ("name", "email", "phone", "license", "password")
+
+
+def check_rows(rows):
+    """Split (line, values) rows into (valid rows, [RowError])."""
+    valid, errors = [], []
+    if not rows:
+        return valid, errors
+    columns = dict(zip(FIELDS, zip(*(values for _, values in rows))))
+    problems = validation.column_errors(columns, validation.DRIVER_MESSAGES)
+
+    seen = {}
+    for i, (line, values) in enumerate(rows):
+        email = values[1]
+        if i in problems:
+            if not all(values):
+                errors.append(RowError(line, email, "All fields are required"))
+            else:
+                errors.append(RowError(line, email, " ".join(msg for _, msg in problems[i])))
+            continue
+        if email in seen:
+            errors.append(RowError(line, email, f"Duplicate email (also on line {seen[email]})"))
+            continue
+        seen[email] = line
+        valid.append((line, values))
+    return valid, errors
+
+
+def _existing_emails(tx, emails):
+    found = set()
+    for i in range(0, len(emails), IN_CHUNK):
+        chunk = emails[i:i + IN_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        rows = tx.execute(f"SELECT email FROM driver WHERE email IN ({marks})", chunk, fetch=True)
+        found.update(r[0] for r in rows)
+    return found
+
+
+def import_rows(rows, dry_run=False, batch=BATCH):
+    """
+    Validate and insert (line, values) rows in one transaction.
+    Returns ImportResult(inserted, errors); with dry_run nothing is
+    written and inserted is the number of rows that would be.
+    """
+    valid, errors = check_rows(rows)
+    sql = queries.get("driver_insert").sql
+    if not dry_run:
+        hashes = credentials.hash_many([values[4] for _, values in valid])
+        valid = [(line, values[:4] + (h,)) for (line, values), h in zip(valid, hashes)]
+
+    with db.transaction() as tx:
+        taken = _existing_emails(tx, [v[1] for _, v in valid])
+        new = []
+        for line, values in valid:
+            if values[1] in taken:
+                errors.append(RowError(line, values[1], "Email is already registered"))
+            else:
+                new.append(values)
+
+        if not dry_run:
+            for i in range(0, len(new), batch):
+                tx.execute(sql, new[i:i + batch], many=True)
+
+    errors.sort()
+    return ImportResult(len(new), errors)
+
+
+def import_csv(path, dry_run=False):
+    return import_rows(read_csv(path), dry_run)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import drivers from a CSV file.")
+    parser.add_argument("csv", help=f"columns: {', '.join(COLUMNS)}")
+    parser.add_argument("--dry-run", action="store_true", help="validate only")
+    args = parser.parse_args()
+
+    result = import_csv(args.csv, args.dry_run)
+    for e in result.errors:
+        print(f"line {e.line}: {e.email or '-'}: {e.message}")
+    verb = "would be imported" if args.dry_run else "imported"
+    print(f"{result.inserted} drivers {verb}, {len(result.errors)} rows rejected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import heapq
+import math
+import threading
+
+import databaseConnection as db
+from geo import KM_PER_DEG_LAT
+
+# Driver positions.
+# driver_location holds the last reported (lat, lon) of each driver.
+# GridIndex keeps the same positions in memory, bucketed into square
+# lat/lon cells, and only indexes drivers that are available, so the
+# dispatch engine can ask for the k nearest free drivers without
+# scanning the driver table.
+
+CELL_DEG = 0.005  # ~550 m at Kathmandu's latitude
+IN_CHUNK = 500    # driver ids per IN (...) lookup (bound parameter limit)
+
+
+def _approx_km(lat1, lon1, lat2, lon2):
+    """Equirectangular distance; within 0.1% of haversine at city scale."""
+    x = (lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = lat2 - lat1
+    return KM_PER_DEG_LAT * math.hypot(x, y)
+
+
+class GridIndex:
+    def __init__(self, cell_deg=CELL_DEG):
+        self.cell_deg = cell_deg
+        self._lock = threading.RLock()
+        self._pos = {}          # driver_id -> (lat, lon), every known driver
+        self._cell_of = {}      # driver_id -> cell, available drivers only
+        self._cells = {}        # cell -> set of driver_ids
+        self._bounds = None     # (min_i, max_i, min_j, max_j) of used cells
+
+    def _cell(self, lat, lon):
+        return (int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg)))
+
+    def __len__(self):
+        return len(self._cell_of)
+
+    def __contains__(self, driver_id):
+        return driver_id in self._cell_of
+
+    def position(self, driver_id):
+        return self._pos.get(driver_id)
+
+    def _add(self, driver_id):
+        cell = self._cell(*self._pos[driver_id])
+        self._cells.setdefault(cell, set()).add(driver_id)
+        self._cell_of[driver_id] = cell
+        i, j = cell
+        if self._bounds is None:
+            self._bounds = (i, i, j, j)
+        else:
+            a, b, c, d = self._bounds
+            self._bounds = (min(a, i), max(b, i), min(c, j), max(d, j))
+
+    def _drop(self, driver_id):
+        cell = self._cell_of.pop(driver_id, None)
+        if cell is not None:
+            members = self._cells[cell]
+            members.discard(driver_id)
+            if not members:
+                del self._cells[cell]
+
+    def update(self, driver_id, lat, lon, available=None):
+        """Move a driver; available=None keeps the current availability."""
+        with self._lock:
+            indexed = driver_id in self._cell_of if available is None else available
+            self._drop(driver_id)
+            self._pos[driver_id] = (lat, lon)
+            if indexed:
+                self._add(driver_id)
+
+    def set_available(self, driver_id, available):
+        with self._lock:
+            if available and driver_id not in self._cell_of and driver_id in self._pos:
+                self._add(driver_id)
+            elif not available:
+                self._drop(driver_id)
+
+    def sync(self, available_ids):
+        """Index exactly the known drivers whose id is in available_ids."""
+        with self._lock:
+            for driver_id in list(self._pos):
+                self.set_available(driver_id, driver_id in available_ids)
+
+    def remove(self, driver_id):
+        with self._lock:
+            self._drop(driver_id)
+            self._pos.pop(driver_id, None)
+
+    def nearest(self, lat, lon, k=1, exclude=(), max_km=None):
+        """
+        k nearest available drivers to (lat, lon).
+        Returns [(driver_id, km), ...] nearest first.
+        """
+        with self._lock:
+            if not self._cell_of:
+                return []
+
+            ci, cj = self._cell(lat, lon)
+            min_i, max_i, min_j, max_j = self._bounds
+            last_ring = max(ci - min_i, max_i - ci, cj - min_j, max_j - cj)
+            # narrowest side of a cell in km (lon side, with a little margin)
+            cell_km = self.cell_deg * KM_PER_DEG_LAT * math.cos(math.radians(min(abs(lat) + 1, 89)))
+
+            heap = []  # (-km, driver_id), worst on top
+            r = 0
+            while r <= last_ring:
+                for cell in self._ring(ci, cj, r):
+                    for driver_id in self._cells.get(cell, ()):
+                        if driver_id in exclude:
+                            continue
+                        dlat, dlon = self._pos[driver_id]
+                        km = _approx_km(lat, lon, dlat, dlon)
+                        if max_km is not None and km > max_km:
+                            continue
+                        if len(heap) < k:
+                            heapq.heappush(heap, (-km, driver_id))
+                        elif km < -heap[0][0]:
+                            heapq.heapreplace(heap, (-km, driver_id))
+
+                # anything in ring r+1 is at least r * cell_km away
+                reach = r * cell_km
+                if len(heap) == k and -heap[0][0] <= reach:
+                    break
+                if max_km is not None and reach > max_km:
+                    break
+                r += 1
+
+            return sorted(((d, -km) for km, d in heap), key=lambda x: x[1])
+
+    @staticmethod
+    def _ring(ci, cj, r):
+        if r == 0:
+            yield (ci, cj)
+            return
+        for dj in range(-r, r + 1):
+            yield (ci - r, cj + dj)
+            yield (ci + r, cj + dj)
+        for di in range(-r + 1, r):
+            yield (ci + di, cj - r)
+            yield (ci + di, cj + r)
+
+
+#  Database side
+def load_index(index=None):
+    """Build (or refill) a GridIndex from driver_location."""
+    index = index or GridIndex()
+    rows = db.run_named("driver_locations") or []
+    for r in rows:
+        index.update(r["driver_id"], r["lat"], r["lon"], available=r["available"] == 1)
+    return index
+
+
+def sync_availability(index):
+    """Re-read driver.available and update the index to match."""
+    rows = db.run_named("dispatch_available_drivers")
+    if rows is None:
+        return
+    index.sync({r["id"] for r in rows})
+
+
+def ingest_pings(pings, index=None):
+    """
+    Store location pings in one transaction.
+    pings: iterable of (driver_id, lat, lon) or (driver_id, lat, lon, timestamp).
+    Older pings never overwrite newer ones. Updates index if given, with
+    the positions the database kept (not the pings as given), so stale
+    or out-of-order pings cannot move the index away from the table.
+    """
+    rows = [
+        (p[0], p[1], p[2], p[3] if len(p) > 3 else None)
+        for p in pings
+    ]
+    if not rows:
+        return 0
+
+    with db.transaction() as tx:
+        tx.run("driver_location_upsert", rows, many=True)
+        if index is not None:
+            ids = sorted({r[0] for r in rows})
+            stored = []
+            for i in range(0, len(ids), IN_CHUNK):
+                chunk = ids[i:i + IN_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                stored += tx.execute(
+                    f"SELECT driver_id, lat, lon FROM driver_location WHERE driver_id IN ({marks})",
+                    chunk, fetch=True,
+                )
+
+    if index is not None:
+        new_ids = {r[0] for r in stored if index.position(r[0]) is None}
+        for driver_id, lat, lon in stored:
+            index.update(driver_id, lat, lon)
+        if new_ids:
+            sync_availability(index)
+    return len(rows)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_index():
+    """Process-wide index, loaded from the database on first use."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = load_index()
+        return _shared
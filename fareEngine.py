@@ -0,0 +1,185 @@
+import csv
+import os
+import threading
+from collections import namedtuple
+from datetime import datetime
+from functools import lru_cache
+
+import databaseConnection as db
+import geocoding
+from geo import argmin, distance_matrix
+
+# Fare estimation.
+# Pickup and dropoff are geocoded and snapped to the nearest zone of a
+# local zone table (zone, name, lat, lon). Zone-to-zone distances and base
+# fares are worked out once into a lookup table; a quote is then that
+# base fare times the tariff for the pickup hour. Quotes are cached on
+# (pickup, dropoff, tariff), so repeated routes cost a dictionary lookup.
+# An address that cannot be placed still gets a fare: the fallback tariff
+# assumes FALLBACK_KM, and the quote is marked estimated so the booking
+# is flagged for admin review (trip.fare_review).
+
+ZONES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "zones_kathmandu.csv")
+
+BASE_FARE = 100       # flag fall (Rs.)
+PER_KM = 45           # Rs. per road km
+MIN_FARE = 150
+ROAD_FACTOR = 1.3     # road distance vs. straight line
+INTRA_ZONE_KM = 2.0   # assumed road km for a trip inside one zone
+FALLBACK_KM = 8.0     # assumed road km when either end cannot be placed
+ROUND_TO = 5
+CACHE_SIZE = 8192
+
+# (name, start hour, end hour, multiplier); first match wins, end is exclusive
+# and a start after the end wraps past midnight.
+TARIFFS = (
+    ("night", 21, 6, 1.5),
+    ("peak", 8, 10, 1.2),
+    ("peak", 17, 19, 1.2),
+)
+DAY_TARIFF = ("day", 1.0)
+
+Zone = namedtuple("Zone", "zone name lat lon")
+Quote = namedtuple("Quote", "fare pickup_zone dropoff_zone km tariff estimated", defaults=(False,))
+
+
+def round_fare(amount):
+    return max(MIN_FARE, int(ROUND_TO * round(amount / ROUND_TO)))
+
+
+def tariff_for(when=None):
+    """(name, multiplier) for a datetime, an hour, or now."""
+    if when is None:
+        when = datetime.now()
+    hour = when if isinstance(when, int) else when.hour
+    for name, start, end, mult in TARIFFS:
+        if (start <= hour < end) if start < end else (hour >= start or hour < end):
+            return name, mult
+    return DAY_TARIFF
+
+
+def pickup_datetime(date_str, time_str):
+    """Parse the booking form's pickup date/time; None if incomplete."""
+    try:
+        return datetime.strptime(f"{date_str} {time_str}".strip(), "%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return None
+
+
+class FareTable:
+    def __init__(self, path=ZONES_FILE):
+        self.path = path
+        self.zones = []
+        self.fares = {}  # (zone_a, zone_b) -> (km, base fare)
+        self._load()
+        self._build()
+        self.zone_of = lru_cache(maxsize=CACHE_SIZE)(self._zone_of)
+        self.quote_key = lru_cache(maxsize=CACHE_SIZE)(self._quote_key)
+
+    def _load(self):
+        with open(self.path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                self.zones.append(Zone(row["zone"], row["name"], float(row["lat"]), float(row["lon"])))
+
+    def _build(self):
+        points = [(z.lat, z.lon) for z in self.zones]
+        matrix = distance_matrix(points, points, road_factor=ROAD_FACTOR)
+        for a, row in zip(self.zones, matrix):
+            # plain floats in the fare table, whichever matrix type came back
+            for b, km in zip(self.zones, map(float, row)):
+                if a.zone == b.zone:
+                    km = INTRA_ZONE_KM
+                self.fares[(a.zone, b.zone)] = (round(km, 2), BASE_FARE + PER_KM * km)
+
+    def nearest_zone(self, lat, lon):
+        row = distance_matrix([(lat, lon)], [(z.lat, z.lon) for z in self.zones])[0]
+        return self.zones[argmin(row)].zone
+
+    def _zone_of(self, key):
+        place = geocoding.get_gazetteer().resolve(key)
+        if place is None:
+            return None
+        return self.nearest_zone(place.lat, place.lon)
+
+    def _quote_key(self, pickup_key, dropoff_key, tariff):
+        a = self.zone_of(pickup_key)
+        b = self.zone_of(dropoff_key)
+        name, mult = tariff
+        if a is None or b is None:
+            base = BASE_FARE + PER_KM * FALLBACK_KM
+            return Quote(round_fare(base * mult), a, b, FALLBACK_KM, name, True)
+        km, base = self.fares[(a, b)]
+        return Quote(round_fare(base * mult), a, b, km, name)
+
+    def quote(self, pickup, dropoff, when=None):
+        """Quote for a trip; estimated (fallback tariff) if either end cannot be placed."""
+        return self.quote_key(
+            geocoding.normalize(pickup), geocoding.normalize(dropoff), tariff_for(when)
+        )
+
+    def cache_info(self):
+        return self.quote_key.cache_info()
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_fare_table():
+    global _table
+    with _table_lock:
+        if _table is None:
+            _table = FareTable()
+        return _table
+
+
+def quote(pickup, dropoff, when=None):
+    try:
+        return get_fare_table().quote(pickup, dropoff, when)
+    except OSError as e:
+        print("Fare table error:", e)
+        return None
+
+
+def price_batch(trips):
+    """
+    Price many trips at once.
+    trips: iterable of (pickup, dropoff, when). Returns a list of Quote
+    in the same order.
+    """
+    table = get_fare_table()
+    return [table.quote(pickup, dropoff, when) for pickup, dropoff, when in trips]
+
+
+def reprice_requested_trips():
+    """
+    Re-quote every trip still in 'requested' state, e.g. after a tariff
+    change, and store the new fares in one transaction. Trips already
+    paid for keep the fare they were charged.
+    Returns the number of fares changed.
+    """
+    rows = db.run_named("requested_trips_for_pricing") or []
+    quotes = price_batch(
+        (r["pickup"], r["dropoff"], pickup_datetime(r["pickup_date"], r["pickup_time"]))
+        for r in rows
+    )
+    updates = [
+        (q.fare, r["id"])
+        for r, q in zip(rows, quotes)
+        if q is not None and q.fare != r["fare"]
+    ]
+    if not updates:
+        return 0
+    with db.transaction() as tx:
+        # a payment may have landed since the read; trip_set_fare skips those
+        return tx.run("trip_set_fare", updates, many=True)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] == ["--reprice"]:
+        print(f"{reprice_requested_trips()} fares updated")
+    else:
+        pickup, dropoff = (sys.argv[1:3] if len(sys.argv) > 2 else ("Thamel", "Tribhuvan Airport"))
+        print(quote(pickup, dropoff))
@@ -1,6 +1,8 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
 import databaseConnection as db
+import credentials
+import uiWorker
 
 # Theme colors
 PRIMARY_YELLOW = "#FFC300"
@@ -121,20 +123,31 @@ def open_forgot(parent=None):
             messagebox.showerror("Error", "All fields are required", parent=win)
             return
 
-        q = "UPDATE customer SET password=? WHERE email=?"
-        try:
-            db.run_query(q, (newpw.get().strip(), email.get().strip()))
+        def work(em, pw):
+            return db.run_named("customer_reset_password", (credentials.hash_password(pw), em))
+
+        def done(result):
+            if result is None:
+                messagebox.showerror("Error", "Failed to update password.", parent=win)
+                return
             messagebox.showinfo("Success", "Password updated (if email exists).", parent=win)
             win.destroy()
-        except Exception as e:
+
+        def failed(e):
             messagebox.showerror("Error", f"Failed to update password: {e}", parent=win)
 
-    ttk.Button(
+        # the new password is hashed on a worker thread
+        worker.submit(work, email.get().strip(), newpw.get().strip(), on_done=done, on_error=failed,
+                      key="reset", replace=False, busy=button)
+
+    worker = uiWorker.Worker(win)
+    button = ttk.Button(
         inner,
         text="Update Password",
         style="Primary.TButton",
         command=change_pw
-    ).pack(fill="x", pady=(24, 8))
+    )
+    button.pack(fill="x", pady=(24, 8))
 
     tk.Label(
         inner,
@@ -0,0 +1,104 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:  # optional (see README); distance_matrix falls back to plain Python
+    np = None
+
+# Distance helpers shared by dispatch, location and pricing code.
+# distance_matrix returns a NumPy array when numpy is installed and a
+# list of lists otherwise; both index as result[i][j]. Callers that need
+# plain floats convert at their own boundary.
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG_LAT = 111.32
+
+
+def haversine_km(a, b):
+    """Great-circle distance between two (lat, lon) points in km."""
+    lat1, lon1 = map(math.radians, a)
+    lat2, lon2 = map(math.radians, b)
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def distance_matrix(rows, cols, road_factor=1.0, missing=None):
+    """
+    Haversine distances (km) between every point in rows and every point
+    in cols, times road_factor: result[i][j].
+    Points are (lat, lon) or None; pairs with a None point get `missing`.
+    With NumPy installed the result is a float ndarray (a None `missing`
+    becomes NaN), otherwise a list of lists.
+    """
+    if np is not None:
+        if not rows or not cols:
+            return np.empty((len(rows), len(cols)))
+        return _matrix_numpy(rows, cols, road_factor, missing)
+    if not rows or not cols:
+        return [[] for _ in rows]
+    return _matrix_python(rows, cols, road_factor, missing)
+
+
+def argmin(row):
+    """Index of the smallest value in a row of distance_matrix (first on ties)."""
+    if np is not None and isinstance(row, np.ndarray):
+        return int(row.argmin())
+    return min(range(len(row)), key=row.__getitem__)
+
+
+def _split(points):
+    known = [i for i, p in enumerate(points) if p is not None]
+    return known, [points[i] for i in known]
+
+
+def _matrix_numpy(rows, cols, road_factor, missing):
+    ri, rp = _split(rows)
+    ci, cp = _split(cols)
+    out = np.full((len(rows), len(cols)), np.nan if missing is None else missing, dtype=float)
+    if rp and cp:
+        a = np.radians(np.asarray(rp, dtype=float))
+        b = np.radians(np.asarray(cp, dtype=float))
+        lat1, lon1 = a[:, 0:1], a[:, 1:2]
+        lat2, lon2 = b[:, 0], b[:, 1]
+        h = (
+            np.sin((lat2 - lat1) / 2) ** 2
+            + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        )
+        km = 2 * EARTH_RADIUS_KM * road_factor * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+        out[np.ix_(ri, ci)] = km
+    return out
+
+
+def _matrix_python(rows, cols, road_factor, missing):
+    sin, sqrt, asin = math.sin, math.sqrt, math.asin
+    scale = 2 * EARTH_RADIUS_KM * road_factor
+
+    # per-point work done once instead of once per pair
+    prepared = []
+    for p in cols:
+        if p is None:
+            prepared.append(None)
+        else:
+            lat, lon = math.radians(p[0]), math.radians(p[1])
+            prepared.append((lat, lon, math.cos(lat)))
+
+    result = []
+    for p in rows:
+        if p is None:
+            result.append([missing] * len(cols))
+            continue
+        lat1, lon1 = math.radians(p[0]), math.radians(p[1])
+        cos1 = math.cos(lat1)
+        row = []
+        for q in prepared:
+            if q is None:
+                row.append(missing)
+                continue
+            lat2, lon2, cos2 = q
+            h = sin((lat2 - lat1) / 2) ** 2 + cos1 * cos2 * sin((lon2 - lon1) / 2) ** 2
+            row.append(scale * asin(sqrt(min(h, 1.0))))
+        result.append(row)
+    return result
@@ -0,0 +1,113 @@
+import csv
+import difflib
+import os
+import re
+import threading
+from collections import namedtuple
+from functools import lru_cache
+
+# Offline geocoding of free-text pickup/dropoff addresses.
+# Places come from a local gazetteer CSV (name, aliases, lat, lon; aliases
+# separated by "|"). Lookups go: exact normalized name -> longest known
+# name contained in the address -> fuzzy match. The fuzzy path is cached,
+# so repeated addresses are a dictionary lookup.
+
+GAZETTEER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer_kathmandu.csv")
+
+FUZZY_CUTOFF = 0.8
+CACHE_SIZE = 4096
+
+# Words that carry no location information
+STOPWORDS = {"kathmandu", "ktm", "nepal", "near", "opp", "opposite", "the", "area", "side"}
+
+Place = namedtuple("Place", "name lat lon")
+
+_punct = re.compile(r"[^\w\s]")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize(text):
+    """Lower-case, strip punctuation and filler words."""
+    words = _punct.sub(" ", (text or "").lower()).split()
+    return " ".join(w for w in words if w not in STOPWORDS)
+
+
+class Gazetteer:
+    def __init__(self, path=GAZETTEER_FILE, fuzzy_cutoff=FUZZY_CUTOFF):
+        self.path = path
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.places = {}  # normalized name/alias -> Place
+        self._load()
+        self._keys = sorted(self.places, key=len, reverse=True)
+        self.lookup = lru_cache(maxsize=CACHE_SIZE)(self._lookup)
+
+    def _load(self):
+        with open(self.path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                place = Place(row["name"], float(row["lat"]), float(row["lon"]))
+                names = [row["name"]] + [a for a in (row.get("aliases") or "").split("|") if a]
+                for name in names:
+                    key = normalize(name)
+                    if key:
+                        self.places.setdefault(key, place)
+
+    def resolve(self, text):
+        """Return the Place for a free-text address, or None."""
+        key = normalize(text)
+        if not key:
+            return None
+        place = self.places.get(key)
+        if place is not None:
+            return place
+        return self.lookup(key)
+
+    def _lookup(self, key):
+        # a known name inside the address, e.g. "hotel yak durbar marg"
+        padded = f" {key} "
+        for name in self._keys:
+            if f" {name} " in padded:
+                return self.places[name]
+
+        match = difflib.get_close_matches(key, self._keys, n=1, cutoff=self.fuzzy_cutoff)
+        if match:
+            return self.places[match[0]]
+        return None
+
+    def cache_info(self):
+        return self.lookup.cache_info()
+
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer():
+    global _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None:
+            _gazetteer = Gazetteer()
+        return _gazetteer
+
+
+def geocode(text):
+    """(lat, lon) for an address, or None if it cannot be resolved."""
+    try:
+        place = get_gazetteer().resolve(text)
+    except OSError as e:
+        print("Gazetteer error:", e)
+        return None
+    return (place.lat, place.lon) if place else None
+
+
+def geocode_trip(pickup, dropoff):
+    """(pickup_lat, pickup_lon, dropoff_lat, dropoff_lon); unknowns are None."""
+    p = geocode(pickup) or (None, None)
+    d = geocode(dropoff) or (None, None)
+    return p + d
+
+
+if __name__ == "__main__":
+    import sys
+
+    for address in sys.argv[1:] or ["Thamel", "near boudha stupa", "Tribhuwan airport", "nowhere"]:
+        print(f"{address!r}: {get_gazetteer().resolve(address)}")
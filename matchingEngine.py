@@ -0,0 +1,363 @@
+import heapq
+import threading
+import time
+
+import databaseConnection as db
+import assignDriver
+import driverLocation
+import geo
+from geo import distance_matrix
+
+# Automatic dispatch.
+# Pending trips (status='requested', no driver) are matched with available
+# drivers in batches and assigned with assignDriver.assign_batch, so the
+# compare-and-set rules of manual assignment still apply.
+# The admin dashboard starts and stops the process-wide engine
+# (start_dispatch / stop_dispatch) and shows its stats(), including the
+# last error of a failed batch.
+
+STRATEGIES = ("fifo", "greedy", "hungarian")
+DEFAULT_STRATEGY = "greedy"
+
+# Cost used when a trip or driver has no known position (km)
+UNKNOWN_DISTANCE = 1.0e6
+
+
+#  Strategies
+# Each takes trips and drivers (lists of rows, trips oldest first) and a
+# cost matrix, cost[i][j] for trips[i] and drivers[j], and returns
+# [(trip_id, driver_id), ...]. The matrix is a NumPy array when numpy is
+# installed (see geo.distance_matrix) and a list of lists otherwise.
+
+def match_fifo(trips, drivers, cost=None):
+    """Oldest trip gets the next free driver; positions are ignored."""
+    return [(t["id"], d["id"]) for t, d in zip(trips, drivers)]
+
+
+def match_greedy(trips, drivers, cost):
+    """Oldest trip first, each takes the nearest driver still free."""
+    if geo.np is not None and isinstance(cost, geo.np.ndarray):
+        return _greedy_numpy(trips, drivers, cost)
+    free = list(range(len(drivers)))
+    pairs = []
+    for i, t in enumerate(trips):
+        if not free:
+            break
+        row = cost[i]
+        best = min(range(len(free)), key=lambda k: row[free[k]])
+        pairs.append((t["id"], drivers[free.pop(best)]["id"]))
+    return pairs
+
+
+def _greedy_numpy(trips, drivers, cost):
+    # taken drivers get an infinite cost; argmin keeps the first of ties
+    cost = cost.astype(float)
+    pairs = []
+    for i, t in enumerate(trips[: len(drivers)]):
+        j = int(cost[i].argmin())
+        pairs.append((t["id"], drivers[j]["id"]))
+        cost[:, j] = geo.np.inf
+    return pairs
+
+
+def match_hungarian(trips, drivers, cost, candidates=3):
+    """
+    Minimum total distance matching for the batch (Hungarian method).
+    To keep the matrix small only the `candidates` nearest drivers of
+    each trip are considered.
+    """
+    if not trips or not drivers:
+        return []
+
+    if geo.np is not None and isinstance(cost, geo.np.ndarray):
+        nearest = geo.np.argsort(cost, axis=1, kind="stable")[:, :candidates]
+        cols = sorted(set(nearest.ravel().tolist()))
+        # hungarian() is plain Python: convert only the candidate columns
+        matrix = cost[:, cols].tolist()
+    else:
+        pool = set()
+        for row in cost:
+            pool.update(heapq.nsmallest(candidates, range(len(drivers)), key=row.__getitem__))
+        cols = sorted(pool)
+        matrix = [[row[j] for j in cols] for row in cost]
+    cand = [drivers[j] for j in cols]
+    if len(trips) <= len(cand):
+        rows = hungarian(matrix)
+        return [(trips[i]["id"], cand[j]["id"]) for i, j in enumerate(rows) if j >= 0]
+
+    # more trips than drivers: solve the transposed problem
+    transposed = [list(col) for col in zip(*matrix)]
+    rows = hungarian(transposed)
+    pairs = [(trips[i]["id"], cand[j]["id"]) for j, i in enumerate(rows) if i >= 0]
+    # keep FIFO order of trips
+    order = {t["id"]: n for n, t in enumerate(trips)}
+    return sorted(pairs, key=lambda p: order[p[0]])
+
+
+def hungarian(cost):
+    """
+    Solve the assignment problem for an n x m cost matrix with n <= m.
+    Returns, for each row, the chosen column index.
+    """
+    n, m = len(cost), len(cost[0])
+    inf = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    p = [0] * (m + 1)
+    way = [0] * (m + 1)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = cost[i0 - 1]
+            ui0 = u[i0]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - ui0 - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    result = [-1] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            result[p[j] - 1] = j - 1
+    return result
+
+
+MATCHERS = {
+    "fifo": match_fifo,
+    "greedy": match_greedy,
+    "hungarian": match_hungarian,
+}
+
+
+def pickup_location(trip):
+    """Geocoded pickup of a trip row, if known."""
+    if trip["pickup_lat"] is None or trip["pickup_lon"] is None:
+        return None
+    return (trip["pickup_lat"], trip["pickup_lon"])
+
+
+#  Engine
+class MatchingEngine:
+    """
+    Batch dispatcher.
+
+    trip_location(trip_row) and driver_location(driver_row) return a
+    (lat, lon) tuple or None; without positions the nearest strategies
+    fall back to FIFO order. By default trips use their geocoded pickup.
+
+    With a driverLocation.GridIndex as `index`, the nearest strategies
+    only consider the `candidates` nearest available drivers of each
+    trip, and driver positions come from the index.
+    """
+
+    def __init__(
+        self,
+        strategy="fifo",
+        batch_size=200,
+        interval=2.0,
+        trip_location=None,
+        driver_location=None,
+        index=None,
+        candidates=5,
+    ):
+        if strategy not in MATCHERS:
+            raise ValueError(f"Unknown strategy: {strategy} (use one of {STRATEGIES})")
+        self.strategy = strategy
+        self.batch_size = batch_size
+        self.interval = interval
+        self.index = index
+        self.candidates = candidates
+        self.trip_location = trip_location or pickup_location
+        if driver_location is None:
+            if index is not None:
+                driver_location = lambda driver: index.position(driver["id"])
+            else:
+                driver_location = lambda driver: None
+        self.driver_location = driver_location
+
+        self.batches = 0
+        self.assigned = 0
+        self.conflicts = 0
+        self.errors = 0
+        self.last_error = None   # "HH:MM:SS message" of the latest failed batch
+        self._stop = threading.Event()
+        self._thread = None
+
+    def cost_matrix(self, trips, drivers):
+        """Pickup-to-driver km for every pair, in one distance_matrix call."""
+        return distance_matrix(
+            [self.trip_location(t) for t in trips],
+            [self.driver_location(d) for d in drivers],
+            missing=UNKNOWN_DISTANCE,
+        )
+
+    def match(self, trips, drivers):
+        if self.strategy == "fifo":
+            return match_fifo(trips, drivers)
+        cost = self.cost_matrix(trips, drivers)
+        if self.strategy == "hungarian":
+            return match_hungarian(trips, drivers, cost, candidates=self.candidates)
+        return MATCHERS[self.strategy](trips, drivers, cost)
+
+    def run_once(self):
+        """Match and assign one batch. Returns the number assigned."""
+        trips = db.run_named("dispatch_pending_trips", (self.batch_size,)) or []
+        if not trips:
+            return 0
+        drivers = self._drivers_for(trips)
+        if not drivers:
+            return 0
+
+        pairs = self.match(trips, drivers)
+        results = assignDriver.assign_batch(pairs) if pairs else []
+
+        if self.index is not None:
+            for (trip_id, driver_id), r in zip(pairs, results):
+                if r.ok:
+                    self.index.set_available(driver_id, False)
+
+        done = sum(1 for r in results if r.ok)
+        self.batches += 1
+        self.assigned += done
+        self.conflicts += len(results) - done
+        return done
+
+    def _drivers_for(self, trips):
+        """Available drivers to consider for this batch of trips."""
+        if self.index is None or self.strategy == "fifo":
+            return db.run_named("dispatch_available_drivers") or []
+
+        driverLocation.sync_availability(self.index)
+        found = {}
+        for t in trips:
+            pos = self.trip_location(t)
+            if pos is None:
+                continue
+            for driver_id, _ in self.index.nearest(pos[0], pos[1], k=self.candidates):
+                found[driver_id] = {"id": driver_id}
+        if not found:
+            return db.run_named("dispatch_available_drivers") or []
+        return list(found.values())
+
+    def run_until_idle(self):
+        """Keep running batches until nothing more can be assigned."""
+        total = 0
+        while True:
+            done = self.run_once()
+            if not done:
+                return total
+            total += done
+
+    #  background loop
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="matching-engine", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def running(self):
+        return bool(self._thread and self._thread.is_alive() and not self._stop.is_set())
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                done = self.run_once()
+            except Exception as e:
+                # kept for stats(); the loop goes on with the next batch
+                self.errors += 1
+                self.last_error = f"{time.strftime('%H:%M:%S')} {type(e).__name__}: {e}"
+                done = 0
+            # a full batch means more work is probably waiting
+            if done < self.batch_size:
+                self._stop.wait(self.interval)
+
+    def stats(self):
+        return {
+            "strategy": self.strategy,
+            "running": self.running(),
+            "batches": self.batches,
+            "assigned": self.assigned,
+            "conflicts": self.conflicts,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def start_dispatch(strategy=DEFAULT_STRATEGY):
+    """
+    Start the process-wide engine (replacing a stopped one or one with
+    another strategy) and return it. The nearest strategies use the
+    shared driverLocation index. Blocks while that loads, so call it
+    from a worker thread.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is not None and (_engine.strategy != strategy or not _engine.running()):
+            _engine.stop()
+            _engine = None
+        if _engine is None:
+            index = driverLocation.get_index() if strategy != "fifo" else None
+            _engine = MatchingEngine(strategy=strategy, index=index)
+            _engine.start()
+        return _engine
+
+
+def stop_dispatch(timeout=None):
+    """Stop the process-wide engine; its stats() stay readable."""
+    with _engine_lock:
+        if _engine is not None:
+            _engine.stop(timeout)
+
+
+def dispatch_engine():
+    """The process-wide engine, or None if it was never started."""
+    return _engine
+
+
+if __name__ == "__main__":
+    import sys
+
+    engine = start_dispatch(sys.argv[1] if len(sys.argv) > 1 else "fifo")
+    print("Dispatching... (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(5)
+            print(engine.stats())
+    except KeyboardInterrupt:
+        stop_dispatch()
@@ -0,0 +1,637 @@
+from sqlite3 import Error
+from collections import namedtuple
+
+# Schema migrations.
+# The schema version is kept in PRAGMA user_version. Each migration moves
+# the database up one version; pending plain steps run together in one
+# transaction. Steps marked online manage their own (short) transactions,
+# normally through rebuild_table().
+
+Migration = namedtuple("Migration", "version description func online")
+
+MIGRATIONS = []
+
+
+def migration(version, description, online=False):
+    """Register a migration step (decorator)."""
+    def register(func):
+        MIGRATIONS.append(Migration(version, description, func, online))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return func
+    return register
+
+
+def get_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def latest_version():
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def migrate(conn):
+    """
+    Apply all pending migrations to conn.
+    Returns the schema version afterwards.
+    """
+    current = get_version(conn)
+    pending = [m for m in MIGRATIONS if m.version > current]
+    if not pending:
+        return current
+
+    if conn.in_transaction:
+        conn.commit()
+
+    old_isolation = conn.isolation_level
+    conn.isolation_level = None  # we issue BEGIN/COMMIT ourselves
+    try:
+        batch = []
+        for m in pending:
+            if not m.online:
+                batch.append(m)
+                continue
+            _apply(conn, batch)
+            batch = []
+            m.func(conn, m.version)
+            print(f"Migration {m.version}: {m.description}")
+        _apply(conn, batch)
+    finally:
+        conn.isolation_level = old_isolation
+
+    return get_version(conn)
+
+
+def _apply(conn, steps):
+    """Run plain steps in a single transaction and bump user_version."""
+    if not steps:
+        return
+
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        for m in steps:
+            m.func(cur)
+        cur.execute(f"PRAGMA user_version={int(steps[-1].version)}")
+        cur.execute("COMMIT")
+    except Error:
+        cur.execute("ROLLBACK")
+        raise
+    finally:
+        cur.close()
+
+    for m in steps:
+        print(f"Migration {m.version}: {m.description}")
+
+
+#  Online table rebuild 
+def rebuild_table(conn, table, create_sql, columns, version=None, batch_size=5000):
+    """
+    Rebuild `table` with a new definition without a long write lock.
+
+    create_sql: CREATE TABLE statement with {table} as the table name.
+    columns: {new column: SQL expression over the old row}.
+
+    Rows are copied in id order, batch_size rows per transaction. Rows
+    written meanwhile are tracked by triggers and re-copied during the
+    final swap, which also sets user_version to `version` if given.
+    The table's indexes are recreated as they were; other triggers on the
+    table (e.g. the updated_at ones) are dropped with it and must be
+    recreated by the caller.
+    conn must be in autocommit mode (isolation_level=None).
+    """
+    new = f"{table}__rebuild"
+    changed = f"{table}__changed"
+    cols = ", ".join(columns)
+    exprs = ", ".join(columns.values())
+
+    cur = conn.cursor()
+    try:
+        indexes = [
+            sql for (sql,) in cur.execute(
+                "SELECT sql FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL",
+                (table,),
+            )
+        ]
+        cur.execute(f"DROP TABLE IF EXISTS {new}")
+        cur.execute(f"DROP TABLE IF EXISTS {changed}")
+        cur.execute(create_sql.format(table=new))
+        cur.execute(f"CREATE TABLE {changed} (id INTEGER PRIMARY KEY)")
+        for event, ref in (("INSERT", "NEW"), ("UPDATE", "OLD"), ("DELETE", "OLD")):
+            cur.execute(
+                f"""
+                CREATE TRIGGER {table}__rebuild_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    INSERT OR IGNORE INTO {changed} (id) VALUES ({ref}.id);
+                END
+                """
+            )
+
+        last_id = -1
+        while True:
+            cur.execute("BEGIN IMMEDIATE")
+            upper = cur.execute(
+                f"SELECT MAX(id) FROM (SELECT id FROM {table} WHERE id > ? ORDER BY id LIMIT ?)",
+                (last_id, batch_size),
+            ).fetchone()[0]
+            if upper is None:
+                cur.execute("COMMIT")
+                break
+            cur.execute(
+                f"INSERT OR REPLACE INTO {new} ({cols}) "
+                f"SELECT {exprs} FROM {table} WHERE id > ? AND id <= ?",
+                (last_id, upper),
+            )
+            cur.execute("COMMIT")
+            last_id = upper
+
+        # Swap: re-copy rows touched during the copy, then replace the table.
+        cur.execute("BEGIN IMMEDIATE")
+        cur.execute(f"DELETE FROM {new} WHERE id IN (SELECT id FROM {changed})")
+        cur.execute(
+            f"INSERT INTO {new} ({cols}) "
+            f"SELECT {exprs} FROM {table} WHERE id IN (SELECT id FROM {changed})"
+        )
+        for event in ("insert", "update", "delete"):
+            cur.execute(f"DROP TRIGGER IF EXISTS {table}__rebuild_{event}")
+        cur.execute(f"DROP TABLE {changed}")
+        cur.execute(f"DROP TABLE {table}")
+        cur.execute(f"ALTER TABLE {new} RENAME TO {table}")
+        for sql in indexes:
+            cur.execute(sql)
+        if version is not None:
+            cur.execute(f"PRAGMA user_version={int(version)}")
+        cur.execute("COMMIT")
+    except Error:
+        if conn.in_transaction:
+            cur.execute("ROLLBACK")
+        raise
+    finally:
+        cur.close()
+
+
+#  Indexes 
+# Secondary indexes for the dashboard queries, as frozen sets: the step
+# that introduced INDEX_SETS[n] builds exactly that set (named <base>_v<n>)
+# and drops every other idx_* index, so replaying old steps never depends
+# on later edits. Never change a set that has shipped; later steps create
+# their own indexes by name instead.
+INDEX_SET_1 = {
+    # AssignDriverWindow.load_trips (pending queue, oldest first)
+    "idx_trip_pending": """
+        ON trip (created_at)
+        WHERE status='requested' AND driver_id IS NULL
+    """,
+    # CustomerDashboard.show_trips
+    "idx_trip_customer": "ON trip (customer_id, created_at)",
+    # DriverDashboard.load_trips
+    "idx_trip_driver_status": "ON trip (driver_id, status, created_at)",
+    # AssignDriverWindow.load_drivers
+    "idx_driver_available": "ON driver (name) WHERE available=1",
+    # payment lookups by trip
+    "idx_payment_trip": "ON payment (trip_id)",
+}
+INDEX_SET_2 = {
+    **INDEX_SET_1,
+    # TripManager / PaymentManager sort and filter keys (see pagedTree)
+    "idx_trip_status": "ON trip (IFNULL(status, ''))",
+    "idx_trip_fare": "ON trip (IFNULL(fare, 0))",
+    "idx_trip_pickup_date": "ON trip (IFNULL(pickup_date, ''))",
+    "idx_payment_amount": "ON payment (IFNULL(amount, 0))",
+    "idx_payment_method": "ON payment (IFNULL(method, ''))",
+}
+INDEX_SET_3 = {
+    **INDEX_SET_2,
+    # TreeBinding refreshes (rows changed since a cursor)
+    "idx_trip_updated": "ON trip (updated_at)",
+    "idx_driver_updated": "ON driver (updated_at)",
+}
+INDEX_SET_4 = {
+    **INDEX_SET_3,
+    # accountingExport date ranges
+    "idx_trip_created": "ON trip (created_at)",
+    "idx_payment_paid": "ON payment (paid_at)",
+}
+INDEX_SETS = {1: INDEX_SET_1, 2: INDEX_SET_2, 3: INDEX_SET_3, 4: INDEX_SET_4}
+
+
+def create_index_set(cur, number):
+    """Build INDEX_SETS[number] and drop every other idx_* index."""
+    wanted = {f"{base}_v{number}": body for base, body in INDEX_SETS[number].items()}
+
+    cur.execute(
+        "SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx\\_%' ESCAPE '\\'"
+    )
+    for (name,) in cur.fetchall():
+        if name not in wanted:
+            cur.execute(f"DROP INDEX IF EXISTS {name}")
+
+    for name, body in wanted.items():
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {name} {body}")
+
+
+#  Steps 
+@migration(1, "base schema")
+def migration_001_base_schema(cur):
+    # ADMIN
+    cur.execute(
+        """
+CREATE TABLE IF NOT EXISTS admin (
+    id INTEGER PRIMARY KEY,
+    username TEXT UNIQUE,
+    password TEXT
+);
+"""
+    )
+
+    # CUSTOMER
+    cur.execute(
+        """
+CREATE TABLE IF NOT EXISTS customer (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    email TEXT UNIQUE,
+    telephone TEXT,
+    password TEXT
+);
+"""
+    )
+
+    # DRIVER
+    cur.execute(
+        """
+CREATE TABLE IF NOT EXISTS driver (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    email TEXT UNIQUE,
+    phone TEXT,
+    license_number TEXT,
+    password TEXT,
+    available INTEGER DEFAULT 1
+);
+"""
+    )
+
+    # TRIP
+    cur.execute(
+        """
+CREATE TABLE IF NOT EXISTS trip (
+    id INTEGER PRIMARY KEY,
+    customer_id INTEGER,
+    driver_id INTEGER,
+    pickup TEXT,
+    dropoff TEXT,
+    pickup_date TEXT,
+    pickup_time TEXT,
+    dropoff_date TEXT NULL,
+    dropoff_time TEXT NULL,
+    fare REAL,
+    status TEXT DEFAULT 'requested',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (customer_id) REFERENCES customer(id) ON DELETE SET NULL,
+    FOREIGN KEY (driver_id) REFERENCES driver(id) ON DELETE SET NULL
+);
+"""
+    )
+
+    # PAYMENT
+    cur.execute(
+        """
+CREATE TABLE IF NOT EXISTS payment (
+    id INTEGER PRIMARY KEY,
+    trip_id INTEGER,
+    amount REAL,
+    method TEXT,
+    status TEXT,
+    paid_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (trip_id) REFERENCES trip(id) ON DELETE SET NULL
+);
+"""
+    )
+
+
+@migration(2, "dashboard indexes")
+def migration_002_indexes(cur):
+    create_index_set(cur, 1)
+
+
+
+@migration(3, "driver locations")
+def migration_003_driver_location(cur):
+    cur.execute(
+        """
+CREATE TABLE IF NOT EXISTS driver_location (
+    driver_id INTEGER PRIMARY KEY,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (driver_id) REFERENCES driver(id) ON DELETE CASCADE
+);
+"""
+    )
+
+
+
+def add_column(cur, table, column, decl):
+    """ALTER TABLE ADD COLUMN unless the column already exists."""
+    cols = {row[1] for row in cur.execute(f"PRAGMA table_info({table})")}
+    if column not in cols:
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+@migration(4, "trip coordinates")
+def migration_004_trip_coordinates(cur):
+    for column in ("pickup_lat", "pickup_lon", "dropoff_lat", "dropoff_lon"):
+        add_column(cur, "trip", column, "REAL NULL")
+
+
+@migration(5, "admin list indexes")
+def migration_005_list_indexes(cur):
+    create_index_set(cur, 2)
+
+
+# Millisecond timestamps, so refresh cursors rarely see ties
+NOW_MS = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+@migration(6, "row updated_at")
+def migration_006_updated_at(cur):
+    for table, initial in (("trip", f"COALESCE(created_at, {NOW_MS})"), ("driver", NOW_MS)):
+        add_column(cur, table, "updated_at", "TEXT NULL")
+        cur.execute(f"UPDATE {table} SET updated_at = {initial} WHERE updated_at IS NULL")
+        # stamp every insert and every update that does not set updated_at itself
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_touch_insert AFTER INSERT ON {table}
+            WHEN NEW.updated_at IS NULL
+            BEGIN
+                UPDATE {table} SET updated_at = {NOW_MS} WHERE id = NEW.id;
+            END
+            """
+        )
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_touch_update AFTER UPDATE ON {table}
+            WHEN NEW.updated_at IS OLD.updated_at
+            BEGIN
+                UPDATE {table} SET updated_at = {NOW_MS} WHERE id = NEW.id;
+            END
+            """
+        )
+    create_index_set(cur, 3)
+
+
+# trip columns the dashboards show; changing any of them logs an event
+TRIP_EVENT_COLUMNS = (
+    "status", "driver_id", "fare", "pickup", "dropoff",
+    "pickup_date", "pickup_time", "dropoff_date", "dropoff_time",
+)
+
+
+@migration(7, "trip change feed")
+def migration_007_trip_event(cur):
+    cur.execute(
+        f"""
+CREATE TABLE IF NOT EXISTS trip_event (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    trip_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    status TEXT,
+    customer_id INTEGER,
+    driver_id INTEGER,
+    old_driver_id INTEGER,
+    at TEXT DEFAULT ({NOW_MS})
+);
+"""
+    )
+    # append-only log read by changeFeed; no foreign keys, so events
+    # outlive deleted trips
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trip_event_insert AFTER INSERT ON trip
+        BEGIN
+            INSERT INTO trip_event (trip_id, kind, status, customer_id, driver_id)
+            VALUES (NEW.id, 'insert', NEW.status, NEW.customer_id, NEW.driver_id);
+        END
+        """
+    )
+    changed = " OR ".join(f"NEW.{c} IS NOT OLD.{c}" for c in TRIP_EVENT_COLUMNS)
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trip_event_update AFTER UPDATE ON trip
+        WHEN {changed}
+        BEGIN
+            INSERT INTO trip_event (trip_id, kind, status, customer_id, driver_id, old_driver_id)
+            VALUES (NEW.id, 'update', NEW.status, NEW.customer_id, NEW.driver_id, OLD.driver_id);
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trip_event_delete AFTER DELETE ON trip
+        BEGIN
+            INSERT INTO trip_event (trip_id, kind, status, customer_id, old_driver_id)
+            VALUES (OLD.id, 'delete', OLD.status, OLD.customer_id, OLD.driver_id);
+        END
+        """
+    )
+
+
+# daily_stats metric -> (table, day column, key column, amount column)
+STATS_SOURCES = {
+    "trips": ("trip", "created_at", "status", "fare"),
+    "payments": ("payment", "paid_at", "method", "amount"),
+}
+
+
+def _stats_values(metric, row):
+    """(day, key, amount) SQL expressions for one row of the source table."""
+    table, day, key, amount = STATS_SOURCES[metric]
+    return (
+        f"IFNULL(date({row}.{day}), '')",
+        f"IFNULL({row}.{key}, '')",
+        f"IFNULL({row}.{amount}, 0)",
+    )
+
+
+def _stats_add(metric, row, sign):
+    """Trigger statement adding (sign=1) or removing (-1) row from daily_stats."""
+    day, key, amount = _stats_values(metric, row)
+    return f"""
+        INSERT INTO daily_stats (day, metric, key, count, amount)
+        VALUES ({day}, '{metric}', {key}, {sign}, {sign} * {amount})
+        ON CONFLICT (day, metric, key) DO UPDATE
+        SET count = count + excluded.count, amount = amount + excluded.amount;"""
+
+
+def daily_stats_select(metric):
+    """SELECT computing one metric's daily_stats rows from its source table."""
+    table = STATS_SOURCES[metric][0]
+    day, key, amount = _stats_values(metric, table)
+    return (
+        f"SELECT {day}, '{metric}', {key}, COUNT(*), SUM({amount}) "
+        f"FROM {table} GROUP BY 1, 3"
+    )
+
+
+def fill_daily_stats(cur):
+    """Recompute daily_stats from trip and payment (full scan)."""
+    cur.execute("DELETE FROM daily_stats")
+    for metric in STATS_SOURCES:
+        cur.execute(
+            "INSERT INTO daily_stats (day, metric, key, count, amount) "
+            + daily_stats_select(metric)
+        )
+
+
+@migration(8, "daily stats")
+def migration_008_daily_stats(cur):
+    # per day and trip status / payment method; kept current by triggers
+    # so the admin KPIs read O(days) rows instead of scanning trip
+    cur.execute(
+        """
+CREATE TABLE IF NOT EXISTS daily_stats (
+    day TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    amount REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, metric, key)
+) WITHOUT ROWID;
+"""
+    )
+    for metric, (table, *columns) in STATS_SOURCES.items():
+        watched = " OR ".join(f"NEW.{c} IS NOT OLD.{c}" for c in columns)
+        cur.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_stats_insert AFTER INSERT ON {table} "
+            f"BEGIN {_stats_add(metric, 'NEW', 1)} END"
+        )
+        cur.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_stats_update AFTER UPDATE ON {table} "
+            f"WHEN {watched} "
+            f"BEGIN {_stats_add(metric, 'OLD', -1)} {_stats_add(metric, 'NEW', 1)} END"
+        )
+        cur.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_stats_delete AFTER DELETE ON {table} "
+            f"BEGIN {_stats_add(metric, 'OLD', -1)} END"
+        )
+    fill_daily_stats(cur)
+
+
+@migration(9, "export indexes")
+def migration_009_export_indexes(cur):
+    create_index_set(cur, 4)
+
+
+# account columns a session caches (see session); changing any of them
+# bumps the row's version so open sessions reload the profile
+ACCOUNT_PROFILE_COLUMNS = {
+    "customer": ("name", "email", "telephone"),
+    "driver": ("name", "email", "phone", "license_number"),
+    "admin": ("username",),
+}
+
+
+@migration(10, "account versions")
+def migration_010_account_versions(cur):
+    for table, columns in ACCOUNT_PROFILE_COLUMNS.items():
+        add_column(cur, table, "version", "INTEGER NOT NULL DEFAULT 0")
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_version_update
+            AFTER UPDATE OF {', '.join(columns)} ON {table}
+            WHEN NEW.version IS OLD.version
+            BEGIN
+                UPDATE {table} SET version = OLD.version + 1 WHERE id = NEW.id;
+            END
+            """
+        )
+
+
+@migration(11, "fare review flag")
+def migration_011_fare_review(cur):
+    # set on trips priced with fareEngine's fallback tariff until an admin
+    # approves the fare; the partial index keeps the review list cheap
+    add_column(cur, "trip", "fare_review", "INTEGER NOT NULL DEFAULT 0")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_trip_fare_review ON trip (id) WHERE fare_review=1")
+
+
+# (filter, sort, key) for the filtered sorts TripManager and PaymentManager
+# offer (see pagedTree); the fare review ones are partial, like the flag's
+PAGE_INDEXES = {
+    "idx_trip_status_fare": "ON trip (IFNULL(status, ''), IFNULL(fare, 0), id)",
+    "idx_trip_status_pickup_date": "ON trip (IFNULL(status, ''), IFNULL(pickup_date, ''), id)",
+    "idx_trip_review_fare": "ON trip (IFNULL(fare, 0)) WHERE fare_review=1",
+    "idx_trip_review_pickup_date": "ON trip (IFNULL(pickup_date, '')) WHERE fare_review=1",
+    "idx_trip_review_status": "ON trip (IFNULL(status, '')) WHERE fare_review=1",
+    "idx_payment_method_amount": "ON payment (IFNULL(method, ''), IFNULL(amount, 0), id)",
+}
+
+# trip_search row of a trip: the searched text, names copied in
+TRIP_SEARCH_NAMES = (
+    "(SELECT name FROM customer WHERE id = {row}.customer_id), "
+    "(SELECT name FROM driver WHERE id = {row}.driver_id)"
+)
+TRIP_SEARCH_INSERT = "INSERT INTO trip_search (rowid, pickup, dropoff, customer, driver) "
+
+
+def fill_trip_search(cur):
+    """Rebuild trip_search from trip (full scan)."""
+    cur.execute("DELETE FROM trip_search")
+    cur.execute(
+        TRIP_SEARCH_INSERT
+        + f"SELECT t.id, t.pickup, t.dropoff, {TRIP_SEARCH_NAMES.format(row='t')} FROM trip t"
+    )
+
+
+@migration(12, "admin list search and page indexes")
+def migration_012_trip_search(cur):
+    # substring search for TripManager: a trigram index, so a term is
+    # looked up instead of LIKE '%term%' scanning every trip
+    cur.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS trip_search "
+        "USING fts5(pickup, dropoff, customer, driver, tokenize='trigram')"
+    )
+    insert = (
+        TRIP_SEARCH_INSERT
+        + f"VALUES (NEW.id, NEW.pickup, NEW.dropoff, {TRIP_SEARCH_NAMES.format(row='NEW')});"
+    )
+    changed = " OR ".join(f"NEW.{c} IS NOT OLD.{c}" for c in ("pickup", "dropoff", "customer_id", "driver_id"))
+    cur.execute(f"CREATE TRIGGER IF NOT EXISTS trip_search_insert AFTER INSERT ON trip BEGIN {insert} END")
+    cur.execute(
+        f"CREATE TRIGGER IF NOT EXISTS trip_search_update AFTER UPDATE ON trip WHEN {changed} "
+        f"BEGIN DELETE FROM trip_search WHERE rowid = OLD.id; {insert} END"
+    )
+    cur.execute(
+        "CREATE TRIGGER IF NOT EXISTS trip_search_delete AFTER DELETE ON trip "
+        "BEGIN DELETE FROM trip_search WHERE rowid = OLD.id; END"
+    )
+    for table in ("customer", "driver"):
+        trips = f"SELECT id FROM trip WHERE {table}_id = OLD.id"
+        cur.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_name AFTER UPDATE OF name ON {table} "
+            f"WHEN NEW.name IS NOT OLD.name "
+            f"BEGIN UPDATE trip_search SET {table} = NEW.name WHERE rowid IN ({trips}); END"
+        )
+        cur.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} "
+            f"BEGIN UPDATE trip_search SET {table} = NULL WHERE rowid IN ({trips}); END"
+        )
+    fill_trip_search(cur)
+
+    for name, body in PAGE_INDEXES.items():
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {name} {body}")
+    # statistics without the new indexes make SQLite favour them wrongly
+    if cur.execute("SELECT 1 FROM sqlite_master WHERE name='sqlite_stat1'").fetchone():
+        cur.execute("PRAGMA analysis_limit=1000")
+        cur.execute("ANALYZE trip")
+        cur.execute("ANALYZE payment")
+        cur.execute("PRAGMA analysis_limit=0")
+
+
+if __name__ == "__main__":
+    import databaseConnection as db
+
+    conn = db.create_connection()
+    print("Schema version:", migrate(conn), "of", latest_version())
+    conn.close()
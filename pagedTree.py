@@ -0,0 +1,295 @@
+from collections import deque
+
+import databaseConnection as db
+import queries
+
+# Keyset-paginated Treeviews for large tables.
+# A PageSource turns (sort, filters, position) into a fixed SELECT that
+# seeks through an index to the rows after the last one shown, instead of
+# loading the whole table or using OFFSET. PagedTree keeps a bounded
+# window of pages in a ttk.Treeview and fetches the next (or previous)
+# page when the view scrolls near either end of what is loaded.
+
+PAGE_SIZE = 200
+MAX_PAGES = 5      # the tree holds at most MAX_PAGES * PAGE_SIZE rows
+PREFETCH = 0.25    # fetch more once the view is this close to an end
+SEARCH_MIN_CHARS = 3   # trigram FTS5 index: shorter terms cannot be looked up
+
+
+def fts_phrase(text):
+    """text as one FTS5 phrase, i.e. matched as a substring by a trigram index."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+class PageSource:
+    """
+    name: prefix of the generated query names.
+    columns / from_sql: SELECT list and FROM clause (with joins).
+    sort_keys: {sort name: SQL expression}. Expressions must not be NULL
+        (wrap in IFNULL) and should be indexed; sort_keys[key] must be
+        unique and breaks ties.
+    filters: {filter name: SQL condition}; every ? in the condition is
+        bound to the filter value. A filter combined with a sort needs an
+        index on (filter, sort expression, key).
+    pins: {filter name: sort name} for equality filters on a sort key.
+        Under such a filter the sort key has one value, so pages come in
+        key order (SQLite would sort them in a temp B-tree otherwise).
+    search: FTS5 table whose rowid is the key. The "search" filter is a
+        MATCH on it, and search pages always come in key order, the
+        order the full-text index returns them in.
+    """
+
+    def __init__(self, name, columns, from_sql, sort_keys, filters=None, key="id", pins=None, search=None):
+        self.name = name
+        self.columns = columns
+        self.from_sql = from_sql
+        self.sort_keys = sort_keys
+        self.filters = filters or {}
+        self.key = key
+        self.pins = pins or {}
+        self.search = search
+
+    def page_sort(self, sort, filters):
+        """The sort a page is actually fetched in (see pins and search)."""
+        if self.search and "search" in filters:
+            return self.key
+        if any(self.pins.get(f) == sort for f in filters):
+            return self.key
+        return sort
+
+    def query(self, sort, desc, filters, after):
+        """Registered Query for this shape of page request."""
+        sort = self.page_sort(sort, filters)
+        active = sorted(filters)
+        name = f"{self.name}_page:{sort}:{'desc' if desc else 'asc'}:{'+'.join(active)}:{'after' if after else 'first'}"
+        query = queries.QUERIES.get(name)
+        if query is not None:
+            return query
+
+        expr = self.sort_keys[sort]
+        key = self.sort_keys[self.key]
+        op = "<" if desc else ">"
+        order = "DESC" if desc else "ASC"
+
+        from_sql = self.from_sql
+        where = []
+        if self.search and "search" in filters:
+            # the full-text index drives the query, in its rowid (= key) order
+            from_sql = f"{self.search}, {from_sql}"
+            where.append(f"{self.search}.rowid = {key}")
+            expr = key = f"{self.search}.rowid"
+        where += [self.filters[f] for f in active]
+        if after and sort == self.key:
+            where.append(f"{key} {op} ?")
+        elif after:
+            # (expr, key) past the cursor, written so SQLite can seek on expr
+            where.append(f"{expr} {op}= ? AND ({expr} {op} ? OR {key} {op} ?)")
+
+        sql = f"SELECT {expr} AS sort_value, {key} AS key_value, {self.columns} FROM {from_sql}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if sort == self.key:
+            sql += f" ORDER BY {key} {order}"
+        else:
+            sql += f" ORDER BY {expr} {order}, {key} {order}"
+        sql += " LIMIT ?"
+        return queries.ensure(name, sql)
+
+    def params(self, sort, filters, after, limit):
+        sort = self.page_sort(sort, filters)
+        params = []
+        for f in sorted(filters):
+            params += [filters[f]] * self.filters[f].count("?")
+        if after and sort == self.key:
+            params.append(after[1])
+        elif after:
+            params += [after[0], after[0], after[1]]
+        params.append(limit)
+        return params
+
+    def fetch(self, sort, desc=False, filters=None, after=None, limit=PAGE_SIZE):
+        """
+        One page of rows. after: (sort_value, key_value) of the last row
+        already shown. Returns None on a database error.
+        """
+        filters = filters or {}
+        params = self.params(sort, filters, after, limit)
+        return db.run_named(self.query(sort, desc, filters, after).name, params)
+
+    def hot_queries(self, filter_sets):
+        """
+        {query name: sample parameters} for every sort and direction under
+        each of filter_sets (filter values are samples), first page and
+        after a cursor, for databaseConnection.HOT_QUERIES. The unfiltered
+        first page in key order is left out: it walks the key and stops
+        after one page, which the plan check cannot tell from a scan.
+        """
+        hot = {}
+        for filters in filter_sets:
+            for sort in self.sort_keys:
+                for desc in (False, True):
+                    for after in (None, (0, 0)):
+                        if not filters and not after and self.page_sort(sort, filters) == self.key:
+                            continue
+                        name = self.query(sort, desc, filters, after).name
+                        hot[name] = tuple(self.params(sort, filters, after, PAGE_SIZE))
+        return hot
+
+
+class PagedTree:
+    """
+    Loads a PageSource into a ttk.Treeview page by page as it scrolls.
+    render(row) returns (values, tags) for one row. With a uiWorker.Worker
+    pages are fetched in the background.
+    """
+
+    def __init__(self, tree, source, render, sort, desc=True, scrollbar=None,
+                 page_size=PAGE_SIZE, max_pages=MAX_PAGES, worker=None):
+        self.tree = tree
+        self.worker = worker
+        self.source = source
+        self.render = render
+        self.sort = sort
+        self.desc = desc
+        self.scrollbar = scrollbar
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.filters = {}
+
+        self.pages = deque()      # [(first cursor, last cursor, item ids), ...]
+        self.dropped_before = 0   # pages scrolled out above the window
+        self.at_end = False
+        self._loading = False
+        self._scheduled = False
+        tree.configure(yscrollcommand=self._on_scroll)
+
+    #  public
+    def reload(self):
+        """Start again from the first page; the old rows stay until it arrives."""
+        self.dropped_before = 0
+        self.at_end = False
+        self._loading = False   # a page still in flight is superseded
+        self._fetch((self.sort, self.desc, self.filters, None, self.page_size), self._replace)
+
+    def sort_by(self, sort):
+        """Sort on `sort`; the same key again flips the direction."""
+        if sort == self.sort:
+            self.desc = not self.desc
+        else:
+            self.sort, self.desc = sort, False
+        self.reload()
+
+    def set_filters(self, **filters):
+        self.filters = {k: v for k, v in filters.items() if v not in (None, "")}
+        self.reload()
+
+    def __len__(self):
+        return sum(len(p[2]) for p in self.pages)
+
+    #  paging
+    def load_next(self):
+        if self.at_end or self._loading or not self.pages:
+            return
+        after = self.pages[-1][1]
+        self._fetch((self.sort, self.desc, self.filters, after, self.page_size), self._append)
+
+    def load_previous(self):
+        if not self.dropped_before or self._loading:
+            return
+        before = self.pages[0][0]
+        self._fetch((self.sort, not self.desc, self.filters, before, self.page_size), self._prepend)
+
+    def _fetch(self, args, apply):
+        """Run source.fetch(*args) (on the worker if there is one), then apply(rows)."""
+        self._loading = True
+
+        def done(rows):
+            self._loading = False
+            if rows is not None:
+                apply(rows)
+
+        def failed(error):
+            self._loading = False
+            print("Page load error:", error)
+
+        if self.worker is None:
+            done(self.source.fetch(*args))
+        else:
+            self.worker.submit(self.source.fetch, *args, on_done=done, on_error=failed,
+                               key=self, busy=self.tree)
+
+    def _replace(self, rows):
+        self.tree.delete(*self.tree.get_children())
+        self.pages.clear()
+        self._append(rows)
+
+    def _append(self, rows):
+        if len(rows) < self.page_size:
+            self.at_end = True
+        if not rows:
+            return
+
+        top = self._top_row()
+        items = [self._insert(r, "end") for r in rows]
+        self.pages.append(self._page(rows, items))
+
+        if len(self.pages) > self.max_pages:
+            dropped = self.pages.popleft()[2]
+            self.tree.delete(*dropped)
+            self.dropped_before += 1
+            self._scroll_to(top - len(dropped))
+
+    def _prepend(self, rows):
+        if not rows:
+            self.dropped_before = 0
+            return
+        rows.reverse()
+
+        top = self._top_row()
+        items = [self._insert(r, i) for i, r in enumerate(rows)]
+        self.pages.appendleft(self._page(rows, items))
+        self.dropped_before -= 1
+
+        if len(self.pages) > self.max_pages:
+            self.tree.delete(*self.pages.pop()[2])
+            self.at_end = False
+        self._scroll_to(top + len(rows))
+
+    def _page(self, rows, items):
+        first, last = rows[0], rows[-1]
+        return (
+            (first["sort_value"], first["key_value"]),
+            (last["sort_value"], last["key_value"]),
+            items,
+        )
+
+    def _insert(self, row, index):
+        values, tags = self.render(row)
+        return self.tree.insert("", index, values=values, tags=tags)
+
+    #  scrolling
+    def _top_row(self):
+        count = len(self.tree.get_children())
+        return round(self.tree.yview()[0] * count) if count else 0
+
+    def _scroll_to(self, row):
+        count = len(self.tree.get_children())
+        if count:
+            self.tree.yview_moveto(max(0, row) / count)
+
+    def _on_scroll(self, first, last):
+        if self.scrollbar is not None:
+            self.scrollbar.set(first, last)
+        if self._scheduled:
+            return
+        if float(last) >= 1 - PREFETCH and not self.at_end:
+            self._schedule(self.load_next)
+        elif float(first) <= PREFETCH and self.dropped_before:
+            self._schedule(self.load_previous)
+
+    def _schedule(self, load):
+        def run():
+            self._scheduled = False
+            load()
+        self._scheduled = True
+        self.tree.after_idle(run)
@@ -35,17 +35,12 @@ def process_payment(parent, trip_id, amount):
 
     def pay():
         try:
-            # Save payment
-            db.run_query(
-                "INSERT INTO payment (trip_id, amount, method, status) VALUES (?,?,?,?)",
-                (trip_id, amount, method.get(), "paid"),
-            )
-
-            # Update trip status (only if your system uses 'paid')
-            db.run_query(
-                "UPDATE trip SET status='paid' WHERE id=?",
-                (trip_id,),
-            )
+            with db.transaction() as tx:
+                # Save payment
+                tx.run("payment_insert", (trip_id, amount, method.get(), "paid"))
+
+                # Update trip status (only if your system uses 'paid')
+                tx.run("trip_mark_paid", (trip_id,))
 
             messagebox.showinfo("Paid", "Payment recorded", parent=win)
             win.destroy()
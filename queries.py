@@ -0,0 +1,336 @@
+import threading
+from functools import lru_cache
+
+# Named SQL used by the dashboards.
+# Use with db.run_named("<name>", values). Keeping each statement as one
+# fixed string lets every pooled connection compile it once and reuse it
+# from its statement cache; the read/write/insert kind is worked out once
+# at registration instead of on every call.
+
+
+@lru_cache(maxsize=512)
+def query_kind(sql):
+    """Classify SQL as 'read', 'insert' or 'write'."""
+    head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+    if head in ("SELECT", "WITH", "PRAGMA", "EXPLAIN"):
+        return "read"
+    if head in ("INSERT", "REPLACE"):
+        return "insert"
+    return "write"
+
+
+class Query:
+    __slots__ = ("name", "sql", "kind", "calls", "errors", "total_time")
+
+    def __init__(self, name, sql):
+        self.name = name
+        self.sql = sql
+        self.kind = query_kind(sql)
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+
+
+QUERIES = {}
+_stats_lock = threading.Lock()
+_register_lock = threading.Lock()
+
+
+def register(name, sql):
+    if name in QUERIES:
+        raise ValueError(f"Query already registered: {name}")
+    QUERIES[name] = Query(name, sql)
+    return QUERIES[name]
+
+
+def ensure(name, sql):
+    """Register a generated query on first use; later calls return it."""
+    with _register_lock:
+        query = QUERIES.get(name)
+        if query is None:
+            query = register(name, sql)
+        elif query.sql != sql:
+            raise ValueError(f"Query {name} already registered with different SQL")
+        return query
+
+
+def register_view(name, columns, from_sql, where="", order="", key="id", updated="updated_at"):
+    """
+    Register the three queries a treeBinding.TreeBinding needs:
+    name (all rows), name_changed (rows touched since a cursor, passed as
+    the last parameter) and name_ids (ordered keys only).
+    """
+    where_sql = f"WHERE {where}" if where else ""
+    order_sql = f"ORDER BY {order}" if order else ""
+    changed = f"{where} AND " if where else ""
+    # the overlap covers writes committed after a later timestamp was read
+    changed += f"{updated} >= datetime(?, '-2 seconds')"
+
+    register(name, f"SELECT {columns} FROM {from_sql} {where_sql} {order_sql}")
+    register(f"{name}_changed", f"SELECT {columns} FROM {from_sql} WHERE {changed} {order_sql}")
+    register(f"{name}_ids", f"SELECT {key} FROM {from_sql} {where_sql} {order_sql}")
+
+
+def get(name):
+    try:
+        return QUERIES[name]
+    except KeyError:
+        raise KeyError(f"Unknown query: {name}") from None
+
+
+def record(query, seconds, failed=False):
+    with _stats_lock:
+        query.calls += 1
+        query.total_time += seconds
+        if failed:
+            query.errors += 1
+
+
+def stats():
+    """Per-query counters: {name: {calls, errors, total_ms, avg_ms}}."""
+    with _stats_lock:
+        return {
+            q.name: {
+                "calls": q.calls,
+                "errors": q.errors,
+                "total_ms": q.total_time * 1000,
+                "avg_ms": (q.total_time * 1000 / q.calls) if q.calls else 0.0,
+            }
+            for q in QUERIES.values()
+        }
+
+
+def reset_stats():
+    with _stats_lock:
+        for q in QUERIES.values():
+            q.calls = q.errors = 0
+            q.total_time = 0.0
+
+
+#  Trips
+# Views shown in Treeviews are registered with register_view so they can
+# be refreshed incrementally (see treeBinding).
+register_view(
+    "pending_trips",
+    columns="""t.id, c.name, t.pickup, t.dropoff,
+               t.pickup_date, t.pickup_time, t.updated_at""",
+    from_sql="trip t LEFT JOIN customer c ON t.customer_id = c.id",
+    where="t.status='requested' AND t.driver_id IS NULL",
+    order="t.created_at ASC",
+    key="t.id",
+    updated="t.updated_at",
+)
+
+register_view(
+    "customer_trips",
+    columns="""t.id, d.name AS driver, t.pickup, t.dropoff, t.pickup_date, t.pickup_time,
+               t.dropoff_date, t.dropoff_time, t.fare, t.status, t.updated_at""",
+    from_sql="trip t LEFT JOIN driver d ON t.driver_id = d.id",
+    where="t.customer_id=?",
+    order="t.created_at DESC",
+    key="t.id",
+    updated="t.updated_at",
+)
+
+register_view(
+    "driver_trips",
+    columns="""t.id, c.name as customer, t.pickup, t.dropoff,
+               t.pickup_date, t.pickup_time,
+               t.dropoff_date, t.dropoff_time,
+               t.fare, t.status, t.updated_at""",
+    from_sql="trip t LEFT JOIN customer c ON t.customer_id = c.id",
+    where="t.driver_id=? AND t.status NOT IN ('completed', 'cancelled')",
+    order="t.created_at DESC",
+    key="t.id",
+    updated="t.updated_at",
+)
+
+register("dispatch_pending_trips", """
+    SELECT id, customer_id, pickup, dropoff, pickup_lat, pickup_lon, created_at
+    FROM trip
+    WHERE status='requested' AND driver_id IS NULL
+    ORDER BY created_at ASC
+    LIMIT ?
+""")
+
+register("trip_state", "SELECT status, driver_id FROM trip WHERE id=?")
+
+register("trip_details", """
+    SELECT pickup, dropoff, pickup_date, pickup_time, dropoff_date, dropoff_time, fare
+    FROM trip WHERE id=?
+""")
+
+register("trip_insert", """
+    INSERT INTO trip (customer_id, driver_id, pickup, dropoff, pickup_date, pickup_time,
+                      dropoff_date, dropoff_time, fare, status,
+                      pickup_lat, pickup_lon, dropoff_lat, dropoff_lon, fare_review)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+""")
+
+# A trip's fare is locked once a 'paid' payment exists for it (booking
+# pays up front), so trip.fare always matches what was charged.
+TRIP_PAID = "EXISTS (SELECT 1 FROM payment p WHERE p.trip_id = trip.id AND p.status='paid')"
+
+register("trip_update_requested", f"""
+    UPDATE trip SET pickup=?, dropoff=?, pickup_date=?, pickup_time=?,
+                    dropoff_date=?, dropoff_time=?,
+                    fare = CASE WHEN {TRIP_PAID} THEN fare ELSE ? END,
+                    pickup_lat=?, pickup_lon=?, dropoff_lat=?, dropoff_lon=?,
+                    fare_review = CASE WHEN {TRIP_PAID} THEN fare_review ELSE ? END
+    WHERE id=? AND status='requested'
+""")
+
+register("trip_assign_if_pending", """
+    UPDATE trip SET driver_id=?, status='assigned'
+    WHERE id=? AND status='requested' AND driver_id IS NULL
+""")
+
+register("trip_cancel",
+         "UPDATE trip SET status='cancelled', dropoff_date=NULL, dropoff_time=NULL WHERE id=?")
+
+register("trip_complete",
+         "UPDATE trip SET status='completed', dropoff_date=?, dropoff_time=? WHERE id=?")
+
+register("trip_mark_paid", "UPDATE trip SET status='paid' WHERE id=?")
+
+register("requested_trips_for_pricing", f"""
+    SELECT id, pickup, dropoff, pickup_date, pickup_time, fare
+    FROM trip WHERE status='requested' AND NOT {TRIP_PAID}
+""")
+
+register("trip_set_fare", f"UPDATE trip SET fare=? WHERE id=? AND status='requested' AND NOT {TRIP_PAID}")
+
+register("trip_approve_fare", "UPDATE trip SET fare_review=0 WHERE id=?")
+
+#  Drivers
+register_view("all_drivers", columns="*", from_sql="driver", order="id")
+
+register_view(
+    "available_drivers",
+    columns="id, name, email, phone, updated_at",
+    from_sql="driver",
+    where="available=1",
+    order="name ASC",
+)
+
+register("dispatch_available_drivers", "SELECT id, name FROM driver WHERE available=1")
+
+register("driver_locations", """
+    SELECT l.driver_id, l.lat, l.lon, d.available
+    FROM driver_location l
+    JOIN driver d ON d.id = l.driver_id
+""")
+
+register("driver_location_upsert", """
+    INSERT INTO driver_location (driver_id, lat, lon, updated_at)
+    VALUES (?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+    ON CONFLICT (driver_id) DO UPDATE
+    SET lat=excluded.lat, lon=excluded.lon, updated_at=excluded.updated_at
+    WHERE excluded.updated_at >= driver_location.updated_at
+""")
+
+register("driver_by_id", "SELECT * FROM driver WHERE id=?")
+
+# what a session refetches (see session); the rest comes from *_by_id
+# only when version has moved
+register("driver_status", "SELECT version, available FROM driver WHERE id=?")
+
+register("driver_by_email", "SELECT * FROM driver WHERE email=?")
+
+register("driver_set_password", "UPDATE driver SET password=? WHERE id=? AND password=?")
+
+register("driver_insert",
+         "INSERT INTO driver (name,email,phone,license_number,password) VALUES (?,?,?,?,?)")
+
+register("driver_update", """
+    UPDATE driver
+    SET name=?, email=?, phone=?, license_number=?
+    WHERE id=?
+""")
+
+register("driver_update_with_password", """
+    UPDATE driver
+    SET name=?, email=?, phone=?, license_number=?, password=?
+    WHERE id=?
+""")
+
+register("driver_delete", "DELETE FROM driver WHERE id=?")
+
+register("driver_set_available", "UPDATE driver SET available=1 WHERE id=?")
+
+register("driver_claim",
+         "UPDATE driver SET available=0 WHERE id=? AND available=1 RETURNING name")
+
+#  Customers
+register("customer_by_email", "SELECT * FROM customer WHERE email=?")
+
+register("customer_by_id", "SELECT * FROM customer WHERE id=?")
+
+register("customer_status", "SELECT version FROM customer WHERE id=?")
+
+register("customer_insert",
+         "INSERT INTO customer (name, email, telephone, password) VALUES (?,?,?,?)")
+
+register("customer_set_password", "UPDATE customer SET password=? WHERE id=? AND password=?")
+
+register("customer_reset_password", "UPDATE customer SET password=? WHERE email=?")
+
+#  Admins
+register("admin_by_username", "SELECT * FROM admin WHERE username=?")
+
+register("admin_by_id", "SELECT * FROM admin WHERE id=?")
+
+register("admin_status", "SELECT version FROM admin WHERE id=?")
+
+register("admin_set_password", "UPDATE admin SET password=? WHERE id=? AND password=?")
+
+#  Change feed (see changeFeed)
+register("trip_event_latest", "SELECT IFNULL(MAX(id), 0) FROM trip_event")
+
+register("trip_events_since", """
+    SELECT id, trip_id, kind, status, customer_id, driver_id, old_driver_id
+    FROM trip_event WHERE id > ? ORDER BY id LIMIT ?
+""")
+
+register("trip_event_prune",
+         "DELETE FROM trip_event WHERE id <= (SELECT MAX(id) FROM trip_event) - ?")
+
+#  Payments
+register("payment_by_trip", "SELECT * FROM payment WHERE trip_id=?")
+
+register("payment_insert",
+         "INSERT INTO payment (trip_id, amount, method, status) VALUES (?,?,?,?)")
+
+#  Admin KPIs (see dailyStats)
+register("daily_stats_since", """
+    SELECT day, metric, key, count, amount
+    FROM daily_stats WHERE day >= ? ORDER BY day
+""")
+
+register("driver_utilization",
+         "SELECT COUNT(*) AS total, IFNULL(SUM(available = 0), 0) AS busy FROM driver")
+
+#  Accounting export (see accountingExport); [start, end) on created_at / paid_at
+register("export_trips", """
+    SELECT t.id, strftime('%Y-%m-%d %H:%M:%S', t.created_at) AS created_at,
+           t.pickup_date, t.pickup_time, t.dropoff_date, t.dropoff_time,
+           t.pickup, t.dropoff, t.status, t.fare,
+           t.customer_id, c.name AS customer, t.driver_id, d.name AS driver
+    FROM trip t
+    LEFT JOIN customer c ON t.customer_id = c.id
+    LEFT JOIN driver d   ON t.driver_id   = d.id
+    WHERE t.created_at >= ? AND t.created_at < ?
+    ORDER BY t.created_at, t.id
+""")
+
+register("export_payments", """
+    SELECT p.id, strftime('%Y-%m-%d %H:%M:%S', p.paid_at) AS paid_at,
+           p.trip_id, p.amount, p.method, p.status,
+           c.name AS customer, d.name AS driver
+    FROM payment p
+    LEFT JOIN trip t     ON p.trip_id     = t.id
+    LEFT JOIN customer c ON t.customer_id = c.id
+    LEFT JOIN driver d   ON t.driver_id   = d.id
+    WHERE p.paid_at >= ? AND p.paid_at < ?
+    ORDER BY p.paid_at, p.id
+""")
@@ -0,0 +1,300 @@
+import argparse
+import datetime
+import os
+import random
+import time
+from itertools import accumulate
+
+import credentials
+import databaseConnection as db
+import fareEngine
+import geocoding
+import migrations
+
+# Synthetic taxibooking databases for load testing.
+# The schema comes from create_tables(). For the load, the secondary
+# indexes and the triggers on the seeded tables are dropped, rows are
+# written with executemany (BATCH rows per call, TX_ROWS trips per
+# transaction, journal off) and the indexes and triggers are then
+# recreated once; daily_stats and trip_search are filled in one pass each
+# at the end.
+# The data mimics the app: trips spread over --days with rush-hour peaks,
+# heavy-tailed customer, driver and place popularity, fares from
+# fareEngine, status by age (older trips are finished, requested and
+# assigned ones are today's; a driver holds at most one assigned trip,
+# and once every driver has one the rest stay requested), and one
+# payment per booking like process_payment. The same --seed, --end and sizes give the same file.
+
+BATCH = 50000
+TX_ROWS = 1000000
+PASSWORD = "password1"   # every generated customer and driver
+ADMIN_PASSWORD = "admin123"
+
+# while loading; the file is switched back to WAL afterwards
+BULK_PRAGMAS = {
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+    "cache_size": -262144,   # 256 MB
+    "temp_store": "MEMORY",
+    "locking_mode": "EXCLUSIVE",
+}
+
+SEEDED_TABLES = ("customer", "driver", "trip", "payment")
+
+# status -> weight, for trips before the last day and on it
+PAST_STATUSES = {"completed": 60, "paid": 26, "cancelled": 14}
+TODAY_STATUSES = {"requested": 30, "assigned": 20, "completed": 30, "paid": 10, "cancelled": 10}
+CANCELLED_WITH_DRIVER = 0.4
+
+# share of trips per pickup hour: quiet nights, morning and evening peaks
+HOUR_WEIGHTS = (1, 1, 1, 1, 1, 2, 4, 8, 12, 11, 7, 6, 7, 6, 6, 7, 9, 12, 12, 9, 6, 4, 3, 2)
+WEEKEND_WEIGHT = 1.25
+METHODS = {"eSewa": 50, "Khalti": 30, "Fonepay": 20}
+
+# popularity ~ 1 / rank**s
+CUSTOMER_SKEW = 0.7
+DRIVER_SKEW = 0.5
+PLACE_SKEW = 0.8
+
+FIRST_NAMES = ("Aarav", "Sita", "Ram", "Gita", "Hari", "Anita", "Bikash", "Sunita", "Suman", "Puja",
+               "Nabin", "Rina", "Kiran", "Asha", "Dipesh", "Manisha", "Rajesh", "Sarita", "Prakash", "Laxmi")
+LAST_NAMES = ("Shrestha", "Gurung", "Thapa", "Rai", "Tamang", "Magar", "Karki", "Adhikari",
+              "Maharjan", "Sharma", "Basnet", "Limbu", "Bhandari", "Joshi", "Pradhan", "Khadka")
+
+TRIP_COLUMNS = (
+    "id", "customer_id", "driver_id", "pickup", "dropoff", "pickup_date", "pickup_time",
+    "dropoff_date", "dropoff_time", "fare", "status", "created_at", "updated_at",
+    "pickup_lat", "pickup_lon", "dropoff_lat", "dropoff_lon",
+)
+PAYMENT_COLUMNS = ("trip_id", "amount", "method", "status", "paid_at")
+
+
+def insert_sql(table, columns):
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+def skewed(rnd, ids, skew):
+    """(ids in popularity order, cumulative weights) for random.choices."""
+    ids = list(ids)
+    rnd.shuffle(ids)
+    return ids, list(accumulate(1 / k ** skew for k in range(1, len(ids) + 1)))
+
+
+def cumulative(weights):
+    return list(weights), list(accumulate(weights.values()))
+
+
+def trips_per_day(rnd, trips, days, end):
+    """Whole trip counts per day (oldest first) that add up to trips."""
+    start = end - datetime.timedelta(days=days - 1)
+    dates = [start + datetime.timedelta(days=i) for i in range(days)]
+    weights = [WEEKEND_WEIGHT if d.weekday() >= 5 else 1 for d in dates]
+    total = sum(weights)
+    counts = [int(trips * w / total) for w in weights]
+    for i in rnd.sample(range(days), trips - sum(counts)):
+        counts[i] += 1
+    return [d.isoformat() for d in dates], counts
+
+
+class Places:
+    """Gazetteer places with popularity, coordinates and a fare per route and tariff."""
+
+    def __init__(self, rnd):
+        places = sorted({p for p in geocoding.get_gazetteer().places.values()})
+        self.names = [p.name for p in places]
+        self.coords = [(p.lat, p.lon) for p in places]
+        self.order, self.cum = skewed(rnd, range(len(places)), PLACE_SKEW)
+
+        # one representative hour per tariff; quotes depend only on the tariff
+        by_tariff = {}
+        for hour in range(24):
+            by_tariff.setdefault(fareEngine.tariff_for(hour)[0], hour)
+        tariffs = list(by_tariff)
+        self.tariff_of_hour = [tariffs.index(fareEngine.tariff_for(h)[0]) for h in range(24)]
+        n = len(places)
+        self.fares = [
+            [fareEngine.quote(self.names[i], self.names[j], hour).fare for i in range(n) for j in range(n)]
+            for hour in by_tariff.values()
+        ]
+
+
+def generate_people(rnd, table, count, password, stamp):
+    first, last = FIRST_NAMES, LAST_NAMES
+    for i in range(1, count + 1):
+        f, s = rnd.choice(first), rnd.choice(last)
+        phone = f"98{rnd.randrange(10 ** 8):08d}"
+        email = f"{f.lower()}.{s.lower()}{i}@example.com"
+        if table == "customer":
+            yield (i, f"{f} {s}", email, phone, password)
+        else:
+            yield (i, f"{f} {s}", email, phone, f"LIC-{100000 + i}", password, stamp)
+
+
+def generate_trips(rnd, places, trips, customers, drivers, days, end):
+    """Yield (trip row, payment row) in id (= booking time) order."""
+    dates, counts = trips_per_day(rnd, trips, days, end)
+    customer_ids, customer_cum = skewed(rnd, range(1, customers + 1), CUSTOMER_SKEW)
+    driver_ids, driver_cum = skewed(rnd, range(1, drivers + 1), DRIVER_SKEW)
+    hours, hour_cum = list(range(24)), list(accumulate(HOUR_WEIGHTS))
+    methods, method_cum = cumulative(METHODS)
+    past = cumulative(PAST_STATUSES)
+    today = cumulative(TODAY_STATUSES)
+    times = [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in range(86400)]
+    names, coords, order, place_cum = places.names, places.coords, places.order, places.cum
+    tariff_of_hour, fares = places.tariff_of_hour, places.fares
+    n_places = len(names)
+    rand = rnd.random
+    choices = rnd.choices
+    busy = set()   # drivers with an assigned trip
+    spare = None   # the other drivers, shuffled once one is needed
+
+    trip_id = 0
+    for day_index, (date, n) in enumerate(zip(dates, counts)):
+        statuses, status_cum = today if day_index == len(dates) - 1 else past
+        seconds = sorted(h * 3600 + int(rand() * 3600) for h in choices(hours, cum_weights=hour_cum, k=n))
+        picks = choices(order, cum_weights=place_cum, k=n)
+        drops = choices(order, cum_weights=place_cum, k=n)
+        columns = zip(
+            seconds, picks, drops,
+            choices(customer_ids, cum_weights=customer_cum, k=n),
+            choices(driver_ids, cum_weights=driver_cum, k=n),
+            choices(statuses, cum_weights=status_cum, k=n),
+            choices(methods, cum_weights=method_cum, k=n),
+        )
+        for sec, pick, drop, customer, driver, status, method in columns:
+            trip_id += 1
+            if drop == pick:
+                drop = (drop + 1) % n_places
+            if status == "assigned":
+                if driver in busy:
+                    if spare is None:
+                        spare = iter(rnd.sample(range(1, drivers + 1), drivers))
+                    driver = next((d for d in spare if d not in busy), None)
+                if driver is None:
+                    status = "requested"
+                else:
+                    busy.add(driver)
+            fare = fares[tariff_of_hour[sec // 3600]][pick * n_places + drop]
+            pickup_time = times[sec]
+            booked = f"{date} {pickup_time}"
+            if status in ("completed", "paid"):
+                dropoff_date, dropoff_time = date, times[min(sec + 600 + int(rand() * 3000), 86399)]
+                updated = f"{date} {dropoff_time}.000"
+            else:
+                dropoff_date = dropoff_time = None
+                updated = f"{booked}.000"
+                if status == "requested" or (status == "cancelled" and rand() >= CANCELLED_WITH_DRIVER):
+                    driver = None
+            yield (
+                (trip_id, customer, driver, names[pick], names[drop], date, pickup_time,
+                 dropoff_date, dropoff_time, fare, status, booked, updated, *coords[pick], *coords[drop]),
+                (trip_id, fare, method, "paid", booked),
+            )
+
+
+def drop_indexes_and_triggers(conn):
+    """Drop idx_* indexes and triggers on SEEDED_TABLES; returns their SQL (indexes first)."""
+    marks = ",".join("?" * len(SEEDED_TABLES))
+    saved = conn.execute(
+        f"SELECT type, name, sql FROM sqlite_master "
+        f"WHERE type IN ('index', 'trigger') AND sql IS NOT NULL AND tbl_name IN ({marks}) "
+        f"ORDER BY type = 'trigger', name",
+        SEEDED_TABLES,
+    ).fetchall()
+    for kind, name, _ in saved:
+        conn.execute(f"DROP {kind.upper()} {name}")
+    return [sql for _, _, sql in saved]
+
+
+def generate(path, trips, customers=None, drivers=None, days=365, end=None, seed=1, log=print):
+    """
+    Write a new database at path (which must not exist). Returns
+    {table: rows written}.
+    """
+    if os.path.exists(path):
+        raise FileExistsError(path)
+    customers = customers or max(10, trips // 20)
+    drivers = drivers or max(5, trips // 500)
+    end = end or datetime.date.today()
+    rnd = random.Random(seed)
+
+    db.SQLITE_DB_FILE = path
+    db.create_tables()
+    db.close_pool()
+
+    started = time.perf_counter()
+    conn = db.create_connection(path)
+    conn.isolation_level = None
+    db.apply_pragmas(conn, BULK_PRAGMAS)
+    try:
+        recreate = drop_indexes_and_triggers(conn)
+        password = credentials.hash_password(PASSWORD, salt=rnd.randbytes(credentials.SALT_BYTES))
+        admin = credentials.hash_password(ADMIN_PASSWORD, salt=rnd.randbytes(credentials.SALT_BYTES))
+
+        stamp = f"{end - datetime.timedelta(days=days - 1)} 00:00:00.000"  # driver.updated_at
+
+        conn.execute("BEGIN")
+        conn.execute("UPDATE admin SET password=? WHERE username='admin'", (admin,))
+        conn.executemany(insert_sql("customer", ("id", "name", "email", "telephone", "password")),
+                         generate_people(rnd, "customer", customers, password, stamp))
+        conn.executemany(
+            insert_sql("driver", ("id", "name", "email", "phone", "license_number", "password", "updated_at")),
+            generate_people(rnd, "driver", drivers, password, stamp),
+        )
+        conn.execute("COMMIT")
+        log(f"{customers:,} customers, {drivers:,} drivers")
+
+        trip_sql, payment_sql = insert_sql("trip", TRIP_COLUMNS), insert_sql("payment", PAYMENT_COLUMNS)
+        rows = generate_trips(rnd, Places(rnd), trips, customers, drivers, days, end)
+        written = 0
+        while written < trips:
+            conn.execute("BEGIN")
+            in_tx = 0
+            while in_tx < TX_ROWS and written < trips:
+                batch = [next(rows) for _ in range(min(BATCH, trips - written))]
+                conn.executemany(trip_sql, [t for t, _ in batch])
+                conn.executemany(payment_sql, [p for _, p in batch])
+                in_tx += len(batch)
+                written += len(batch)
+            conn.execute("COMMIT")
+            log(f"{written:,} trips ({time.perf_counter() - started:.0f} s)")
+
+        log("indexes, triggers and daily stats")
+        conn.execute("BEGIN")
+        conn.execute("UPDATE driver SET available=0 WHERE id IN "
+                     "(SELECT driver_id FROM trip WHERE status='assigned')")
+        for sql in recreate:
+            conn.execute(sql)
+        migrations.fill_daily_stats(conn.cursor())
+        migrations.fill_trip_search(conn.cursor())
+        conn.execute("COMMIT")
+        conn.execute("PRAGMA analysis_limit=1000")  # sampled, or ANALYZE reads every index
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA locking_mode=NORMAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+    finally:
+        conn.close()
+    log(f"done in {time.perf_counter() - started:.0f} s")
+    return {"customer": customers, "driver": drivers, "trip": trips, "payment": trips}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic taxibooking database.")
+    parser.add_argument("path", help="new database file")
+    parser.add_argument("--trips", type=int, default=100000)
+    parser.add_argument("--customers", type=int, help="default: trips / 20")
+    parser.add_argument("--drivers", type=int, help="default: trips / 500")
+    parser.add_argument("--days", type=int, default=365, help="history length, ending on --end")
+    parser.add_argument("--end", type=datetime.date.fromisoformat, help="last day (YYYY-MM-DD), default today")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    try:
+        generate(args.path, args.trips, args.customers, args.drivers, args.days, args.end, args.seed)
+    except FileExistsError:
+        parser.error(f"{args.path} already exists")
+    print(f"Customers and drivers log in with {PASSWORD!r}, admin with admin / {ADMIN_PASSWORD!r}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import credentials
+import databaseConnection as db
+
+# The logged-in user, cached for the life of a dashboard.
+# The account row is kept as a small __slots__ record (without the
+# password), so the dashboards read the profile from memory instead of
+# querying for it. Every account row has a version that triggers bump
+# whenever a profile column changes (migration 10); refresh() reads just
+# the version and the status columns (<kind>_status) and reloads the
+# whole row (<kind>_by_id) only when the version has moved.
+
+
+class UserRecord:
+    """Profile of one account; fields are the row's columns of that name."""
+
+    __slots__ = ()
+    kind = None
+    STATUS = ()   # columns refetched on every refresh
+
+    def __init__(self, row):
+        for name in self.__slots__:
+            setattr(self, name, row[name])
+
+    def __getitem__(self, name):
+        # rows and records can be read the same way
+        return getattr(self, name)
+
+    def __repr__(self):
+        fields = ", ".join(f"{n}={getattr(self, n)!r}" for n in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def with_status(self, row):
+        """Copy of this record with the STATUS columns taken from row."""
+        copy = object.__new__(type(self))
+        for name in self.__slots__:
+            setattr(copy, name, row[name] if name in self.STATUS else getattr(self, name))
+        return copy
+
+
+class Customer(UserRecord):
+    __slots__ = ("id", "name", "email", "telephone", "version")
+    kind = "customer"
+
+
+class Driver(UserRecord):
+    __slots__ = ("id", "name", "email", "phone", "license_number", "available", "version")
+    kind = "driver"
+    STATUS = ("available",)
+
+
+class Admin(UserRecord):
+    __slots__ = ("id", "username", "version")
+    kind = "admin"
+
+
+RECORDS = {cls.kind: cls for cls in (Customer, Driver, Admin)}
+
+
+class Session:
+    def __init__(self, user):
+        self.user = user
+
+    def refresh(self):
+        """
+        Bring the cached user up to date and return it; None if the
+        account is gone or the lookup failed (the cache is kept then).
+        Safe to run on a worker thread: self.user is swapped for a new
+        record, never changed in place.
+        """
+        user = self.user
+        rows = db.run_named(f"{user.kind}_status", (user.id,))
+        if not rows:
+            return None
+        if rows[0]["version"] == user.version:
+            user = user.with_status(rows[0])
+        else:
+            rows = db.run_named(f"{user.kind}_by_id", (user.id,))
+            if not rows:
+                return None
+            user = type(user)(rows[0])
+        self.user = user
+        return user
+
+
+def start(kind, row):
+    return Session(RECORDS[kind](row))
+
+
+def login(kind, username, password):
+    """credentials.login, then a Session for the account (or None)."""
+    row = credentials.login(kind, username, password)
+    return start(kind, row) if row else None
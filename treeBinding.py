@@ -0,0 +1,162 @@
+from bisect import bisect_left
+
+import databaseConnection as db
+
+# Incremental Treeview refresh.
+# A TreeBinding keeps a ttk.Treeview in step with a view registered with
+# queries.register_view, keyed by row id (used as the Treeview iid).
+# The first load fills the tree; later refreshes fetch only rows whose
+# updated_at passed the cursor, plus the view's ordered id list, and then
+# insert, update, delete or move just the rows that differ. Unchanged
+# rows cost no Tk calls, so a refresh with no changes does not flicker.
+
+
+class TreeBinding:
+    """
+    tree: ttk.Treeview. view: name passed to register_view.
+    render(row) returns (values, tags) for one row.
+    """
+
+    def __init__(self, tree, view, render, key="id"):
+        self.tree = tree
+        self.view = view
+        self.render = render
+        self.key = key
+        self.shown = {}       # iid -> (values, tags) as last rendered
+        self.cursor = None    # newest updated_at seen
+        self.params = None
+
+    def __len__(self):
+        return len(self.shown)
+
+    def refresh(self, params=(), worker=None, on_done=None):
+        """
+        Bring the tree up to date.
+        Without a worker this blocks and returns False on a database error.
+        With a uiWorker.Worker the queries run in the background, a newer
+        refresh supersedes an unfinished one, and on_done(ok) is called on
+        the Tk thread once the tree is updated.
+        """
+        args = (tuple(params), self.cursor, self.params, frozenset(self.shown))
+        if worker is None:
+            return self.apply(self.fetch(*args))
+
+        def done(result):
+            ok = self.apply(result)
+            if on_done is not None:
+                on_done(ok)
+        worker.submit(self.fetch, *args, on_done=done, key=self, busy=self.tree)
+
+    def reload(self, params=(), worker=None, on_done=None):
+        """Full load; rows already shown are still diffed, not re-inserted."""
+        self.cursor = None
+        return self.refresh(params, worker, on_done)
+
+    def fetch(self, params, cursor, shown_params, shown):
+        """
+        Database side of a refresh; touches no Tk state, so it can run on
+        a worker thread. Returns (params, full, rows, order) or None.
+        """
+        if cursor is not None and params == shown_params:
+            ids = db.run_named(f"{self.view}_ids", params)
+            rows = db.run_named(f"{self.view}_changed", params + (cursor,))
+            if ids is None or rows is None:
+                return None
+
+            order = [str(r[0]) for r in ids]
+            fetched = {str(r[self.key]) for r in rows}
+            if all(iid in shown or iid in fetched for iid in order):
+                return params, False, rows, order
+            # a row joined the view without being touched (e.g. a change in
+            # a joined table); cheaper to reload than to chase it
+
+        rows = db.run_named(self.view, params)
+        if rows is None:
+            return None
+        return params, True, rows, [str(r[self.key]) for r in rows]
+
+    def apply(self, result):
+        """Tk side of a refresh. Returns False if the fetch failed."""
+        if result is None:
+            return False
+        params, full, rows, order = result
+        if full:
+            self.params = params
+            self.cursor = None
+        self._apply(rows, order)
+        return True
+
+    def _apply(self, rows, order):
+        tree = self.tree
+        wanted = set(order)
+
+        gone = [iid for iid in self.shown if iid not in wanted]
+        if gone:
+            tree.delete(*gone)
+            for iid in gone:
+                del self.shown[iid]
+
+        new = {}
+        for r in rows:
+            iid = str(r[self.key])
+            if iid not in wanted:
+                continue
+            item = self.render(r)
+            old = self.shown.get(iid)
+            if old is None:
+                new[iid] = item
+            elif old != item:
+                tree.item(iid, values=item[0], tags=item[1])
+            self.shown[iid] = item
+
+            stamp = r["updated_at"]
+            if stamp is not None and (self.cursor is None or stamp > self.cursor):
+                self.cursor = stamp
+
+        children = list(tree.get_children())
+        if new or children != order:
+            self._place(children, order, new)
+
+    def _place(self, children, order, new):
+        """
+        Insert new rows and move misplaced ones so the tree matches order.
+        The longest run of rows already in the right relative order stays
+        put; every other row goes right after its predecessor in order.
+        """
+        stable = _longest_ordered(children, {iid: i for i, iid in enumerate(order)})
+        for i, iid in enumerate(order):
+            if iid in stable:
+                continue
+            if iid not in new:
+                # detached first, so index counts the other rows only
+                children.remove(iid)
+                self.tree.detach(iid)
+            index = children.index(order[i - 1]) + 1 if i else 0
+            if iid in new:
+                values, tags = new[iid]
+                self.tree.insert("", index, iid=iid, values=values, tags=tags)
+            else:
+                self.tree.move(iid, "", index)
+            children.insert(index, iid)
+
+
+def _longest_ordered(items, rank):
+    """Largest subset of items whose ranks already increase (LIS)."""
+    tails, tail_idx, prev = [], [], [None] * len(items)
+    for i, iid in enumerate(items):
+        r = rank[iid]
+        k = bisect_left(tails, r)
+        if k == len(tails):
+            tails.append(r)
+            tail_idx.append(i)
+        else:
+            tails[k] = r
+            tail_idx[k] = i
+        prev[i] = tail_idx[k - 1] if k else None
+
+    keep = set()
+    i = tail_idx[-1] if tail_idx else None
+    while i is not None:
+        keep.add(items[i])
+        i = prev[i]
+    return keep
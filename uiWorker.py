@@ -0,0 +1,131 @@
+import queue
+import threading
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+# Background database work for the Tk windows.
+# Jobs run on a small shared thread pool (each worker thread gets its own
+# pooled connection). Finished jobs are queued and handed back on the Tk
+# thread by polling with widget.after, so no Tk call is made off the main
+# thread and a slow query or a lock wait never freezes the UI.
+# Jobs submitted under the same key supersede each other: one that has
+# not started is cancelled and the result of one that has is dropped, so
+# only the newest refresh of a view is applied.
+
+WORKERS = 4
+POLL_MS = 15
+BUSY_CURSOR = "watch"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="db-worker")
+        return _executor
+
+
+class Worker:
+    """
+    Runs jobs for one window. widget is the window (or any widget in it);
+    results that arrive after it is destroyed are dropped.
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+        self._done = queue.SimpleQueue()
+        self._latest = {}    # key -> newest future
+        self._pending = 0
+        self._busy = {}      # widget -> number of jobs showing it busy
+        self._polling = False
+
+    def submit(self, func, *args, on_done=None, on_error=None, key=None, replace=True, busy=None):
+        """
+        Run func(*args) on the pool. on_done(result) or on_error(exc) is
+        called later on the Tk thread.
+        key: jobs with the same key supersede each other; with
+        replace=False a new job is refused (None is returned) while one
+        is still running, e.g. to ignore a double-clicked save button.
+        busy: widget that shows a busy cursor while the job runs.
+        """
+        if key is not None and key in self._latest:
+            if not replace:
+                return None
+            self._latest[key].cancel()
+
+        future = get_executor().submit(func, *args)
+        if key is not None:
+            self._latest[key] = future
+        self._pending += 1
+        self._set_busy(busy, 1)
+        future.add_done_callback(lambda f: self._done.put((f, key, on_done, on_error, busy)))
+        self._poll()
+        return future
+
+    def running(self, key):
+        return key in self._latest
+
+    def _poll(self):
+        if self._polling:
+            return
+        try:
+            self.widget.after(POLL_MS, self._drain)
+            self._polling = True
+        except tk.TclError:  # window already destroyed
+            pass
+
+    def _drain(self):
+        self._polling = False
+        try:
+            alive = bool(self.widget.winfo_exists())
+        except tk.TclError:
+            alive = False
+
+        try:
+            while True:
+                try:
+                    future, key, on_done, on_error, busy = self._done.get_nowait()
+                except queue.Empty:
+                    break
+                self._pending -= 1
+                current = key is None or self._latest.get(key) is future
+                if key is not None and current:
+                    del self._latest[key]
+                if not alive:
+                    continue
+                self._set_busy(busy, -1)
+                if not current or future.cancelled():
+                    continue  # superseded by a newer job with the same key
+
+                error = future.exception()
+                if error is not None:
+                    if on_error is not None:
+                        on_error(error)
+                    else:
+                        print("Background job error:", error)
+                elif on_done is not None:
+                    on_done(future.result())
+        finally:
+            # a failing callback must not leave later results stranded
+            if self._pending and alive:
+                self._poll()
+
+    def _set_busy(self, widget, delta):
+        if widget is None:
+            return
+        count = self._busy.get(widget, 0) + delta
+        self._busy[widget] = count
+        if count > 0 and count - delta <= 0:
+            cursor = BUSY_CURSOR
+        elif count <= 0:
+            cursor = ""
+            del self._busy[widget]
+        else:
+            return
+        try:
+            widget.configure(cursor=cursor)
+        except tk.TclError:
+            pass
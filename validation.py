@@ -0,0 +1,115 @@
+import re
+
+# Field rules shared by every form and by bulk imports.
+# Each field has one precompiled pattern the whole value must match.
+# Single values are checked with the helpers below; whole columns of
+# records go through check_columns, which runs each pattern over a column
+# with map() instead of a Python-level call per field.
+
+FIELDS = {
+    "name": re.compile(r"[A-Za-z\s'.-]{3,}"),
+    "email": re.compile(r"[^@]+@[^@]+\.[^@]+"),
+    "phone": re.compile(r"\d{10}"),
+    "license": re.compile(r"[A-Za-z0-9\- ]{3,}"),
+    # at least 6 characters with a letter and a digit
+    "password": re.compile(r"(?=.*[A-Za-z])(?=.*\d).{6,}", re.S),
+    "date": re.compile(r"\d{4}-\d{2}-\d{2}"),
+    "time": re.compile(r"\d{2}:\d{2}:\d{2}"),
+}
+
+# field -> (title, message); "password_short" is used instead of
+# "password" for passwords under 6 characters when present
+DRIVER_MESSAGES = {
+    "name": ("Invalid Name", "Enter a valid name (at least 3 letters, letters and spaces only)."),
+    "email": ("Invalid Email", "Enter a valid email address."),
+    "phone": ("Invalid Phone", "Enter a valid 10-digit phone number."),
+    "license": ("Invalid License", "Enter a valid license number."),
+    "password_short": ("Weak Password", "Password must be at least 6 characters long."),
+    "password": ("Weak Password", "Password must contain at least one letter and one number."),
+}
+
+CUSTOMER_MESSAGES = {
+    "name": ("Invalid Name", "Name must be at least 3 characters and contain letters only."),
+    "email": ("Invalid Email", "Please enter a valid email address."),
+    "phone": ("Invalid Telephone", "Telephone must be exactly 10 digits."),
+    "password": ("Weak Password", "Password must be at least 6 characters and contain letters & numbers."),
+}
+
+DATETIME_MESSAGES = {
+    "date": ("Invalid Date", "Date must be in YYYY-MM-DD format."),
+    "time": ("Invalid Time", "Time must be in HH:MM:SS (24hr) format."),
+}
+
+
+def is_valid(field, value):
+    return FIELDS[field].fullmatch(value) is not None
+
+
+def message(field, value, messages):
+    if field == "password" and len(value) < 6 and "password_short" in messages:
+        return messages["password_short"]
+    return messages[field]
+
+
+def errors(record, messages):
+    """(title, message) for every invalid field of record ({field: value}), in order."""
+    return [
+        message(field, value, messages)
+        for field, value in record.items()
+        if FIELDS[field].fullmatch(value) is None
+    ]
+
+
+def driver_errors(name, email, phone, lic, pw, password_required=True):
+    """
+    All rule violations for one driver, in form order. An empty pw is
+    allowed when password_required is False (keep the current one).
+    """
+    record = {"name": name, "email": email, "phone": phone, "license": lic}
+    if pw or password_required:
+        record["password"] = pw
+    return errors(record, DRIVER_MESSAGES)
+
+
+def customer_errors(name, email, phone, pw):
+    return errors({"name": name, "email": email, "phone": phone, "password": pw}, CUSTOMER_MESSAGES)
+
+
+def datetime_error(date_str, time_str):
+    """Message for a malformed date or time, or None; empty values are allowed."""
+    record = {f: v for f, v in (("date", date_str), ("time", time_str)) if v}
+    found = errors(record, DATETIME_MESSAGES)
+    return found[0][1] if found else None
+
+
+#  Batch mode
+def invalid_rows(field, values):
+    """Indexes of the values in one column that break field's rule."""
+    results = map(FIELDS[field].fullmatch, values)
+    return [i for i, m in enumerate(results) if m is None]
+
+
+def check_columns(columns):
+    """
+    columns: {field: sequence of values}, all the same length.
+    Returns {field: [invalid row indexes]} for fields with any.
+    """
+    found = {}
+    for field, values in columns.items():
+        bad = invalid_rows(field, values)
+        if bad:
+            found[field] = bad
+    return found
+
+
+def column_errors(columns, messages):
+    """
+    Batch form of errors(): {row index: [(title, message), ...]} for
+    every row with an invalid field, fields in columns order.
+    """
+    by_row = {}
+    for field, bad in check_columns(columns).items():
+        values = columns[field]
+        for i in bad:
+            by_row.setdefault(i, []).append(message(field, values[i], messages))
+    return by_row